@@ -53,7 +53,8 @@ CREATE TABLE public."Container" (
     "isInternal" boolean NOT NULL,
     "isCurrent" boolean NOT NULL,
     "subType" character varying(40),
-    "creationDate" timestamp with time zone DEFAULT now() NOT NULL
+    "creationDate" timestamp with time zone DEFAULT now() NOT NULL,
+    "externalHash" character varying(32)
 );
 
 
@@ -73,6 +74,13 @@ COMMENT ON COLUMN public."Container".details IS 'Generic additional details';
 COMMENT ON COLUMN public."Container"."externalId" IS 'Item ID in ISPyB';
 
 
+--
+-- Name: COLUMN "Container"."externalHash"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."Container"."externalHash" IS 'Hash of the payload last pushed to ISPyB';
+
+
 --
 -- Name: COLUMN "Container"."isInternal"; Type: COMMENT; Schema: public; Owner: sample_handling
 --
@@ -109,6 +117,52 @@ ALTER SEQUENCE public."Container_containerId_seq" OWNER TO sample_handling;
 ALTER SEQUENCE public."Container_containerId_seq" OWNED BY public."Container"."containerId";
 
 
+--
+-- Name: ExternalSyncOutbox; Type: TABLE; Schema: public; Owner: sample_handling
+--
+
+CREATE TABLE public."ExternalSyncOutbox" (
+    "externalSyncOutboxId" integer NOT NULL,
+    "tableName" character varying(40) NOT NULL,
+    "itemId" integer NOT NULL,
+    revision integer DEFAULT 1 NOT NULL,
+    attempts smallint DEFAULT 0 NOT NULL,
+    "nextAttempt" timestamp with time zone DEFAULT now() NOT NULL,
+    "lastError" character varying(255)
+);
+
+
+ALTER TABLE public."ExternalSyncOutbox" OWNER TO sample_handling;
+
+--
+-- Name: COLUMN "ExternalSyncOutbox".revision; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."ExternalSyncOutbox".revision IS 'Incremented whenever the item changes again before being synced';
+
+
+--
+-- Name: ExternalSyncOutbox_externalSyncOutboxId_seq; Type: SEQUENCE; Schema: public; Owner: sample_handling
+--
+
+CREATE SEQUENCE public."ExternalSyncOutbox_externalSyncOutboxId_seq"
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER SEQUENCE public."ExternalSyncOutbox_externalSyncOutboxId_seq" OWNER TO sample_handling;
+
+--
+-- Name: ExternalSyncOutbox_externalSyncOutboxId_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: sample_handling
+--
+
+ALTER SEQUENCE public."ExternalSyncOutbox_externalSyncOutboxId_seq" OWNED BY public."ExternalSyncOutbox"."externalSyncOutboxId";
+
+
 --
 -- Name: PreSession; Type: TABLE; Schema: public; Owner: sample_handling
 --
@@ -151,6 +205,77 @@ ALTER SEQUENCE public."PreSession_preSessionId_seq" OWNER TO sample_handling;
 ALTER SEQUENCE public."PreSession_preSessionId_seq" OWNED BY public."PreSession"."preSessionId";
 
 
+--
+-- Name: PushJob; Type: TABLE; Schema: public; Owner: sample_handling
+--
+
+CREATE TABLE public."PushJob" (
+    "pushJobId" integer NOT NULL,
+    "shipmentId" integer NOT NULL,
+    status character varying(20) DEFAULT 'Queued'::character varying NOT NULL,
+    "creationDate" timestamp with time zone DEFAULT now() NOT NULL,
+    "lastUpdated" timestamp with time zone DEFAULT now() NOT NULL,
+    total integer DEFAULT 0 NOT NULL,
+    pushed integer DEFAULT 0 NOT NULL,
+    skipped integer DEFAULT 0 NOT NULL,
+    failed integer DEFAULT 0 NOT NULL,
+    nodes json DEFAULT '[]'::json NOT NULL,
+    token text
+);
+
+
+ALTER TABLE public."PushJob" OWNER TO sample_handling;
+
+--
+-- Name: COLUMN "PushJob"."lastUpdated"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."PushJob"."lastUpdated" IS 'Updated whenever the job makes progress';
+
+
+--
+-- Name: COLUMN "PushJob".total; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."PushJob".total IS 'Number of items in the shipment tree';
+
+
+--
+-- Name: COLUMN "PushJob".nodes; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."PushJob".nodes IS 'Result of pushing each item processed so far';
+
+
+--
+-- Name: COLUMN "PushJob".token; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."PushJob".token IS 'Token of the user who queued the job, cleared once the job ends';
+
+
+--
+-- Name: PushJob_pushJobId_seq; Type: SEQUENCE; Schema: public; Owner: sample_handling
+--
+
+CREATE SEQUENCE public."PushJob_pushJobId_seq"
+    AS integer
+    START WITH 1
+    INCREMENT BY 1
+    NO MINVALUE
+    NO MAXVALUE
+    CACHE 1;
+
+
+ALTER SEQUENCE public."PushJob_pushJobId_seq" OWNER TO sample_handling;
+
+--
+-- Name: PushJob_pushJobId_seq; Type: SEQUENCE OWNED BY; Schema: public; Owner: sample_handling
+--
+
+ALTER SEQUENCE public."PushJob_pushJobId_seq" OWNED BY public."PushJob"."pushJobId";
+
+
 --
 -- Name: Sample; Type: TABLE; Schema: public; Owner: sample_handling
 --
@@ -167,7 +292,8 @@ CREATE TABLE public."Sample" (
     "externalId" integer,
     comments character varying(255),
     "subLocation" smallint,
-    "creationDate" timestamp with time zone DEFAULT now() NOT NULL
+    "creationDate" timestamp with time zone DEFAULT now() NOT NULL,
+    "externalHash" character varying(32)
 );
 
 
@@ -187,6 +313,13 @@ COMMENT ON COLUMN public."Sample".details IS 'Generic additional details';
 COMMENT ON COLUMN public."Sample"."externalId" IS 'Item ID in ISPyB';
 
 
+--
+-- Name: COLUMN "Sample"."externalHash"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."Sample"."externalHash" IS 'Hash of the payload last pushed to ISPyB';
+
+
 --
 -- Name: COLUMN "Sample"."subLocation"; Type: COMMENT; Schema: public; Owner: sample_handling
 --
@@ -194,6 +327,26 @@ COMMENT ON COLUMN public."Sample"."externalId" IS 'Item ID in ISPyB';
 COMMENT ON COLUMN public."Sample"."subLocation" IS 'Additional location, such as cassette slot or multi-sample pin position';
 
 
+--
+-- Name: SampleNameCounter; Type: TABLE; Schema: public; Owner: sample_handling
+--
+
+CREATE TABLE public."SampleNameCounter" (
+    "shipmentId" integer NOT NULL,
+    prefix character varying(80) NOT NULL,
+    next integer NOT NULL
+);
+
+
+ALTER TABLE public."SampleNameCounter" OWNER TO sample_handling;
+
+--
+-- Name: COLUMN "SampleNameCounter".next; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."SampleNameCounter".next IS 'Next suffix to be assigned to a sample with this prefix';
+
+
 --
 -- Name: SampleParentChild; Type: TABLE; Schema: public; Owner: sample_handling
 --
@@ -243,6 +396,39 @@ ALTER SEQUENCE public."Sample_sampleId_seq" OWNER TO sample_handling;
 ALTER SEQUENCE public."Sample_sampleId_seq" OWNED BY public."Sample"."sampleId";
 
 
+--
+-- Name: Session; Type: TABLE; Schema: public; Owner: sample_handling
+--
+
+CREATE TABLE public."Session" (
+    "sessionId" integer NOT NULL,
+    "proposalCode" character varying(2) NOT NULL,
+    "proposalNumber" integer NOT NULL,
+    "visitNumber" integer NOT NULL,
+    "startDate" timestamp without time zone,
+    "endDate" timestamp without time zone,
+    "beamLineName" character varying(45),
+    "beamLineOperator" json,
+    "lastUpdated" timestamp with time zone DEFAULT now() NOT NULL
+);
+
+
+ALTER TABLE public."Session" OWNER TO sample_handling;
+
+--
+-- Name: COLUMN "Session"."sessionId"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."Session"."sessionId" IS 'Session ID in ISPyB';
+
+
+--
+-- Name: COLUMN "Session"."beamLineOperator"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."Session"."beamLineOperator" IS 'Local contacts';
+
+
 --
 -- Name: SessionType; Type: TABLE; Schema: public; Owner: sample_handling
 --
@@ -301,7 +487,9 @@ CREATE TABLE public."Shipment" (
     "proposalNumber" integer NOT NULL,
     "visitNumber" integer NOT NULL,
     "lastStatusUpdate" timestamp with time zone DEFAULT now() NOT NULL,
-    "sessionTypeId" integer DEFAULT 1 NOT NULL
+    "sessionTypeId" integer DEFAULT 1 NOT NULL,
+    version integer DEFAULT 1 NOT NULL,
+    "externalHash" character varying(32)
 );
 
 
@@ -314,6 +502,20 @@ ALTER TABLE public."Shipment" OWNER TO sample_handling;
 COMMENT ON COLUMN public."Shipment"."externalId" IS 'Item ID in ISPyB';
 
 
+--
+-- Name: COLUMN "Shipment"."externalHash"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."Shipment"."externalHash" IS 'Hash of the payload last pushed to ISPyB';
+
+
+--
+-- Name: COLUMN "Shipment".version; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."Shipment".version IS 'Incremented whenever the shipment or any of its items change';
+
+
 --
 -- Name: Shipment_shipmentId_seq; Type: SEQUENCE; Schema: public; Owner: sample_handling
 --
@@ -351,7 +553,9 @@ CREATE TABLE public."TopLevelContainer" (
     comments character varying(255),
     "isInternal" boolean NOT NULL,
     "barCode" character varying(40),
-    "creationDate" timestamp with time zone DEFAULT now() NOT NULL
+    "creationDate" timestamp with time zone DEFAULT now() NOT NULL,
+    "manufacturerSerialNumber" character varying(40),
+    "externalHash" character varying(32)
 );
 
 
@@ -364,6 +568,13 @@ ALTER TABLE public."TopLevelContainer" OWNER TO sample_handling;
 COMMENT ON COLUMN public."TopLevelContainer"."externalId" IS 'Item ID in ISPyB';
 
 
+--
+-- Name: COLUMN "TopLevelContainer"."externalHash"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."TopLevelContainer"."externalHash" IS 'Hash of the payload last pushed to ISPyB';
+
+
 --
 -- Name: COLUMN "TopLevelContainer"."isInternal"; Type: COMMENT; Schema: public; Owner: sample_handling
 --
@@ -371,6 +582,13 @@ COMMENT ON COLUMN public."TopLevelContainer"."externalId" IS 'Item ID in ISPyB';
 COMMENT ON COLUMN public."TopLevelContainer"."isInternal" IS 'Whether this container is for internal facility storage use only';
 
 
+--
+-- Name: COLUMN "TopLevelContainer"."manufacturerSerialNumber"; Type: COMMENT; Schema: public; Owner: sample_handling
+--
+
+COMMENT ON COLUMN public."TopLevelContainer"."manufacturerSerialNumber" IS 'Manufacturer serial number, as registered in the dewar registry';
+
+
 --
 -- Name: TopLevelContainer_topLevelContainerId_seq; Type: SEQUENCE; Schema: public; Owner: sample_handling
 --
@@ -411,6 +629,13 @@ ALTER TABLE public.alembic_version OWNER TO sample_handling;
 ALTER TABLE ONLY public."Container" ALTER COLUMN "containerId" SET DEFAULT nextval('public."Container_containerId_seq"'::regclass);
 
 
+--
+-- Name: ExternalSyncOutbox externalSyncOutboxId; Type: DEFAULT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."ExternalSyncOutbox" ALTER COLUMN "externalSyncOutboxId" SET DEFAULT nextval('public."ExternalSyncOutbox_externalSyncOutboxId_seq"'::regclass);
+
+
 --
 -- Name: PreSession preSessionId; Type: DEFAULT; Schema: public; Owner: sample_handling
 --
@@ -418,6 +643,13 @@ ALTER TABLE ONLY public."Container" ALTER COLUMN "containerId" SET DEFAULT nextv
 ALTER TABLE ONLY public."PreSession" ALTER COLUMN "preSessionId" SET DEFAULT nextval('public."PreSession_preSessionId_seq"'::regclass);
 
 
+--
+-- Name: PushJob pushJobId; Type: DEFAULT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."PushJob" ALTER COLUMN "pushJobId" SET DEFAULT nextval('public."PushJob_pushJobId_seq"'::regclass);
+
+
 --
 -- Name: Sample sampleId; Type: DEFAULT; Schema: public; Owner: sample_handling
 --
@@ -450,94 +682,102 @@ ALTER TABLE ONLY public."TopLevelContainer" ALTER COLUMN "topLevelContainerId" S
 -- Data for Name: Container; Type: TABLE DATA; Schema: public; Owner: sample_handling
 --
 
-COPY public."Container" ("containerId", "shipmentId", "topLevelContainerId", "parentId", type, capacity, location, details, "requestedReturn", "registeredContainer", name, "externalId", comments, "isInternal", "isCurrent", "subType", "creationDate") FROM stdin;
-1	1	1	\N	puck	\N	\N	\N	f	\N	Container_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-3	1	\N	\N	falconTube	\N	\N	\N	f	\N	Container_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-341	89	\N	\N	puck	\N	\N	\N	f	\N	Container_03	10	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-4	1	\N	\N	gridBox	4	\N	\N	f	\N	Grid_Box_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-5	1	\N	\N	gridBox	4	\N	\N	f	\N	Grid_Box_03	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-2	1	\N	1	gridBox	4	\N	\N	f	\N	Grid_Box_01	\N	Test Comment!	f	f	\N	2025-01-10 08:54:42.073855+00
-712	97	171	\N	puck	16	\N	\N	f	\N	Container_03	20	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-777	117	199	\N	puck	16	\N	{}	f	\N	Puck_2	303612		f	f	\N	2025-01-10 08:54:42.073855+00
-776	117	\N	777	gridBox	4	1	{"lid": "Screw", "fibSession": false, "store": false}	f	\N	Grid_Box_1	303613		f	f	\N	2025-01-10 08:54:42.073855+00
-646	97	152	\N	puck	\N	\N	\N	f	\N	Container_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-788	117	\N	784	gridBox	4	1	{"lid": "Screw", "fibSession": false, "store": false}	f	\N	Grid_Box_2	\N		t	f	\N	2025-01-10 08:54:42.073855+00
-784	\N	\N	825	puck	12	\N	\N	f	\N	Internal_puck	\N	\N	t	f	\N	2025-01-10 08:54:42.073855+00
-825	\N	221	\N	cane	10	\N	\N	f	\N	Internal_cane	\N	\N	t	f	\N	2025-01-10 08:54:42.073855+00
-1162	\N	\N	\N	cane	10	\N	\N	f	\N	Orphan_cane	\N	\N	t	f	\N	2025-01-10 08:54:42.073855+00
-1336	204	\N	\N	puck	16	\N	\N	f	\N	Container_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-1307	204	\N	1336	gridBox	4	2	\N	f	\N	Grid_Box_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-1335	204	\N	1336	gridBox	4	3	\N	f	\N	Grid_Box_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-648	97	\N	646	gridBox	4	1	\N	f	\N	Grid_Box_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-1904	229	\N	1901	gridBox	4	1	\N	f	\N	Grid_Box_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-1901	229	720	\N	puck	4	\N	\N	f	\N	Puck_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00
-2248	\N	988	\N	puck	\N	\N	\N	f	\N	1	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00
-2249	\N	988	\N	puck	\N	\N	\N	f	\N	2	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00
-2250	\N	988	\N	puck	\N	\N	\N	f	\N	3	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00
-2251	\N	988	\N	puck	\N	\N	\N	f	\N	4	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00
-2252	\N	988	\N	puck	\N	\N	\N	f	\N	5	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00
-2254	\N	\N	2249	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2255	\N	\N	2250	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2256	\N	\N	2251	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2257	\N	\N	2252	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2258	\N	\N	2248	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2259	\N	\N	2249	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2260	\N	\N	2250	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2261	\N	\N	2251	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2262	\N	\N	2252	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2263	\N	\N	2248	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2264	\N	\N	2249	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2265	\N	\N	2250	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2266	\N	\N	2251	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2267	\N	\N	2252	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2268	\N	\N	2248	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2269	\N	\N	2249	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2270	\N	\N	2250	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2271	\N	\N	2251	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2272	\N	\N	2252	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2273	\N	\N	2248	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2274	\N	\N	2249	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2275	\N	\N	2250	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2276	\N	\N	2251	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2277	\N	\N	2252	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2278	\N	\N	2248	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2279	\N	\N	2249	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2280	\N	\N	2250	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2281	\N	\N	2251	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2282	\N	\N	2252	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2283	\N	\N	2248	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2284	\N	\N	2249	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2285	\N	\N	2250	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2286	\N	\N	2251	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2287	\N	\N	2252	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2288	\N	\N	2248	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2289	\N	\N	2249	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2290	\N	\N	2250	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2291	\N	\N	2251	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2292	\N	\N	2252	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2293	\N	\N	2248	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2294	\N	\N	2249	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2295	\N	\N	2250	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2296	\N	\N	2251	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2297	\N	\N	2252	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2298	\N	\N	2248	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2299	\N	\N	2249	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2300	\N	\N	2250	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2301	\N	\N	2251	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2302	\N	\N	2252	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2303	\N	\N	2248	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2304	\N	\N	2249	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2305	\N	\N	2250	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2306	\N	\N	2251	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2307	\N	\N	2252	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2308	\N	\N	2248	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2309	\N	\N	2249	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2310	\N	\N	2250	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2311	\N	\N	2251	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2312	\N	\N	2252	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2314	309	989	\N	puck	\N	\N	{}	f	\N	test2	372665		f	f	auto	2026-03-17 11:12:31.214055+00
-2253	\N	\N	2248	gridBox	\N	1	null	f	\N	Gridbox_1_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00
-2313	309	\N	2314	gridBox	\N	1	{"c-clip": "Anti-Clockwise (facing left with respect to notch)", "store": false}	f	\N	test	372666		f	f	auto	2026-03-17 11:12:17.496318+00
+COPY public."Container" ("containerId", "shipmentId", "topLevelContainerId", "parentId", type, capacity, location, details, "requestedReturn", "registeredContainer", name, "externalId", comments, "isInternal", "isCurrent", "subType", "creationDate", "externalHash") FROM stdin;
+1	1	1	\N	puck	\N	\N	\N	f	\N	Container_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+3	1	\N	\N	falconTube	\N	\N	\N	f	\N	Container_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+341	89	\N	\N	puck	\N	\N	\N	f	\N	Container_03	10	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+4	1	\N	\N	gridBox	4	\N	\N	f	\N	Grid_Box_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+5	1	\N	\N	gridBox	4	\N	\N	f	\N	Grid_Box_03	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+2	1	\N	1	gridBox	4	\N	\N	f	\N	Grid_Box_01	\N	Test Comment!	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+712	97	171	\N	puck	16	\N	\N	f	\N	Container_03	20	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+777	117	199	\N	puck	16	\N	{}	f	\N	Puck_2	303612		f	f	\N	2025-01-10 08:54:42.073855+00	\N
+776	117	\N	777	gridBox	4	1	{"lid": "Screw", "fibSession": false, "store": false}	f	\N	Grid_Box_1	303613		f	f	\N	2025-01-10 08:54:42.073855+00	\N
+646	97	152	\N	puck	\N	\N	\N	f	\N	Container_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+788	117	\N	784	gridBox	4	1	{"lid": "Screw", "fibSession": false, "store": false}	f	\N	Grid_Box_2	\N		t	f	\N	2025-01-10 08:54:42.073855+00	\N
+784	\N	\N	825	puck	12	\N	\N	f	\N	Internal_puck	\N	\N	t	f	\N	2025-01-10 08:54:42.073855+00	\N
+825	\N	221	\N	cane	10	\N	\N	f	\N	Internal_cane	\N	\N	t	f	\N	2025-01-10 08:54:42.073855+00	\N
+1162	\N	\N	\N	cane	10	\N	\N	f	\N	Orphan_cane	\N	\N	t	f	\N	2025-01-10 08:54:42.073855+00	\N
+1336	204	\N	\N	puck	16	\N	\N	f	\N	Container_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+1307	204	\N	1336	gridBox	4	2	\N	f	\N	Grid_Box_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+1335	204	\N	1336	gridBox	4	3	\N	f	\N	Grid_Box_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+648	97	\N	646	gridBox	4	1	\N	f	\N	Grid_Box_02	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+1904	229	\N	1901	gridBox	4	1	\N	f	\N	Grid_Box_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+1901	229	720	\N	puck	4	\N	\N	f	\N	Puck_01	\N	\N	f	f	\N	2025-01-10 08:54:42.073855+00	\N
+2248	\N	988	\N	puck	\N	\N	\N	f	\N	1	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00	\N
+2249	\N	988	\N	puck	\N	\N	\N	f	\N	2	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00	\N
+2250	\N	988	\N	puck	\N	\N	\N	f	\N	3	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00	\N
+2251	\N	988	\N	puck	\N	\N	\N	f	\N	4	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00	\N
+2252	\N	988	\N	puck	\N	\N	\N	f	\N	5	\N	\N	t	f	2	2026-03-17 11:11:37.395377+00	\N
+2254	\N	\N	2249	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2255	\N	\N	2250	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2256	\N	\N	2251	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2257	\N	\N	2252	gridBox	\N	1	\N	f	\N	Gridbox_1_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2258	\N	\N	2248	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2259	\N	\N	2249	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2260	\N	\N	2250	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2261	\N	\N	2251	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2262	\N	\N	2252	gridBox	\N	2	\N	f	\N	Gridbox_2_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2263	\N	\N	2248	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2264	\N	\N	2249	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2265	\N	\N	2250	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2266	\N	\N	2251	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2267	\N	\N	2252	gridBox	\N	3	\N	f	\N	Gridbox_3_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2268	\N	\N	2248	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2269	\N	\N	2249	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2270	\N	\N	2250	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2271	\N	\N	2251	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2272	\N	\N	2252	gridBox	\N	4	\N	f	\N	Gridbox_4_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2273	\N	\N	2248	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2274	\N	\N	2249	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2275	\N	\N	2250	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2276	\N	\N	2251	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2277	\N	\N	2252	gridBox	\N	5	\N	f	\N	Gridbox_5_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2278	\N	\N	2248	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2279	\N	\N	2249	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2280	\N	\N	2250	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2281	\N	\N	2251	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2282	\N	\N	2252	gridBox	\N	6	\N	f	\N	Gridbox_6_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2283	\N	\N	2248	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2284	\N	\N	2249	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2285	\N	\N	2250	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2286	\N	\N	2251	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2287	\N	\N	2252	gridBox	\N	7	\N	f	\N	Gridbox_7_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2288	\N	\N	2248	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2289	\N	\N	2249	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2290	\N	\N	2250	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2291	\N	\N	2251	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2292	\N	\N	2252	gridBox	\N	8	\N	f	\N	Gridbox_8_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2293	\N	\N	2248	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2294	\N	\N	2249	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2295	\N	\N	2250	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2296	\N	\N	2251	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2297	\N	\N	2252	gridBox	\N	9	\N	f	\N	Gridbox_9_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2298	\N	\N	2248	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2299	\N	\N	2249	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2300	\N	\N	2250	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2301	\N	\N	2251	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2302	\N	\N	2252	gridBox	\N	10	\N	f	\N	Gridbox_10_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2303	\N	\N	2248	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2304	\N	\N	2249	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2305	\N	\N	2250	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2306	\N	\N	2251	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2307	\N	\N	2252	gridBox	\N	11	\N	f	\N	Gridbox_11_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2308	\N	\N	2248	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2309	\N	\N	2249	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_2	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2310	\N	\N	2250	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_3	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2311	\N	\N	2251	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_4	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2312	\N	\N	2252	gridBox	\N	12	\N	f	\N	Gridbox_12_Puck_5	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2314	309	989	\N	puck	\N	\N	{}	f	\N	test2	372665		f	f	auto	2026-03-17 11:12:31.214055+00	\N
+2253	\N	\N	2248	gridBox	\N	1	null	f	\N	Gridbox_1_Puck_1	\N	\N	t	f	auto	2026-03-17 11:11:37.395377+00	\N
+2313	309	\N	2314	gridBox	\N	1	{"c-clip": "Anti-Clockwise (facing left with respect to notch)", "store": false}	f	\N	test	372666		f	f	auto	2026-03-17 11:12:17.496318+00	\N
+\.
+
+
+--
+-- Data for Name: ExternalSyncOutbox; Type: TABLE DATA; Schema: public; Owner: sample_handling
+--
+
+COPY public."ExternalSyncOutbox" ("externalSyncOutboxId", "tableName", "itemId", revision, attempts, "nextAttempt", "lastError") FROM stdin;
 \.
 
 
@@ -556,22 +796,38 @@ COPY public."PreSession" ("preSessionId", "shipmentId", details) FROM stdin;
 \.
 
 
+--
+-- Data for Name: PushJob; Type: TABLE DATA; Schema: public; Owner: sample_handling
+--
+
+COPY public."PushJob" ("pushJobId", "shipmentId", status, "creationDate", "lastUpdated", total, pushed, skipped, failed, nodes, token) FROM stdin;
+\.
+
+
 --
 -- Data for Name: Sample; Type: TABLE DATA; Schema: public; Owner: sample_handling
 --
 
-COPY public."Sample" ("sampleId", "shipmentId", "proteinId", type, location, details, "containerId", name, "externalId", comments, "subLocation", "creationDate") FROM stdin;
-2	1	4407	sample	\N	{"foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "buffer": "3", "concentration": "5", "vitrificationConditions": "", "clipped": false}	\N	Sample_02	\N	\N	\N	2025-01-10 08:54:42.073855+00
-1	1	4407	sample	1	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	2	Sample_01	\N	\N	\N	2025-01-10 08:54:42.073855+00
-336	89	4407	sample	\N	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	\N	Sample_04	10	\N	\N	2025-01-10 08:54:42.073855+00
-434	97	4407	sample	\N	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	648	Sample_04	\N	\N	\N	2025-01-10 08:54:42.073855+00
-562	118	338108	grid	\N	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	\N	3P_1	\N	\N	\N	2025-01-10 08:54:42.073855+00
-612	117	338108	grid	\N	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	788	3P_1	\N	\N	2	2025-01-10 08:54:42.073855+00
-3	1	4407	sample	1	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	4	Sample_02	6186947	\N	1	2025-01-10 08:54:42.073855+00
-561	117	338108	grid	1	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	776	3P_1	6212665	\N	1	2025-01-10 08:54:42.073855+00
-1877	229	338108	grid	1	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	1904	3P_1	\N	\N	1	2025-01-10 08:54:42.073855+00
-2580	309	338108	grid	\N	{"buffer": "", "concentration": "", "supportMaterial": "Quantifoil copper", "foil": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrificationConditions": ""}	\N	3P_1	7512479	\N	\N	2026-03-17 11:12:08.852985+00
-2581	310	338108	grid	1	{"buffer": "", "concentration": "", "supportMaterial": "Quantifoil copper", "foil": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrificationConditions": ""}	2253	3P_1	7512480	\N	\N	2026-03-17 11:15:27.385417+00
+COPY public."Sample" ("sampleId", "shipmentId", "proteinId", type, location, details, "containerId", name, "externalId", comments, "subLocation", "creationDate", "externalHash") FROM stdin;
+2	1	4407	sample	\N	{"foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "buffer": "3", "concentration": "5", "vitrificationConditions": "", "clipped": false}	\N	Sample_02	\N	\N	\N	2025-01-10 08:54:42.073855+00	\N
+1	1	4407	sample	1	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	2	Sample_01	\N	\N	\N	2025-01-10 08:54:42.073855+00	\N
+336	89	4407	sample	\N	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	\N	Sample_04	10	\N	\N	2025-01-10 08:54:42.073855+00	\N
+434	97	4407	sample	\N	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	648	Sample_04	\N	\N	\N	2025-01-10 08:54:42.073855+00	\N
+562	118	338108	grid	\N	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	\N	3P_1	\N	\N	\N	2025-01-10 08:54:42.073855+00	\N
+612	117	338108	grid	\N	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	788	3P_1	\N	\N	2	2025-01-10 08:54:42.073855+00	\N
+3	1	4407	sample	1	{"details": null, "shipmentId": 1, "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2"}	4	Sample_02	6186947	\N	1	2025-01-10 08:54:42.073855+00	\N
+561	117	338108	grid	1	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	776	3P_1	6212665	\N	1	2025-01-10 08:54:42.073855+00	\N
+1877	229	338108	grid	1	{"buffer": "", "concentration": "", "foil": "Quantifoil copper", "film": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrification": "GP2", "vitrificationConditions": ""}	1904	3P_1	\N	\N	1	2025-01-10 08:54:42.073855+00	\N
+2580	309	338108	grid	\N	{"buffer": "", "concentration": "", "supportMaterial": "Quantifoil copper", "foil": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrificationConditions": ""}	\N	3P_1	7512479	\N	\N	2026-03-17 11:12:08.852985+00	\N
+2581	310	338108	grid	1	{"buffer": "", "concentration": "", "supportMaterial": "Quantifoil copper", "foil": "Holey carbon", "mesh": "200", "hole": "R 0.6/1", "vitrificationConditions": ""}	2253	3P_1	7512480	\N	\N	2026-03-17 11:15:27.385417+00	\N
+\.
+
+
+--
+-- Data for Name: SampleNameCounter; Type: TABLE DATA; Schema: public; Owner: sample_handling
+--
+
+COPY public."SampleNameCounter" ("shipmentId", prefix, next) FROM stdin;
 \.
 
 
@@ -603,22 +859,22 @@ COPY public."SessionType" ("sessionTypeId", name, "sampleCapacity") FROM stdin;
 -- Data for Name: Shipment; Type: TABLE DATA; Schema: public; Owner: sample_handling
 --
 
-COPY public."Shipment" ("shipmentId", "creationDate", "shipmentRequest", status, name, "externalId", comments, "proposalCode", "proposalNumber", "visitNumber", "lastStatusUpdate", "sessionTypeId") FROM stdin;
-1	2024-05-02 13:12:36.528788+00	\N	\N	Shipment_01	\N	\N	cm	1	1	2025-06-09 08:29:07.995804+00	1
-2	2024-05-02 13:12:36.528788+00	\N	\N	Shipment_02	123	\N	cm	2	1	2025-06-09 08:29:07.995804+00	1
-89	2024-05-02 13:12:36.528788+00	\N	Booked	Shipment_03	256	\N	cm	2	1	2025-06-09 08:29:07.995804+00	1
-97	2024-06-26 12:55:39.211687+00	\N	\N	Shipment_04	\N	\N	cm	3	1	2025-06-09 08:29:07.995804+00	1
-106	2024-06-26 12:55:39.211687+00	\N	\N	Shipment_05	789	\N	cm	3	1	2025-06-09 08:29:07.995804+00	1
-118	2024-06-26 13:40:32.191664+00	\N	\N	2	\N	\N	bi	23047	100	2025-06-09 08:29:07.995804+00	1
-126	2024-07-15 15:35:32.472987+00	\N	\N	1	\N	\N	bi	23047	99	2025-06-09 08:29:07.995804+00	1
-204	2024-07-15 15:35:32.472987+00	\N	Created	3	\N	\N	bi	23047	99	2025-06-09 08:29:07.995804+00	1
-229	2025-01-10 08:54:23.171217+00	\N	Created	100	\N	\N	bi	23047	102	2025-06-09 08:29:07.995804+00	1
-117	2025-06-05 14:15:42.285+00	1	at facility	1	63975	\N	bi	23047	100	2025-06-05 14:15:42.285+00	1
-309	2026-03-17 11:12:00.592499+00	\N	Submitted	Derived_Session	79331	\N	bi	23047	103	2026-03-17 11:12:00.592499+00	1
-310	2026-03-17 11:15:20.507591+00	\N	Created	Imported_samples	\N	\N	bi	23047	104	2026-03-17 11:15:20.507591+00	1
-311	2026-04-28 10:54:07.193015+00	1829	Request Created	test	\N	\N	bi	23047	101	2026-04-28 10:54:07.193015+00	1
-312	2026-04-28 10:54:49.880798+00	1830	Request Created	test2	\N	\N	bi	23047	101	2026-04-28 10:54:49.880798+00	1
-313	2026-04-28 10:55:30.388573+00	\N	Submitted	test3	\N	\N	bi	23047	101	2026-04-28 10:55:30.388573+00	1
+COPY public."Shipment" ("shipmentId", "creationDate", "shipmentRequest", status, name, "externalId", comments, "proposalCode", "proposalNumber", "visitNumber", "lastStatusUpdate", "sessionTypeId", version, "externalHash") FROM stdin;
+1	2024-05-02 13:12:36.528788+00	\N	\N	Shipment_01	\N	\N	cm	1	1	2025-06-09 08:29:07.995804+00	1	1	\N
+2	2024-05-02 13:12:36.528788+00	\N	\N	Shipment_02	123	\N	cm	2	1	2025-06-09 08:29:07.995804+00	1	1	\N
+89	2024-05-02 13:12:36.528788+00	\N	Booked	Shipment_03	256	\N	cm	2	1	2025-06-09 08:29:07.995804+00	1	1	\N
+97	2024-06-26 12:55:39.211687+00	\N	\N	Shipment_04	\N	\N	cm	3	1	2025-06-09 08:29:07.995804+00	1	1	\N
+106	2024-06-26 12:55:39.211687+00	\N	\N	Shipment_05	789	\N	cm	3	1	2025-06-09 08:29:07.995804+00	1	1	\N
+118	2024-06-26 13:40:32.191664+00	\N	\N	2	\N	\N	bi	23047	100	2025-06-09 08:29:07.995804+00	1	1	\N
+126	2024-07-15 15:35:32.472987+00	\N	\N	1	\N	\N	bi	23047	99	2025-06-09 08:29:07.995804+00	1	1	\N
+204	2024-07-15 15:35:32.472987+00	\N	Created	3	\N	\N	bi	23047	99	2025-06-09 08:29:07.995804+00	1	1	\N
+229	2025-01-10 08:54:23.171217+00	\N	Created	100	\N	\N	bi	23047	102	2025-06-09 08:29:07.995804+00	1	1	\N
+117	2025-06-05 14:15:42.285+00	1	at facility	1	63975	\N	bi	23047	100	2025-06-05 14:15:42.285+00	1	1	\N
+309	2026-03-17 11:12:00.592499+00	\N	Submitted	Derived_Session	79331	\N	bi	23047	103	2026-03-17 11:12:00.592499+00	1	1	\N
+310	2026-03-17 11:15:20.507591+00	\N	Created	Imported_samples	\N	\N	bi	23047	104	2026-03-17 11:15:20.507591+00	1	1	\N
+311	2026-04-28 10:54:07.193015+00	1829	Request Created	test	\N	\N	bi	23047	101	2026-04-28 10:54:07.193015+00	1	1	\N
+312	2026-04-28 10:54:49.880798+00	1830	Request Created	test2	\N	\N	bi	23047	101	2026-04-28 10:54:49.880798+00	1	1	\N
+313	2026-04-28 10:55:30.388573+00	\N	Submitted	test3	\N	\N	bi	23047	101	2026-04-28 10:55:30.388573+00	1	1	\N
 \.
 
 
@@ -626,21 +882,21 @@ COPY public."Shipment" ("shipmentId", "creationDate", "shipmentRequest", status,
 -- Data for Name: TopLevelContainer; Type: TABLE DATA; Schema: public; Owner: sample_handling
 --
 
-COPY public."TopLevelContainer" ("topLevelContainerId", "shipmentId", details, code, type, name, "externalId", comments, "isInternal", "barCode", "creationDate") FROM stdin;
-3	2	\N	DLS-3	dewar	Dewar_03	\N	\N	f	\N	2025-01-10 08:54:42.073855+00
-61	89	\N	DLS-4	dewar	Dewar_04	10	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-2	2	\N	DLS-2	dewar	Dewar_02	\N	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-1	1	\N	DLS-1	dewar	DLS-EM-0000	\N	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-152	97	\N	DLS-4	dewar	Dewar_05	\N	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-171	106	\N	DLS-4	dewar	Dewar_06	20	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-221	\N	{}	DLS-BI-0020	dewar	DLS-BI-0020	\N		t	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-720	229	{}	DLS-BI-0020	dewar	DLS-BI-0020	\N		f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-199	117	{}	DLS-BI-0020	dewar	DLS-BI-0020	80365		f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00
-988	\N	\N	Inventory_Dewar	dewar	Inventory_Dewar	\N	\N	t	\N	2026-03-17 11:11:37.395377+00
-989	309	{}	DLS-BI-0022	dewar	DLS-BI-0022	88962		f	bi23047-103-m06-0000989	2026-03-17 11:12:39.677754+00
-990	311	{}	DLS-BI-1125	dewar	DLS-BI-1125	89901		f	bi23047-101-m05-0000990	2026-04-28 10:54:13.389735+00
-991	312	{}	DLS-BI-0020	dewar	DLS-BI-0020	89902		f	bi23047-101-m05-0000991	2026-04-28 10:54:55.06228+00
-992	313	{}	DLS-MX-0735	dewar	DLS-MX-0735	89903		f	bi23047-101-m05-0000992	2026-04-28 10:55:35.915618+00
+COPY public."TopLevelContainer" ("topLevelContainerId", "shipmentId", details, code, type, name, "externalId", comments, "isInternal", "barCode", "creationDate", "manufacturerSerialNumber", "externalHash") FROM stdin;
+3	2	\N	DLS-3	dewar	Dewar_03	\N	\N	f	\N	2025-01-10 08:54:42.073855+00	\N	\N
+61	89	\N	DLS-4	dewar	Dewar_04	10	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+2	2	\N	DLS-2	dewar	Dewar_02	\N	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+1	1	\N	DLS-1	dewar	DLS-EM-0000	\N	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+152	97	\N	DLS-4	dewar	Dewar_05	\N	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+171	106	\N	DLS-4	dewar	Dewar_06	20	\N	f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+221	\N	{}	DLS-BI-0020	dewar	DLS-BI-0020	\N		t	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+720	229	{}	DLS-BI-0020	dewar	DLS-BI-0020	\N		f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+199	117	{}	DLS-BI-0020	dewar	DLS-BI-0020	80365		f	1100af88-2e0b-46a7-93f9-2737a0b23d0c	2025-01-10 08:54:42.073855+00	\N	\N
+988	\N	\N	Inventory_Dewar	dewar	Inventory_Dewar	\N	\N	t	\N	2026-03-17 11:11:37.395377+00	\N	\N
+989	309	{}	DLS-BI-0022	dewar	DLS-BI-0022	88962		f	bi23047-103-m06-0000989	2026-03-17 11:12:39.677754+00	\N	\N
+990	311	{}	DLS-BI-1125	dewar	DLS-BI-1125	89901		f	bi23047-101-m05-0000990	2026-04-28 10:54:13.389735+00	\N	\N
+991	312	{}	DLS-BI-0020	dewar	DLS-BI-0020	89902		f	bi23047-101-m05-0000991	2026-04-28 10:54:55.06228+00	\N	\N
+992	313	{}	DLS-MX-0735	dewar	DLS-MX-0735	89903		f	bi23047-101-m05-0000992	2026-04-28 10:55:35.915618+00	\N	\N
 \.
 
 
@@ -660,6 +916,13 @@ c5d0b0fbc1e4
 SELECT pg_catalog.setval('public."Container_containerId_seq"', 2314, true);
 
 
+--
+-- Name: ExternalSyncOutbox_externalSyncOutboxId_seq; Type: SEQUENCE SET; Schema: public; Owner: sample_handling
+--
+
+SELECT pg_catalog.setval('public."ExternalSyncOutbox_externalSyncOutboxId_seq"', 1, false);
+
+
 --
 -- Name: PreSession_preSessionId_seq; Type: SEQUENCE SET; Schema: public; Owner: sample_handling
 --
@@ -667,6 +930,13 @@ SELECT pg_catalog.setval('public."Container_containerId_seq"', 2314, true);
 SELECT pg_catalog.setval('public."PreSession_preSessionId_seq"', 432, true);
 
 
+--
+-- Name: PushJob_pushJobId_seq; Type: SEQUENCE SET; Schema: public; Owner: sample_handling
+--
+
+SELECT pg_catalog.setval('public."PushJob_pushJobId_seq"', 1, false);
+
+
 --
 -- Name: Sample_sampleId_seq; Type: SEQUENCE SET; Schema: public; Owner: sample_handling
 --
@@ -727,6 +997,22 @@ ALTER TABLE ONLY public."Container"
     ADD CONSTRAINT "Container_unique_name" UNIQUE (name, "shipmentId");
 
 
+--
+-- Name: ExternalSyncOutbox ExternalSyncOutbox_pkey; Type: CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."ExternalSyncOutbox"
+    ADD CONSTRAINT "ExternalSyncOutbox_pkey" PRIMARY KEY ("externalSyncOutboxId");
+
+
+--
+-- Name: ExternalSyncOutbox ExternalSyncOutbox_unique_item; Type: CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."ExternalSyncOutbox"
+    ADD CONSTRAINT "ExternalSyncOutbox_unique_item" UNIQUE ("tableName", "itemId");
+
+
 --
 -- Name: PreSession PreSession_pkey; Type: CONSTRAINT; Schema: public; Owner: sample_handling
 --
@@ -735,6 +1021,14 @@ ALTER TABLE ONLY public."PreSession"
     ADD CONSTRAINT "PreSession_pkey" PRIMARY KEY ("preSessionId");
 
 
+--
+-- Name: PushJob PushJob_pkey; Type: CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."PushJob"
+    ADD CONSTRAINT "PushJob_pkey" PRIMARY KEY ("pushJobId");
+
+
 --
 -- Name: Sample Sample_externalId_key; Type: CONSTRAINT; Schema: public; Owner: sample_handling
 --
@@ -767,6 +1061,22 @@ ALTER TABLE ONLY public."Sample"
     ADD CONSTRAINT "Sample_unique_sublocation" UNIQUE ("subLocation", "shipmentId");
 
 
+--
+-- Name: Session Session_pkey; Type: CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."Session"
+    ADD CONSTRAINT "Session_pkey" PRIMARY KEY ("sessionId");
+
+
+--
+-- Name: Session Session_unique_reference; Type: CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."Session"
+    ADD CONSTRAINT "Session_unique_reference" UNIQUE ("proposalCode", "proposalNumber", "visitNumber");
+
+
 --
 -- Name: SessionType SessionType_pkey; Type: CONSTRAINT; Schema: public; Owner: sample_handling
 --
@@ -823,6 +1133,14 @@ ALTER TABLE ONLY public.alembic_version
     ADD CONSTRAINT alembic_version_pkc PRIMARY KEY (version_num);
 
 
+--
+-- Name: SampleNameCounter SampleNameCounter_pkey; Type: CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."SampleNameCounter"
+    ADD CONSTRAINT "SampleNameCounter_pkey" PRIMARY KEY ("shipmentId", prefix);
+
+
 --
 -- Name: SampleParentChild parent_child_pk; Type: CONSTRAINT; Schema: public; Owner: sample_handling
 --
@@ -831,6 +1149,13 @@ ALTER TABLE ONLY public."SampleParentChild"
     ADD CONSTRAINT parent_child_pk PRIMARY KEY ("parentId", "childId");
 
 
+--
+-- Name: PushJob_unique_active_shipment; Type: INDEX; Schema: public; Owner: sample_handling
+--
+
+CREATE UNIQUE INDEX "PushJob_unique_active_shipment" ON public."PushJob" USING btree ("shipmentId") WHERE ((status)::text = ANY ((ARRAY['Queued'::character varying, 'Running'::character varying])::text[]));
+
+
 --
 -- Name: ix_Container_containerId; Type: INDEX; Schema: public; Owner: sample_handling
 --
@@ -852,6 +1177,13 @@ CREATE INDEX "ix_Container_shipmentId" ON public."Container" USING btree ("shipm
 CREATE INDEX "ix_Container_topLevelContainerId" ON public."Container" USING btree ("topLevelContainerId");
 
 
+--
+-- Name: ix_ExternalSyncOutbox_nextAttempt; Type: INDEX; Schema: public; Owner: sample_handling
+--
+
+CREATE INDEX "ix_ExternalSyncOutbox_nextAttempt" ON public."ExternalSyncOutbox" USING btree ("nextAttempt");
+
+
 --
 -- Name: ix_PreSession_preSessionId; Type: INDEX; Schema: public; Owner: sample_handling
 --
@@ -866,6 +1198,20 @@ CREATE INDEX "ix_PreSession_preSessionId" ON public."PreSession" USING btree ("p
 CREATE UNIQUE INDEX "ix_PreSession_shipmentId" ON public."PreSession" USING btree ("shipmentId");
 
 
+--
+-- Name: ix_PushJob_shipmentId; Type: INDEX; Schema: public; Owner: sample_handling
+--
+
+CREATE INDEX "ix_PushJob_shipmentId" ON public."PushJob" USING btree ("shipmentId");
+
+
+--
+-- Name: ix_PushJob_status; Type: INDEX; Schema: public; Owner: sample_handling
+--
+
+CREATE INDEX "ix_PushJob_status" ON public."PushJob" USING btree (status);
+
+
 --
 -- Name: ix_SampleParentChild_childId; Type: INDEX; Schema: public; Owner: sample_handling
 --
@@ -989,6 +1335,22 @@ ALTER TABLE ONLY public."PreSession"
     ADD CONSTRAINT "PreSession_shipmentId_fkey" FOREIGN KEY ("shipmentId") REFERENCES public."Shipment"("shipmentId");
 
 
+--
+-- Name: PushJob PushJob_shipmentId_fkey; Type: FK CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."PushJob"
+    ADD CONSTRAINT "PushJob_shipmentId_fkey" FOREIGN KEY ("shipmentId") REFERENCES public."Shipment"("shipmentId");
+
+
+--
+-- Name: SampleNameCounter SampleNameCounter_shipmentId_fkey; Type: FK CONSTRAINT; Schema: public; Owner: sample_handling
+--
+
+ALTER TABLE ONLY public."SampleNameCounter"
+    ADD CONSTRAINT "SampleNameCounter_shipmentId_fkey" FOREIGN KEY ("shipmentId") REFERENCES public."Shipment"("shipmentId");
+
+
 --
 -- Name: SampleParentChild SampleParentChild_childId_fkey; Type: FK CONSTRAINT; Schema: public; Owner: sample_handling
 --
@@ -1,7 +1,6 @@
 from json import JSONDecodeError
-from typing import List, TypeVar
+from typing import Any, List, TypeVar
 
-import requests
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials
 from jwt import InvalidAlgorithmError, InvalidAudienceError
@@ -17,15 +16,37 @@ from ..models.inner_db.tables import (
     Shipment,
     TopLevelContainer,
 )
-from ..utils.auth import check_em_staff, decode_jwt, is_admin
+from ..utils.auth import check_em_staff, decode_jwt, get_token_ttl, hash_token, is_admin
+from ..utils.cache import TTLCache
 from ..utils.config import Config
 from ..utils.database import inner_db
+from ..utils.external import ExternalRequest
 from .template import GenericPermissions
 
 T = TypeVar("T")
 
+permission_cache: TTLCache[tuple[str, str, str], tuple[int, str | None]] = TTLCache(
+    max_size=Config.cache.permission_max_size, ttl=Config.cache.permission_grant_ttl
+)
+
+user_cache: TTLCache[str, dict[str, Any]] = TTLCache(max_size=Config.cache.user_max_size, ttl=Config.cache.user_ttl)
+
 
 def _get_user(token: str):
+    cache_key = hash_token(token)
+    user = user_cache.get(cache_key)
+
+    if user is None:
+        user = _resolve_user(token)
+        ttl = get_token_ttl(token, Config.cache.user_ttl)
+
+        if ttl > 0:
+            user_cache.set(cache_key, user, ttl=ttl)
+
+    return user
+
+
+def _resolve_user(token: str) -> dict[str, Any]:
     try:
         # TODO: replace this once something more permanent becomes available
         user = decode_jwt(token, "scaup_general")
@@ -41,10 +62,7 @@ def _get_user(token: str):
             "email": "",
         }
     except (InvalidAudienceError, InvalidAlgorithmError):
-        response = requests.get(
-            Config.auth.endpoint + "/user",
-            headers={"Authorization": f"Bearer {token}"},
-        )
+        response = ExternalRequest.request(token, base_url=Config.auth.endpoint, url="/user")
 
         if response.status_code != 200:
             try:
@@ -76,24 +94,43 @@ def _check_perms(data_id: T, endpoint: str, token: str) -> T:
 
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Provided JWT lacks permissions")
     except (InvalidAudienceError, InvalidAlgorithmError):
-        response = requests.get(
-            "".join(
-                [
-                    Config.auth.endpoint,
-                    "/permission/",
-                    endpoint,
-                    "/",
-                    str(data_id) if endpoint != "proposal" else str(data_id) + "/inSessions",
-                ]
-            ),
-            headers={"Authorization": f"Bearer {token}"},
-        )
-
-        if response.status_code != 200:
-            detail = response.json().get("detail")
-            app_logger.error(f"Microauth returned {response.status_code}: {detail}")
-
-            raise HTTPException(status_code=response.status_code, detail=detail)
+        cache_key = (hash_token(token), endpoint, str(data_id))
+        cached_decision = permission_cache.get(cache_key)
+
+        if cached_decision is None:
+            response = ExternalRequest.request(
+                token,
+                base_url=Config.auth.endpoint,
+                url="".join(
+                    [
+                        "/permission/",
+                        endpoint,
+                        "/",
+                        str(data_id) if endpoint != "proposal" else str(data_id) + "/inSessions",
+                    ]
+                ),
+            )
+
+            if response.status_code == 200:
+                cached_decision = (200, None)
+                ttl = get_token_ttl(token, Config.cache.permission_grant_ttl)
+
+                if ttl > 0:
+                    permission_cache.set(cache_key, cached_decision, ttl=ttl)
+            else:
+                detail = response.json().get("detail")
+                app_logger.error(f"Microauth returned {response.status_code}: {detail}")
+
+                cached_decision = (response.status_code, detail)
+
+                # Only cache definitive denials, not transient upstream failures
+                if response.status_code in (status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND):
+                    permission_cache.set(cache_key, cached_decision, ttl=Config.cache.permission_deny_ttl)
+
+        status_code, detail = cached_decision
+
+        if status_code != 200:
+            raise HTTPException(status_code=status_code, detail=detail)
 
         return data_id
 
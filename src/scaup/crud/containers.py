@@ -8,7 +8,7 @@ from sqlalchemy.orm import aliased
 
 from ..models.containers import ContainerIn, ContainerOut, OptionalContainer
 from ..models.inner_db.tables import Container, Sample, Shipment
-from ..utils.crud import assert_not_booked, edit_item
+from ..utils.crud import assert_not_booked, bump_shipment_versions, edit_item, get_related_shipments
 from ..utils.database import inner_db
 from ..utils.session import retry_if_exists
 
@@ -24,10 +24,30 @@ def create_container(params: ContainerIn, shipmentId: int | None = None):
         {"shipmentId": shipmentId, **params.model_dump(exclude_unset=True)},
     )
 
+    bump_shipment_versions(get_related_shipments(Container, container.id))
+
     inner_db.session.commit()
     return container
 
 
+def get_container_validator(container_id: int) -> int | None:
+    """Get cheap validator for container. Internal containers' storage location depends on the rest of the
+    storage tree, so only containers in shipments have one
+
+    Args:
+        container_id: Container ID
+
+    Returns:
+        Shipment version, or None if no validator is available
+    """
+    return inner_db.session.scalar(
+        select(Shipment.version)
+        .select_from(Container)
+        .join(Shipment)
+        .filter(Container.id == container_id, Container.isInternal.is_not(True))
+    )
+
+
 def get_container(container_id: int):
     container = inner_db.session.scalar(select(Container).filter(Container.id == container_id))
     validated_container = ContainerOut.model_validate(container)
@@ -134,6 +154,6 @@ def update_container(
         values = {"shipmentId": parameters.shipmentId}
         inner_db.session.execute(update(Sample).filter(Sample.containerId == container_id).values(values))
 
-    new_container = edit_item(Container, parameters, container_id, token)
+    new_container = edit_item(Container, parameters, container_id)
 
     return new_container
@@ -1,11 +1,9 @@
 from sqlalchemy import insert, select
-from sqlalchemy.orm import joinedload
 
 from ..models.inner_db.tables import Container, TopLevelContainer
-from ..models.shipments import ShipmentChildren
 from ..models.top_level_containers import TopLevelContainerOut
 from ..utils.database import inner_db
-from ..utils.query import query_result_to_object
+from ..utils.query import get_generic_children, query_result_to_object, serialise_generic_tree
 from ..utils.session import retry_if_exists
 
 
@@ -22,20 +20,14 @@ def get_unassigned(limit: int, page: int):
 
 
 def get_internal_container_tree(top_level_container_id: int):
-    raw_data = (
-        inner_db.session.execute(
-            select(TopLevelContainer)
-            .filter(TopLevelContainer.id == top_level_container_id)
-            .options(joinedload(TopLevelContainer.children).joinedload(Container.children))
-        )
-        .unique()
-        .scalar_one()
-    )
+    raw_data = inner_db.session.execute(
+        select(TopLevelContainer).filter(TopLevelContainer.id == top_level_container_id)
+    ).scalar_one()
 
-    return ShipmentChildren(
+    return serialise_generic_tree(
         id=top_level_container_id,
         name=raw_data.name,
-        children=query_result_to_object(raw_data.children),
+        children=get_generic_children([top_level_container_id]).get(top_level_container_id, []),
         data=TopLevelContainerOut.model_validate(raw_data, from_attributes=True).model_dump(mode="json"),
     )
 
@@ -34,6 +34,7 @@ from ..utils.config import Config
 from ..utils.database import inner_db
 from ..utils.external import ExternalRequest
 from ..utils.generic import pascal_to_title
+from ..utils.session import get_mirrored_session
 
 headings_style = FontFace(emphasis=None)
 bold_style = FontFace(emphasis="BOLD")
@@ -316,12 +317,15 @@ def get_shipping_labels(shipment_id: int, token: str):
             detail="No top level containers in shipment",
         )
 
-    expeye_response = ExternalRequest.request(
-        token=token,
-        url=f"/proposals/{data[0].proposalCode}{data[0].proposalNumber}/sessions/{data[0].visitNumber}",
-    )
+    current_session = get_mirrored_session(data[0].proposalCode, data[0].proposalNumber, data[0].visitNumber)
+
+    if current_session is None:
+        expeye_response = ExternalRequest.request(
+            token=token,
+            url=f"/proposals/{data[0].proposalCode}{data[0].proposalNumber}/sessions/{data[0].visitNumber}",
+        )
 
-    current_session = expeye_response.json()
+        current_session = expeye_response.json()
 
     # Microauth should have already checked that the session exists
     assert "beamLineName" in current_session
@@ -426,18 +430,21 @@ class ReportPDF(BaseReportPDF):
 def generate_report(shipment_id: int, token: str):
     shipment = inner_db.session.scalar(select(Shipment).filter(Shipment.id == shipment_id))
 
-    expeye_response = ExternalRequest.request(
-        token=token,
-        url=f"/proposals/{shipment.proposalCode}{shipment.proposalNumber}/sessions/{shipment.visitNumber}",
-    )
+    ispyb_session = get_mirrored_session(shipment.proposalCode, shipment.proposalNumber, shipment.visitNumber)
 
-    if expeye_response.status_code != 200:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Session not found",
+    if ispyb_session is None:
+        expeye_response = ExternalRequest.request(
+            token=token,
+            url=f"/proposals/{shipment.proposalCode}{shipment.proposalNumber}/sessions/{shipment.visitNumber}",
         )
 
-    ispyb_session = expeye_response.json()
+        if expeye_response.status_code != 200:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Session not found",
+            )
+
+        ispyb_session = expeye_response.json()
 
     local_contacts = (
         "Unknown" if not ispyb_session["beamLineOperator"] else ", ".join(ispyb_session["beamLineOperator"])
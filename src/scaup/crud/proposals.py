@@ -2,7 +2,7 @@ from typing import List
 
 from fastapi import HTTPException, status
 from lims_utils.models import Paged, ProposalReference
-from sqlalchemy import insert, select
+from sqlalchemy import func, insert, select
 from sqlalchemy.exc import MultipleResultsFound
 
 from ..models.inner_db.tables import Sample, SessionType, Shipment
@@ -10,7 +10,8 @@ from ..models.samples import SublocationAssignment
 from ..models.shipments import ShipmentIn
 from ..utils.crud import assign_dcg_to_sublocation
 from ..utils.database import inner_db
-from ..utils.external import update_shipment_statuses
+from ..utils.external import ExternalRequest
+from .samples import cache_proteins
 
 
 def create_shipment(proposal_reference: ProposalReference, params: ShipmentIn):
@@ -35,19 +36,59 @@ def create_shipment(proposal_reference: ProposalReference, params: ShipmentIn):
     return new_shipment
 
 
-def get_shipments(token: str, proposal_reference: ProposalReference, limit: int, page: int):
-    query = select(Shipment).filter(
+def get_proposal_data(proposal_reference: str, token: str):
+    """Get lab data for the proposal from ISPyB. Proteins are added to the protein cache, since the data is
+    usually requested right before samples are created
+
+    Args:
+        proposal_reference: Proposal reference
+        token: User token
+
+    Returns:
+        Proposal data, as returned by ISPyB"""
+    response = ExternalRequest.request(token=token, url=f"/proposals/{proposal_reference}/data")
+    data = response.json()
+
+    if response.status_code == 200:
+        cache_proteins(data.get("proteins") or [], token)
+
+    return data
+
+
+def _filter_shipments(query, proposal_reference: ProposalReference):
+    query = query.filter(
         Shipment.proposalCode == proposal_reference.code,
         Shipment.proposalNumber == proposal_reference.number,
     )
 
     if proposal_reference.visit_number:
         query = query.filter(Shipment.visitNumber == proposal_reference.visit_number)
-    else:
+
+    return query
+
+
+def get_shipments_validator(proposal_reference: ProposalReference):
+    """Get cheap validator for shipments in a proposal/session. Shipments are never deleted, and every change
+    to a shipment bumps its version, so the shipment count and sum of versions change whenever the list does
+
+    Args:
+        proposal_reference: Proposal reference, with optional visit number
+
+    Returns:
+        Tuple of shipment count and sum of shipment versions
+    """
+    query = select(func.count(Shipment.id), func.coalesce(func.sum(Shipment.version), 0))
+
+    return tuple(inner_db.session.execute(_filter_shipments(query, proposal_reference)).one())
+
+
+def get_shipments(proposal_reference: ProposalReference, limit: int, page: int):
+    query = _filter_shipments(select(Shipment), proposal_reference)
+
+    if not proposal_reference.visit_number:
         query = query.order_by(Shipment.visitNumber.desc(), Shipment.creationDate.desc())
 
     shipments: Paged[Shipment] = inner_db.paginate(query, limit, page, slow_count=False, scalar=False)
-    shipments.items = update_shipment_statuses(shipments.items, token)
 
     return shipments
 
@@ -1,52 +1,152 @@
+import asyncio
 import re
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Iterable
 
+import httpx
+import requests
+from anyio import from_thread
 from fastapi import HTTPException, status
 from lims_utils.logging import app_logger
 from lims_utils.models import Paged, ProposalReference
 from psycopg.errors import ForeignKeyViolation
-from sqlalchemy import and_, insert, select
+from sqlalchemy import and_, literal_column, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
-from ..models.inner_db.tables import Container, Sample, SampleParentChild, Shipment
+from ..models.inner_db.tables import Container, Sample, SampleNameCounter, SampleParentChild, Shipment
 from ..models.samples import OptionalSample, SampleIn, SampleOut
+from ..utils.auth import get_token_ttl, hash_token
+from ..utils.cache import TTLCache
 from ..utils.config import Config
-from ..utils.crud import assert_not_booked, delete_item, edit_item
+from ..utils.crud import assert_not_booked, bump_shipment_versions, delete_item, edit_item, get_related_shipments
 from ..utils.database import inner_db
-from ..utils.external import Expeye, ExternalRequest
+from ..utils.external import AsyncExternalRequest, Expeye, ExternalRequest
 from ..utils.session import retry_if_exists
 
+# Bounds the number of samples pushed to ISPyB and inserted by a single request, enough for a 96-grid batch
+MAX_BULK_SAMPLES = 96
 
-def _get_protein(proteinId: int, token):
-    upstream_compound = ExternalRequest.request(token=token, url=f"/proteins/{proteinId}")
 
-    if upstream_compound.status_code != 200:
-        app_logger.error(
-            "Error from Expeye with code %i while checking macromolecule %s: %s",
-            upstream_compound.status_code,
-            proteinId,
-            upstream_compound.text,
-        )
+@dataclass
+class CachedProtein:
+    # None if the protein does not exist, or the user cannot access it
+    name: str | None
+
+
+# Proteins can't be changed once registered, but access to them depends on the user, so entries are per token
+protein_cache: TTLCache[tuple[str, int], CachedProtein] = TTLCache(
+    max_size=Config.cache.protein_max_size, ttl=Config.cache.protein_ttl
+)
+
+
+def _cache_protein(token: str, protein_id: int, protein: CachedProtein, ttl: float):
+    ttl = get_token_ttl(token, ttl)
+
+    if ttl > 0:
+        protein_cache.set((hash_token(token), protein_id), protein, ttl=ttl)
+
+
+def cache_proteins(proteins: list[dict[str, Any]], token: str):
+    """Add proteins listed by ISPyB to the protein cache, so that samples can be created from them without
+    looking them up again
+
+    Args:
+        proteins: Protein records, as returned by ISPyB
+        token: User token the proteins were retrieved with"""
+    for protein in proteins:
+        if protein.get("proteinId") is not None and protein.get("name") is not None:
+            _cache_protein(token, protein["proteinId"], CachedProtein(name=protein["name"]), Config.cache.protein_ttl)
+
+
+def _parse_protein_response(response: requests.Response | httpx.Response, proteinId: int, token: str) -> str:
+    if response.status_code == 200:
+        name = response.json()["name"]
+        _cache_protein(token, proteinId, CachedProtein(name=name), Config.cache.protein_ttl)
+        return name
+
+    app_logger.error(
+        "Error from Expeye with code %i while checking macromolecule %s: %s",
+        response.status_code,
+        proteinId,
+        response.text,
+    )
+
+    # Only cache definitive answers, not transient upstream failures
+    if response.status_code in (status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND):
+        _cache_protein(token, proteinId, CachedProtein(name=None), Config.cache.protein_deny_ttl)
+
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND,
+        detail="Invalid sample compound/protein provided",
+    )
+
+
+def _get_cached_protein(proteinId: int, token: str) -> str | None:
+    cached_protein = protein_cache.get((hash_token(token), proteinId))
+
+    if cached_protein is None:
+        return None
+
+    if cached_protein.name is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid sample compound/protein provided",
         )
 
-    return upstream_compound.json()
+    return cached_protein.name
 
 
-@assert_not_booked
-@retry_if_exists
-def create_sample(
-    shipmentId: int,
-    params: SampleIn,
-    token: str,
-    push_to_external_db: bool = False,
-    include_suffix: bool = True,
-):
-    upstream_compound = _get_protein(params.proteinId, token)
+def _get_protein(proteinId: int, token: str):
+    """Get protein name, checking that it exists and that the user can access it
 
-    clean_name = upstream_compound["name"].replace(" ", "_")
-    clean_name = re.sub(r"[^a-zA-Z0-9_]", "", clean_name)
+    Args:
+        proteinId: Protein ID
+        token: User token
+
+    Returns:
+        Protein name"""
+    if (name := _get_cached_protein(proteinId, token)) is not None:
+        return name
+
+    return _parse_protein_response(ExternalRequest.request(token=token, url=f"/proteins/{proteinId}"), proteinId, token)
+
+
+async def _get_proteins(protein_ids: Iterable[int], token: str) -> dict[int, str]:
+    """Get protein names, requesting each protein not already cached only once, concurrently
+
+    Args:
+        protein_ids: Protein IDs, may contain duplicates
+        token: User token
+
+    Returns:
+        Protein names, indexed by protein ID"""
+    unique_ids = sorted(set(protein_ids))
+    semaphore = asyncio.Semaphore(Config.upstream.max_concurrency)
+
+    async def get_protein(protein_id: int):
+        if (name := _get_cached_protein(protein_id, token)) is not None:
+            return name
+
+        async with semaphore:
+            response = await AsyncExternalRequest.request(token=token, url=f"/proteins/{protein_id}")
+
+        return _parse_protein_response(response, protein_id, token)
+
+    return dict(zip(unique_ids, await asyncio.gather(*[get_protein(protein_id) for protein_id in unique_ids])))
+
+
+def _get_next_sample_number(shipmentId: int, clean_name: str) -> int:
+    """Get next ordinal suffix from the names of existing samples in the shipment. Only used to seed the
+    counter the first time a prefix is used in a shipment, since it requires scanning the shipment's samples
+
+    Args:
+        shipmentId: Shipment ID
+        clean_name: Sample name prefix
+
+    Returns:
+        Next ordinal suffix"""
     last_sample = inner_db.session.scalar(
         select(Sample.name)
         .filter(Sample.shipmentId == shipmentId, Sample.name.like(clean_name + "%"))
@@ -55,63 +155,225 @@ def create_sample(
     )
 
     if last_sample is None:
-        sample_count = 1
-    else:
-        sample_number = last_sample.split("_")[-1]
-        if not sample_number.isdigit():
-            sample_count = 1
-        else:
-            sample_count = int(sample_number) + 1
+        return 1
 
-    if not (params.name):
-        params.name = clean_name
-    else:
-        # Prefix with compound name regardless
-        if not params.name.startswith(clean_name):
-            params.name = f"{clean_name}_{params.name}"
+    sample_number = last_sample.split("_")[-1]
+    return int(sample_number) + 1 if sample_number.isdigit() else 1
 
-    if params.copies and params.copies > 12:
-        raise HTTPException(
-            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
-            detail="Too many sample copies requested",
+
+def _reserve_sample_numbers(shipmentId: int, clean_name: str, count: int) -> int:
+    """Atomically reserve consecutive ordinal suffixes for samples with the same prefix in a shipment
+
+    Args:
+        shipmentId: Shipment ID
+        clean_name: Sample name prefix
+        count: Number of suffixes to reserve
+
+    Returns:
+        First reserved suffix"""
+    first_number = inner_db.session.scalar(
+        update(SampleNameCounter)
+        .filter(SampleNameCounter.shipmentId == shipmentId, SampleNameCounter.prefix == clean_name)
+        .values(next=SampleNameCounter.next + count)
+        .returning(SampleNameCounter.next - count)
+    )
+
+    if first_number is None:
+        # Another request may create the counter between the update and the insert, in which case it is
+        # incremented instead
+        first_number = inner_db.session.scalar(
+            insert(SampleNameCounter)
+            .values(
+                shipmentId=shipmentId,
+                prefix=clean_name,
+                next=_get_next_sample_number(shipmentId, clean_name) + count,
+            )
+            .on_conflict_do_update(
+                index_elements=[SampleNameCounter.shipmentId, SampleNameCounter.prefix],
+                set_={"next": SampleNameCounter.next + count},
+            )
+            .returning(SampleNameCounter.next - count)
+        )
+
+    return first_number
+
+
+@retry_if_exists
+def _insert_samples(shipmentId: int, samples_json: list[dict[str, Any]], specs: list[SampleIn]):
+    """Insert samples with a single multi-row statement, and link them to their parents
+
+    Args:
+        shipmentId: Shipment ID
+        samples_json: Sample columns, grouped by spec, in the same order as the specs
+        specs: Sample specs the samples were created from
+
+    Returns:
+        Created samples"""
+    # Every row in a multi-row insert must have the same columns, so columns that were not set use their default
+    columns = set().union(*samples_json)
+    rows = [
+        {column: sample_json.get(column, literal_column("DEFAULT")) for column in columns}
+        for sample_json in samples_json
+    ]
+
+    # Rows are returned in the order they were provided in
+    samples = inner_db.session.scalars(insert(Sample).returning(Sample).values(rows)).all()
+
+    parent_links: list[dict[str, int]] = []
+    related_shipments = {shipmentId}
+    offset = 0
+
+    for spec in specs:
+        spec_samples = samples[offset : offset + spec.copies]
+        offset += spec.copies
+
+        parent_links.extend(
+            {"childId": child.id, "parentId": parent} for child in spec_samples for parent in spec.parents or []
         )
 
-    # This is because of ISPyB - it does not allow sample names longer than 45 characters, and we add a suffix of at
-    # least 2 characters for duplicates
-    if params.name and len(params.name) > 43:
+        # All copies share the same container and parents, so checking the first sample is enough
+        related_shipments.update(get_related_shipments(Sample, spec_samples[0].id))
+
+    if parent_links:
+        inner_db.session.execute(insert(SampleParentChild), parent_links)
+
+    bump_shipment_versions(related_shipments)
+
+    inner_db.session.commit()
+    return samples
+
+
+async def _push_samples(samples_json: list[dict[str, Any]]):
+    """Push samples to ISPyB as orphan samples concurrently, and add their external IDs and payload hashes
+    to their columns
+
+    Args:
+        samples_json: Sample columns"""
+    semaphore = asyncio.Semaphore(Config.upstream.max_concurrency)
+
+    async def push(sample_json: dict[str, Any]):
+        sample = Sample(**sample_json)
+
+        async with semaphore:
+            ext_sample = await Expeye.async_upsert(Config.ispyb_api.jwt, sample, None)
+
+        sample_json["externalId"] = ext_sample["externalId"]
+        sample_json["externalHash"] = sample.externalHash
+
+    await asyncio.gather(*[push(sample_json) for sample_json in samples_json])
+
+
+@assert_not_booked
+def create_samples(
+    shipmentId: int,
+    specs: list[SampleIn],
+    token: str,
+    push_to_external_db: bool = False,
+    include_suffix: bool = True,
+):
+    """Create samples in bulk. Each protein is only looked up once, samples are pushed to ISPyB concurrently
+    if requested, and all samples are inserted with a single statement. Database work runs in the calling
+    worker thread, and only upstream requests are run on the event loop
+
+    Args:
+        shipmentId: Shipment ID
+        specs: Sample specs, each of which may request multiple copies
+        token: User token
+        push_to_external_db: Push samples to ISPyB as orphan samples
+        include_suffix: Append ordinal suffix to sample names
+
+    Returns:
+        Created samples"""
+    total = sum(spec.copies for spec in specs)
+
+    if total > MAX_BULK_SAMPLES:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Combination of macromolecule prefix and name must not be longer than 43 characters.",
+            detail=f"No more than {MAX_BULK_SAMPLES} samples can be created at once",
         )
 
-    samples_json = [
-        {
-            "shipmentId": shipmentId,
-            **params.model_dump(exclude_unset=True, exclude={"copies", "parents"}),
-            "name": (f"{params.name}_{i + sample_count}" if include_suffix else params.name),
-        }
-        for i in range(params.copies)
-    ]
+    proteins = from_thread.run(_get_proteins, [spec.proteinId for spec in specs], token)
+
+    clean_names: list[str] = []
+    suffix_counts: Counter[str] = Counter()
+
+    for spec in specs:
+        clean_name = proteins[spec.proteinId].replace(" ", "_")
+        clean_name = re.sub(r"[^a-zA-Z0-9_]", "", clean_name)
+        clean_names.append(clean_name)
+
+        if not (spec.name):
+            spec.name = clean_name
+        else:
+            # Prefix with compound name regardless
+            if not spec.name.startswith(clean_name):
+                spec.name = f"{clean_name}_{spec.name}"
+
+        # This is because of ISPyB - it does not allow sample names longer than 45 characters, and we add a suffix of
+        # at least 2 characters for duplicates
+        if len(spec.name) > 43:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Combination of macromolecule prefix and name must not be longer than 43 characters.",
+            )
+
+        if include_suffix:
+            suffix_counts[clean_name] += spec.copies
+
+    # Samples of the same macromolecule share the same ordinal suffix sequence, even across specs. Suffixes are
+    # committed straight away, so that concurrent requests don't wait on the counter while samples are pushed
+    next_numbers = {
+        clean_name: _reserve_sample_numbers(shipmentId, clean_name, count)
+        for clean_name, count in suffix_counts.items()
+    }
+    inner_db.session.commit()
+
+    samples_json: list[dict[str, Any]] = []
+
+    for spec, clean_name in zip(specs, clean_names):
+        for _ in range(spec.copies):
+            samples_json.append(
+                {
+                    "shipmentId": shipmentId,
+                    **spec.model_dump(exclude_unset=True, exclude={"copies", "parents"}),
+                    "name": (f"{spec.name}_{next_numbers[clean_name]}" if include_suffix else spec.name),
+                }
+            )
+
+            if include_suffix:
+                next_numbers[clean_name] += 1
+
+    if not samples_json:
+        return Paged(items=[], total=0, page=0, limit=0)
 
     if push_to_external_db:
-        for i, sample_json in enumerate(samples_json):
-            sample = Sample(**sample_json)
+        from_thread.run(_push_samples, samples_json)
 
-            ext_sample = Expeye.upsert(Config.ispyb_api.jwt, sample, None)
-            samples_json[i]["externalId"] = ext_sample["externalId"]
+    samples = _insert_samples(shipmentId=shipmentId, samples_json=samples_json, specs=specs)
 
-    samples = inner_db.session.scalars(
-        insert(Sample).returning(Sample).values(samples_json),
-    ).all()
+    return Paged(items=samples, total=total, page=0, limit=total)
 
-    if params.parents:
-        inner_db.session.execute(
-            insert(SampleParentChild),
-            [{"childId": child.id, "parentId": parent} for child in samples for parent in params.parents],
+
+def create_sample(
+    shipmentId: int,
+    params: SampleIn,
+    token: str,
+    push_to_external_db: bool = False,
+    include_suffix: bool = True,
+):
+    if params.copies and params.copies > 12:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many sample copies requested",
         )
 
-    inner_db.session.commit()
-    return Paged(items=samples, total=params.copies, page=0, limit=params.copies)
+    return create_samples(
+        shipmentId=shipmentId,
+        specs=[params],
+        token=token,
+        push_to_external_db=push_to_external_db,
+        include_suffix=include_suffix,
+    )
 
 
 def edit_sample(sampleId: int, params: OptionalSample, token: str):
@@ -119,7 +381,7 @@ def edit_sample(sampleId: int, params: OptionalSample, token: str):
         # TODO: check with eBIC if they'd like to overwrite the user provided name on protein changes
         _get_protein(params.proteinId, token)
 
-    return edit_item(Sample, params, sampleId, token)
+    return edit_item(Sample, params, sampleId)
 
 
 def get_samples(
@@ -1,17 +1,23 @@
+import asyncio
 import time
 from collections import Counter
-from typing import Generator, List, Sequence
+from datetime import datetime, timedelta, timezone
+from typing import Any, List, Sequence
 
+import httpx
 import jwt
-from fastapi import HTTPException, status
+from anyio import from_thread
+from fastapi import HTTPException, Response, status
+from fastapi.concurrency import run_in_threadpool
 from lims_utils.logging import app_logger
-from sqlalchemy import func, select, update
-from sqlalchemy.orm import joinedload
+from sqlalchemy import and_, func, literal, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert
 
 from ..auth import GenericUser
 from ..models.inner_db.tables import (
     AvailableTable,
     Container,
+    PushJob,
     Sample,
     Shipment,
     TopLevelContainer,
@@ -22,41 +28,31 @@ from ..models.shipments import (
     ShipmentOut,
     StatusUpdate,
 )
-from ..utils.auth import is_admin
+from ..utils.auth import get_private_key, get_token_ttl, is_admin
+from ..utils.cache import TTLCache
+from ..utils.conditional import etag_matches
 from ..utils.config import Config
 from ..utils.crud import assert_no_unassigned, assign_dcg_to_sublocation
-from ..utils.database import inner_db
+from ..utils.database import inner_db, inner_session
 from ..utils.external import (
     TYPE_TO_SHIPPING_SERVICE_TYPE,
+    AsyncExternalRequest,
     Expeye,
     ExternalRequest,
-    update_shipment_status,
+    request_memo,
 )
-from ..utils.query import query_result_to_object
+from ..utils.query import get_generic_shipment_children, load_shipment_tree, serialise_generic_tree
+from .top_level_containers import dewar_history_cache
 
+shipment_tree_cache: TTLCache[tuple[int, int], bytes] = TTLCache(
+    max_size=Config.cache.shipment_tree_max_size, ttl=Config.cache.shipment_tree_ttl
+)
 
-def _get_shipment_tree(shipmentId: int):
-    raw_shipment_data = (
-        inner_db.session.execute(
-            select(Shipment)
-            .filter(Shipment.id == shipmentId)
-            .options(
-                joinedload(Shipment.children).joinedload(TopLevelContainer.children).joinedload(Container.children)
-            )
-        )
-        .unique()
-        .scalar_one()
-    )
-
-    return raw_shipment_data
 
+def get_shipment(shipmentId: int, get_children: bool = False, if_none_match: str | None = None):
+    shipment = inner_db.session.execute(select(Shipment).filter(Shipment.id == shipmentId)).scalar_one()
 
-def get_shipment(token: str, shipmentId: int, get_children: bool = False):
     if not get_children:
-        shipment = inner_db.session.execute(select(Shipment).filter(Shipment.id == shipmentId)).scalar_one()
-
-        shipment = update_shipment_status(shipment, token=token)
-
         return ShipmentChildren(
             id=shipmentId,
             name=shipment.name,
@@ -64,114 +60,435 @@ def get_shipment(token: str, shipmentId: int, get_children: bool = False):
             data=ShipmentOut.model_validate(shipment, from_attributes=True).model_dump(mode="json"),
         )
 
-    raw_shipment_data = _get_shipment_tree(shipmentId)
+    # The version is bumped by every write to the shipment or its items, so it identifies the tree's contents
+    etag = f'"{shipmentId}-{shipment.version}"'
 
-    shipment_metadata = update_shipment_status(raw_shipment_data, token)
+    if if_none_match is not None and etag_matches(etag, if_none_match):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
 
-    return ShipmentChildren(
-        id=shipmentId,
-        name=raw_shipment_data.name,
-        children=query_result_to_object(raw_shipment_data.children),
-        data=ShipmentOut.model_validate(shipment_metadata, from_attributes=True).model_dump(mode="json"),
-    )
+    cache_key = (shipmentId, shipment.version)
+    body = shipment_tree_cache.get(cache_key)
+
+    if body is None:
+        # Large shipments can hold thousands of items, so the tree is serialised directly rather than validated
+        body = serialise_generic_tree(
+            id=shipmentId,
+            name=shipment.name,
+            children=get_generic_shipment_children(shipmentId),
+            data=ShipmentOut.model_validate(shipment, from_attributes=True).model_dump(mode="json"),
+        )
+        shipment_tree_cache.set(cache_key, body)
+
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
 
 
 def push_shipment(shipmentId: int, token: str):
-    shipment = _get_shipment_tree(shipmentId)
-    session_response = ExternalRequest.request(
+    """Queue shipment to be pushed to ISPyB by a background worker. If a push is already queued or running
+    for the shipment, that job is returned instead, and will use the latest token. Only one such job can
+    exist per shipment, so concurrent requests do not queue duplicate pushes
+
+    Args:
+        shipmentId: Shipment ID
+        token: User token, used by the job to access ISPyB on the user's behalf
+
+    Returns:
+        Push job"""
+    query = insert(PushJob).values(shipmentId=shipmentId, token=token)
+
+    job = inner_db.session.scalar(
+        query.on_conflict_do_update(
+            index_elements=[PushJob.shipmentId],
+            index_where=PushJob.status.in_(["Queued", "Running"]),
+            set_={"token": query.excluded.token},
+        ).returning(PushJob)
+    )
+
+    inner_db.session.commit()
+
+    return job
+
+
+def get_push_job(shipmentId: int, jobId: int):
+    job = inner_db.session.scalar(select(PushJob).filter(PushJob.id == jobId, PushJob.shipmentId == shipmentId))
+
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Push job does not exist")
+
+    return job
+
+
+def _count_items(item: AvailableTable) -> int:
+    if isinstance(item, Sample):
+        return 1
+
+    children = item.samples if isinstance(item, Container) and item.samples else item.children
+
+    return 1 + sum(_count_items(child) for child in children or [])
+
+
+def _record_progress(job: PushJob, nodes: list[dict[str, Any]]):
+    """Append results to push job, and commit them along with the external IDs of the items pushed so far
+
+    Args:
+        job: Push job
+        nodes: Result of pushing each item"""
+    failed = sum(1 for node in nodes if node.get("error") is not None)
+    skipped = sum(1 for node in nodes if node.get("skipped"))
+
+    # JSON columns are not mutation-tracked, so the list must be replaced rather than appended to
+    job.nodes = [*job.nodes, *nodes]
+    job.failed += failed
+    job.skipped += skipped
+    job.pushed += len(nodes) - failed - skipped
+    job.lastUpdated = datetime.now(tz=timezone.utc)
+
+    inner_db.session.commit()
+
+
+def _touch_push_job(job_id: int):
+    """Renew running push job's lease. A separate session is used, so that items pushed in the level
+    that is currently in flight are not committed before the level is recorded
+
+    Args:
+        job_id: Push job ID"""
+    with inner_session() as session:
+        session.execute(
+            update(PushJob).filter(PushJob.id == job_id, PushJob.status == "Running").values(lastUpdated=func.now())
+        )
+        session.commit()
+
+
+async def _heartbeat(job_id: int):
+    """Renew push job's lease periodically for as long as the job runs, so that a job that is still making
+    progress is not picked up by another worker, even if a single level takes longer than the lease
+
+    Args:
+        job_id: Push job ID"""
+    while True:
+        await asyncio.sleep(Config.push_jobs.lease / 3)
+
+        try:
+            await run_in_threadpool(_touch_push_job, job_id)
+        except Exception as e:
+            app_logger.warning("Failed to renew lease for push job %i: %r", job_id, e)
+
+
+def _load_push_job_items(job: PushJob):
+    """Load shipment tree and unassigned samples to be pushed, and count the items in the job
+
+    Args:
+        job: Push job
+
+    Returns:
+        Shipment tree and unassigned samples"""
+    shipment = load_shipment_tree(job.shipmentId)
+
+    containerless_samples = inner_db.session.scalars(
+        select(Sample).filter(Sample.shipmentId == job.shipmentId, Sample.containerId.is_(None))
+    ).all()
+
+    job.total = len(containerless_samples) + _count_items(shipment)
+
+    return shipment, containerless_samples
+
+
+def _finish_push_job(job: PushJob):
+    shipment_values: dict[str, Any] = {"version": Shipment.version + 1}
+    job.token = None
+
+    if job.failed:
+        job.status = "Failed"
+    else:
+        job.status = "Completed"
+        shipment_values["status"] = "Submitted"
+
+    inner_db.session.execute(update(Shipment).filter(Shipment.id == job.shipmentId).values(shipment_values))
+    inner_db.session.commit()
+
+
+def _abort_push_job(job: PushJob, error: str):
+    """Stop push job before any items are pushed
+
+    Args:
+        job: Push job
+        error: Reason the shipment could not be pushed"""
+    job.status = "Failed"
+    job.token = None
+    _record_progress(job, [{"type": "Shipment", "id": job.shipmentId, "error": error}])
+
+
+async def _run_push_job(job: PushJob):
+    """Push shipment to ISPyB. Unassigned containers (such as a container with no parent top level
+    container) are ignored. Unassigned samples are pushed to ISPyB. Progress is committed after each
+    level of the tree, so that if the job fails, items that were already pushed keep their external IDs
+    and are skipped when the push is retried. Database work is run in a worker thread, so that it does
+    not block the scheduler's event loop.
+
+    Args:
+        job: Push job"""
+    # Items are read from ISPyB on behalf of the user who queued the job, but written with SCAUP's token
+    token = job.token
+    shipment, containerless_samples = await run_in_threadpool(_load_push_job_items, job)
+
+    if token is None or get_token_ttl(token, Config.push_jobs.lease) <= 0:
+        await run_in_threadpool(_abort_push_job, job, "User token expired, push shipment again")
+        return
+
+    session_response = await AsyncExternalRequest.request(
         token,
         url=f"/proposals/{shipment.proposalCode}{shipment.proposalNumber}/sessions/{shipment.visitNumber}",
     )
+
+    if session_response.status_code != 200:
+        app_logger.warning(
+            "Error from Expeye while getting session for shipment %i: %s", shipment.id, session_response.text
+        )
+        await run_in_threadpool(_abort_push_job, job, "Session not found in ISPyB")
+        return
+
     session_id = session_response.json()["sessionId"]
+    semaphore = asyncio.Semaphore(Config.upstream.max_concurrency)
 
-    # The existence of the session is already verified by Microauth
-    assert session_id is not None, "Session should exist upstream, yet it doesn't"
+    async def upsert(item: AvailableTable, parent_id: int | str | None, token: str) -> dict[str, Any]:
+        node = {"type": item.__tablename__, "id": item.id}
 
-    # There were other ways to do this that did not involve closures, but this seems like the
-    # cleanest option that did not take a significant performance hit
-    def create_all_items_in_shipment(
-        parent: AvailableTable, parent_id: int | str
-    ) -> Generator[dict[str, int | str], None, None]:
-        """Generator that traverses a shipment (or shipment item) down to the root of the tree"""
-        # Avoid calling chidless Sample instance
+        async with semaphore:
+            try:
+                return {**node, **(await Expeye.async_upsert(token, item, parent_id, session_id))}
+            except HTTPException as e:
+                return {**node, "error": e.detail}
+            except httpx.TransportError as e:
+                return {**node, "error": repr(e)}
 
-        created_item = Expeye.upsert(token, parent, parent_id, session_id)
-        parent.externalId = created_item["externalId"]
+    # Unassigned samples have no parent container in ISPyB, so they are pushed on their own. There is no way of
+    # verifying orphan sample ownership in ISPyB, so SCAUP's token is used for them instead
+    # TODO: revisit this when SCAUP creates containers, dewars and shipments for orphan samples
+    nodes = await asyncio.gather(*[upsert(sample, None, Config.ispyb_api.jwt) for sample in containerless_samples])
+    await run_in_threadpool(_record_progress, job, nodes)
 
-        if not isinstance(parent, Sample):
-            children = parent.samples if isinstance(parent, Container) and parent.samples else parent.children
+    # Children depend on their parent's external ID, but items in the same level of the tree do not depend on
+    # each other, so each level is pushed concurrently. Children of items that could not be pushed are left out
+    level: list[tuple[AvailableTable, int | str]] = [(shipment, f"{shipment.proposalCode}{shipment.proposalNumber}")]
 
-            if children is not None:
-                for item in children:
-                    # Delegate issuing elements to next tree level
-                    assert parent.externalId is not None, "Item is not in ISPyB"
-                    yield from create_all_items_in_shipment(item, parent.externalId)
-                    # Issue itself
-                    yield created_item
+    while level:
+        nodes = await asyncio.gather(*[upsert(item, parent_id, token) for item, parent_id in level])
+        next_level: list[tuple[AvailableTable, int | str]] = []
 
-    containerless_samples = inner_db.session.scalars(
-        select(Sample).filter(Sample.shipmentId == shipmentId, Sample.containerId.is_(None))
+        for (item, _), node in zip(level, nodes):
+            if node.get("error") is not None:
+                continue
+
+            item.externalId = node["externalId"]
+
+            if not isinstance(item, Sample):
+                children = item.samples if isinstance(item, Container) and item.samples else item.children
+                next_level.extend((child, node["externalId"]) for child in children or [])
+
+        await run_in_threadpool(_record_progress, job, nodes)
+        level = next_level
+
+    await run_in_threadpool(_finish_push_job, job)
+
+
+def _claim_push_job():
+    """Claim the oldest queued push job, or a running job whose lease has expired, and mark it as running
+
+    Returns:
+        Push job, or None if there are no jobs to run"""
+    now = datetime.now(tz=timezone.utc)
+
+    job = inner_db.session.scalar(
+        select(PushJob)
+        .filter(
+            or_(
+                PushJob.status == "Queued",
+                and_(
+                    PushJob.status == "Running",
+                    PushJob.lastUpdated < now - timedelta(seconds=Config.push_jobs.lease),
+                ),
+            )
+        )
+        .order_by(PushJob.id)
+        .limit(1)
+        .with_for_update(skip_locked=True)
     )
 
-    for sample in containerless_samples:
-        # There is no way of verifying orphan sample ownership in ISPyB, so we need to use SCAUP's
-        # token instead to create them on behalf of SCAUP, which has permission to manipulate all samples.
-        # TODO: revisit this when SCAUP creates containers, dewars and shipments for orphan samples
-        Expeye.upsert(Config.ispyb_api.jwt, sample, None, session_id)
+    if job is None:
+        return None
+
+    job.status = "Running"
+    job.total = job.pushed = job.skipped = job.failed = 0
+    job.nodes = []
+    job.lastUpdated = now
+    inner_db.session.commit()
 
-    modified_items = list(create_all_items_in_shipment(shipment, f"{shipment.proposalCode}{shipment.proposalNumber}"))
+    return job
 
-    inner_db.session.execute(update(Shipment).filter(Shipment.id == shipmentId).values({"status": "Submitted"}))
 
-    # Save all externalId updates in a single transaction
+def _fail_push_job(job_id: int):
+    inner_db.session.rollback()
+    inner_db.session.execute(
+        update(PushJob).filter(PushJob.id == job_id).values(status="Failed", lastUpdated=func.now(), token=None)
+    )
     inner_db.session.commit()
 
-    # TODO: decide what is returned. List of links to Expeye, maybe?
-    return modified_items
 
+async def run_push_jobs():
+    """Run queued push jobs, one at a time. Jobs are claimed with SKIP LOCKED, so that multiple workers can
+    run jobs at once. A job's lease is renewed while it runs, and running jobs that stop renewing it (for
+    instance, because their worker died) are picked up again once it expires.
+
+    Returns:
+        Number of jobs run"""
+    # Progress is committed as the job runs, and the shipment tree must not be reloaded after every commit
+    expire_on_commit = inner_db.session.expire_on_commit
+    inner_db.session.expire_on_commit = False
 
-def _get_item_name(item: Sample | TopLevelContainer | Container):
-    """Convert internal item type to shipping service item type
+    try:
+        for processed in range(Config.push_jobs.batch_size):
+            job = await run_in_threadpool(_claim_push_job)
 
-    TODO: replace this with reference to the item database service (name TBD)"""
-    if item.externalId is None:
-        raise HTTPException(status.HTTP_404_NOT_FOUND, "Shipment not pushed to ISPyB")
+            if job is None:
+                return processed
 
-    name = TYPE_TO_SHIPPING_SERVICE_TYPE[item.type] if item.type in TYPE_TO_SHIPPING_SERVICE_TYPE else item.type
+            job_id, shipment_id = job.id, job.shipmentId
+            heartbeat = asyncio.create_task(_heartbeat(job_id))
 
-    return name
+            try:
+                with request_memo():
+                    await _run_push_job(job)
+            except Exception as e:
+                app_logger.error("Push job %i for shipment %i failed", job_id, shipment_id, exc_info=e)
+                await run_in_threadpool(_fail_push_job, job_id)
+            finally:
+                heartbeat.cancel()
 
+        return Config.push_jobs.batch_size
+    finally:
+        inner_db.session.expire_on_commit = expire_on_commit
 
-def _get_children(
-    parent: AvailableTable,
-):
-    item_counts: Counter[str] = Counter()
 
-    if not isinstance(parent, Sample):
-        penultimate_level = False
-        children: Sequence[AvailableTable] | None = None
+def _get_line_items(shipmentId: int) -> dict[int, Counter[str]]:
+    """Count items inside each top level container in shipment, by shipping service item type, in a single
+    query. Samples take precedence over child containers, and top level containers with no children count
+    as items themselves.
 
-        if isinstance(parent, Container) and parent.samples:
-            children = parent.samples
-            penultimate_level = True
-        else:
-            children = parent.children
+    TODO: replace this with reference to the item database service (name TBD)
 
-        if children:
-            for item in children:
-                item_counts[_get_item_name(item)] += 1
+    Args:
+        shipmentId: Shipment ID
 
-                if not penultimate_level:
-                    item_counts.update(_get_children(item))
-        elif isinstance(parent, TopLevelContainer):
-            item_counts[_get_item_name(parent)] += 1
+    Returns:
+        Item counts, indexed by top level container ID"""
+    has_samples = select(Sample.id).filter(Sample.containerId == Container.id).exists()
+
+    container_tree = (
+        select(
+            Container.id.label("id"),
+            Container.topLevelContainerId.label("tlcId"),
+            Container.type.label("type"),
+            Container.externalId.label("externalId"),
+            has_samples.label("hasSamples"),
+            literal(1).label("depth"),
+        )
+        .join(TopLevelContainer, TopLevelContainer.id == Container.topLevelContainerId)
+        .filter(TopLevelContainer.shipmentId == shipmentId)
+        .cte("container_tree", recursive=True)
+    )
 
-    return item_counts
+    container_tree = container_tree.union_all(
+        select(
+            Container.id,
+            container_tree.c.tlcId,
+            Container.type,
+            Container.externalId,
+            has_samples,
+            container_tree.c.depth + 1,
+        )
+        .join(container_tree, Container.parentId == container_tree.c.id)
+        .filter(container_tree.c.hasSamples.is_(False))
+    )
+
+    items = union_all(
+        select(container_tree.c.tlcId, container_tree.c.type, container_tree.c.externalId, container_tree.c.depth),
+        select(container_tree.c.tlcId, Sample.type, Sample.externalId, container_tree.c.depth + 1).join(
+            container_tree, Sample.containerId == container_tree.c.id
+        ),
+        select(TopLevelContainer.id, TopLevelContainer.type, TopLevelContainer.externalId, literal(0)).filter(
+            TopLevelContainer.shipmentId == shipmentId,
+            ~select(Container.id).filter(Container.topLevelContainerId == TopLevelContainer.id).exists(),
+        ),
+    ).subquery()
+
+    rows = inner_db.session.execute(
+        select(
+            items.c.tlcId,
+            items.c.type,
+            func.count().label("quantity"),
+            func.count().filter(items.c.externalId.is_(None)).label("notPushed"),
+        )
+        .group_by(items.c.tlcId, items.c.type)
+        .order_by(items.c.tlcId, func.min(items.c.depth), items.c.type)
+    ).all()
+
+    line_items: dict[int, Counter[str]] = {}
+
+    for row in rows:
+        if row.notPushed:
+            raise HTTPException(status.HTTP_404_NOT_FOUND, "Shipment not pushed to ISPyB")
+
+        line_items.setdefault(row.tlcId, Counter())[TYPE_TO_SHIPPING_SERVICE_TYPE.get(row.type, row.type)] += (
+            row.quantity
+        )
+
+    return line_items
+
+
+async def _fetch_serial_number(proposal_reference: str, code: str | None, token: str) -> str:
+    response = await AsyncExternalRequest.request(
+        token=token,
+        url=f"/proposals/{proposal_reference}/dewar-registry/{code}",
+    )
+
+    if response.status_code != 200:
+        app_logger.error(f"Error while getting dewar {code} from upstream: {response.text}")
+        raise HTTPException(
+            status_code=status.HTTP_424_FAILED_DEPENDENCY,
+            detail="Invalid facility code provided",
+        )
+
+    return response.json()["manufacturerSerialNumber"]
+
+
+async def _load_serial_numbers(top_level_containers: Sequence[TopLevelContainer], proposal_reference: str, token: str):
+    """Populate manufacturer serial numbers for dewars that do not have one stored yet, looking up each
+    facility code in the dewar registry once, concurrently. Serial numbers are persisted when the session
+    is committed.
+
+    Args:
+        top_level_containers: Top level containers in shipment
+        proposal_reference: Proposal reference
+        token: User token
+    """
+    codes = list(
+        {tlc.code for tlc in top_level_containers if tlc.type == "dewar" and tlc.manufacturerSerialNumber is None}
+    )
+
+    if not codes:
+        return
+
+    serial_numbers = dict(
+        zip(codes, await asyncio.gather(*[_fetch_serial_number(proposal_reference, code, token) for code in codes]))
+    )
+
+    for tlc in top_level_containers:
+        if tlc.type == "dewar" and tlc.manufacturerSerialNumber is None:
+            tlc.manufacturerSerialNumber = serial_numbers[tlc.code]
 
 
 @assert_no_unassigned
 def build_shipment_request(shipmentId: int, token: str, user: GenericUser | None = None):
-    shipment = _get_shipment_tree(shipmentId)
+    shipment = inner_db.session.execute(select(Shipment).filter(Shipment.id == shipmentId)).scalar_one()
     proposal_reference = f"{shipment.proposalCode}{shipment.proposalNumber}"
 
     existing_shipment_count = inner_db.session.scalar(
@@ -192,10 +509,19 @@ def build_shipment_request(shipmentId: int, token: str, user: GenericUser | None
             " staff if you require more.",
         )
 
+    top_level_containers = inner_db.session.scalars(
+        select(TopLevelContainer).filter(TopLevelContainer.shipmentId == shipmentId).order_by(TopLevelContainer.id)
+    ).all()
+
+    item_counts = _get_line_items(shipmentId)
+
+    # Serial numbers are looked up concurrently on the event loop, while this worker thread waits for them
+    from_thread.run(_load_serial_numbers, top_level_containers, proposal_reference, token)
+
     packages: list[dict] = []
-    for tlc in shipment.children:
+    for tlc in top_level_containers:
         line_items: list[dict] = []
-        for item, count in _get_children(tlc).items():
+        for item, count in item_counts.get(tlc.id, Counter()).items():
             # If item is registered in shipping service, use shorthand instead
             if item in TYPE_TO_SHIPPING_SERVICE_TYPE.values():
                 line_items.append(
@@ -216,22 +542,12 @@ def build_shipment_request(shipmentId: int, token: str, user: GenericUser | None
 
         # Dewar cases do NOT include the dewar, this merely adds them to the outermost package
         if tlc.type == "dewar":
-            dewar_response = ExternalRequest.request(
-                token=token,
-                url=f"/proposals/{proposal_reference}/dewar-registry/{tlc.code}",
-            )
-
-            if dewar_response.status_code != 200:
-                app_logger.error(f"Error while getting dewar {tlc.code} from upstream: {dewar_response.text}")
-                raise HTTPException(
-                    status_code=status.HTTP_424_FAILED_DEPENDENCY,
-                    detail="Invalid facility code provided",
-                )
-
-            serial_number = dewar_response.json()["manufacturerSerialNumber"]
-
             line_items.append(
-                {"shippable_item_type": "CRYOGENIC_DRY_SHIPPER", "quantity": 1, "serial_number": serial_number}
+                {
+                    "shippable_item_type": "CRYOGENIC_DRY_SHIPPER",
+                    "quantity": 1,
+                    "serial_number": tlc.manufacturerSerialNumber,
+                }
             )
 
         if tlc.type in TYPE_TO_SHIPPING_SERVICE_TYPE:
@@ -267,7 +583,7 @@ def build_shipment_request(shipmentId: int, token: str, user: GenericUser | None
             "exp": int(time.time()) + 1.3e6,
             "aud": Config.shipping_service.callback_url,
         },
-        Config.auth.jwt_private,
+        get_private_key(),
         algorithm="ES256",
     )
 
@@ -304,7 +620,7 @@ def build_shipment_request(shipmentId: int, token: str, user: GenericUser | None
         update(Shipment)
         .returning(Shipment)
         .filter_by(id=shipmentId)
-        .values({"status": "Request Created", "shipmentRequest": shipment_request_id})
+        .values({"status": "Request Created", "shipmentRequest": shipment_request_id, "version": Shipment.version + 1})
     )
 
     inner_db.session.commit()
@@ -330,11 +646,22 @@ def handle_callback(shipment_id: int, callback_body: StatusUpdate):
     }
 
     updated_shipment = inner_db.session.scalar(
-        update(Shipment).returning(Shipment).filter_by(id=shipment_id).values(columns)
+        update(Shipment)
+        .returning(Shipment)
+        .filter_by(id=shipment_id)
+        .values({**columns, "version": Shipment.version + 1})
     )
 
     inner_db.session.commit()
 
+    # Dewars may have moved, so their cached history is no longer valid
+    for external_id in inner_db.session.scalars(
+        select(TopLevelContainer.externalId).filter(
+            TopLevelContainer.shipmentId == shipment_id, TopLevelContainer.externalId.is_not(None)
+        )
+    ):
+        dewar_history_cache.invalidate(external_id)
+
     return updated_shipment
 
 
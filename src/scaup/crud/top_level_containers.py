@@ -1,5 +1,9 @@
+import asyncio
+from dataclasses import dataclass
 from typing import Any
 
+import httpx
+from anyio import from_thread
 from fastapi import HTTPException, status
 from lims_utils.logging import app_logger
 from lims_utils.models import Paged
@@ -12,15 +16,28 @@ from ..models.top_level_containers import (
     TopLevelContainerIn,
     TopLevelContainerOut,
 )
+from ..utils.cache import TTLCache
 from ..utils.config import Config
-from ..utils.crud import assert_not_booked, edit_item
+from ..utils.crud import assert_not_booked, bump_shipment_versions, edit_item
 from ..utils.database import inner_db
-from ..utils.external import ExternalRequest
-from ..utils.session import retry_if_exists
+from ..utils.external import AsyncExternalRequest, ExternalRequest
+from ..utils.session import get_mirrored_session, retry_if_exists
 
 DEWAR_PREFIX = "DLS-BI-1"
 
 
+@dataclass
+class CachedHistory:
+    history: list[TopLevelContainerHistory]
+    etag: str | None = None
+    last_modified: str | None = None
+
+
+dewar_history_cache: TTLCache[int, CachedHistory] = TTLCache(
+    max_size=Config.cache.history_max_size, ttl=Config.cache.history_ttl
+)
+
+
 def _check_if_dls_code(code: str | None):
     """Check if code is DLS barcode, or user provided serial number
 
@@ -36,9 +53,19 @@ def _check_fields(
     params: TopLevelContainerIn | OptionalTopLevelContainer,
     token: str,
     item_id: int | None = None,
-):
+) -> str | None:
+    """Check if facility code is registered in the dewar registry, and if the manufacturer serial number
+    matches the registered one
+
+    Args:
+        params: Top level container parameters
+        token: User token
+        item_id: Shipment ID on creation, top level container ID otherwise
+
+    Returns:
+        Registered manufacturer serial number, if any"""
     if item_id is None:
-        return
+        return None
 
     query = select(func.concat(Shipment.proposalCode, Shipment.proposalNumber))
 
@@ -48,7 +75,7 @@ def _check_fields(
     else:
         if params.code is None:
             # Perform no facility code check if code is not present
-            return
+            return None
         query = query.select_from(TopLevelContainer).filter(TopLevelContainer.id == item_id).join(Shipment)
 
     proposal_reference = inner_db.session.scalar(query)
@@ -69,7 +96,7 @@ def _check_fields(
                         status_code=status.HTTP_404_NOT_FOUND,
                         detail="Manufacturer serial number does not match the provided facility code",
                     )
-            return
+            return msn
 
     raise HTTPException(
         status_code=status.HTTP_404_NOT_FOUND,
@@ -86,13 +113,16 @@ def create_top_level_container(shipmentId: int | None, params: TopLevelContainer
         else inner_db.session.execute(
             select(
                 func.concat(Shipment.proposalCode, Shipment.proposalNumber).label("reference"),
+                Shipment.proposalCode,
+                Shipment.proposalNumber,
                 Shipment.visitNumber,
             ).filter(Shipment.id == shipmentId)
         ).one()
     )
 
     if _check_if_dls_code(params.code):
-        _check_fields(params, token, shipmentId)
+        if (msn := _check_fields(params, token, shipmentId)) is not None:
+            params.manufacturerSerialNumber = msn
     elif params.type == "dewar" and autocreate:
         # Automatically register dewar if no code is provided
         # The range is 0999 to 9900 because these are DLS-BI barcodes guaranteed to be available to our application
@@ -151,24 +181,27 @@ def create_top_level_container(shipmentId: int | None, params: TopLevelContainer
     if proposal:
         # This is required because the dewar logistics server expects an instrument in the barcode in order to match
         # a dewar to the correct instrument
-        ext_resp = ExternalRequest.request(
-            token=token,
-            url=f"/proposals/{proposal.reference}/sessions/{proposal.visitNumber}",
-        )
+        session_json = get_mirrored_session(proposal.proposalCode, proposal.proposalNumber, proposal.visitNumber)
 
-        if ext_resp.status_code != 200:
-            app_logger.warning(
-                "Error from Expeye while getting session %s-%i: %s",
-                proposal.reference,
-                proposal.visitNumber,
-                ext_resp.text,
-            )
-            raise HTTPException(
-                status_code=status.HTTP_424_FAILED_DEPENDENCY,
-                detail="Invalid response while creating top level container in ISPyB",
+        if session_json is None:
+            ext_resp = ExternalRequest.request(
+                token=token,
+                url=f"/proposals/{proposal.reference}/sessions/{proposal.visitNumber}",
             )
 
-        session_json: dict[str, Any] = ext_resp.json()
+            if ext_resp.status_code != 200:
+                app_logger.warning(
+                    "Error from Expeye while getting session %s-%i: %s",
+                    proposal.reference,
+                    proposal.visitNumber,
+                    ext_resp.text,
+                )
+                raise HTTPException(
+                    status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                    detail="Invalid response while creating top level container in ISPyB",
+                )
+
+            session_json = ext_resp.json()
         instrument = "-" if (i := session_json.get("beamLineName")) is None else f"-{i}-"
 
         bar_code = f"{proposal.reference}-{proposal.visitNumber}{instrument}{container.id:07}"
@@ -181,17 +214,106 @@ def create_top_level_container(shipmentId: int | None, params: TopLevelContainer
             {"barCode": bar_code},
         )
 
+    bump_shipment_versions([shipmentId])
+
     inner_db.session.commit()
     return container
 
 
 def edit_top_level_container(topLevelContainerId: int, params: OptionalTopLevelContainer, token: str):
-    _check_fields(params, token, topLevelContainerId)
+    msn = _check_fields(params, token, topLevelContainerId)
+    extra_values = {}
 
     if params.code is not None:
         params.name = params.code if params.name is None else params.name
 
-    return edit_item(TopLevelContainer, params, topLevelContainerId, token)
+        # Serial number is updated in the same unit of work as the rest of the changes, so that it is kept
+        # if the edit is retried
+        extra_values["manufacturerSerialNumber"] = msn
+
+    return edit_item(TopLevelContainer, params, topLevelContainerId, extra_values)
+
+
+async def _get_top_level_container_history(tlc: TopLevelContainer, token: str):
+    """Get top level container with its history from ISPyB. History is cached, and revalidated with
+    ETag/Last-Modified once expired, if upstream provides them. If the history can't be retrieved
+    before the configured deadline, the container is returned with its history marked as unavailable
+
+    Args:
+        tlc: Top level container
+        token: User token
+
+    Returns:
+        Top level container with history"""
+    external_id = tlc.externalId
+    assert external_id is not None, "Only containers that exist in ISPyB have a history"
+
+    new_tlc = TopLevelContainerOut.model_validate(tlc, from_attributes=True)
+
+    cached_history = dewar_history_cache.get(external_id)
+
+    if cached_history is not None:
+        new_tlc.history = cached_history.history
+        return new_tlc
+
+    headers = {}
+    stale_history = dewar_history_cache.get_stale(external_id)
+
+    if stale_history is not None:
+        if stale_history.etag:
+            headers["If-None-Match"] = stale_history.etag
+        if stale_history.last_modified:
+            headers["If-Modified-Since"] = stale_history.last_modified
+
+    try:
+        response = await asyncio.wait_for(
+            AsyncExternalRequest.request(token=token, url=f"/dewars/{external_id}/history", headers=headers),
+            timeout=Config.upstream.history_deadline,
+        )
+    except (TimeoutError, httpx.TransportError) as e:
+        app_logger.warning(
+            "Failed to get history from ISPyB for dewar %i (external ID: %i): %r",
+            tlc.id,
+            external_id,
+            e,
+        )
+        new_tlc.historyUnavailable = True
+        return new_tlc
+
+    if response.status_code == 304 and stale_history is not None:
+        dewar_history_cache.set(external_id, stale_history)
+        new_tlc.history = stale_history.history
+        return new_tlc
+
+    if response.status_code != 200:
+        app_logger.warning(
+            "Failed to get history from ISPyB for dewar %i (external ID: %i): %s",
+            tlc.id,
+            external_id,
+            response.text,
+        )
+        new_tlc.historyUnavailable = True
+        return new_tlc
+
+    # More than 25 items could be returned, but it is statistically unlikely
+    # (less than 2.2% of dewars have 25 history items or more, and most of these
+    # are commissioning proposals), so we'll disregard that for now
+    new_tlc.history = [TopLevelContainerHistory.model_validate(item) for item in response.json()["items"]]
+
+    dewar_history_cache.set(
+        external_id,
+        CachedHistory(
+            history=new_tlc.history,
+            etag=response.headers.get("ETag"),
+            last_modified=response.headers.get("Last-Modified"),
+        ),
+    )
+
+    return new_tlc
+
+
+async def _get_top_level_container_histories(tlcs: list[TopLevelContainer], token: str):
+    return await asyncio.gather(*[_get_top_level_container_history(tlc, token) for tlc in tlcs])
 
 
 def get_top_level_containers(shipmentId: int, token: str, limit: int, page: int):
@@ -201,24 +323,16 @@ def get_top_level_containers(shipmentId: int, token: str, limit: int, page: int)
         query, limit, page, slow_count=False, scalar=False
     )
 
-    for i, tlc in enumerate(top_level_containers.items):
-        if tlc.externalId is not None:
-            response = ExternalRequest.request(token=token, url=f"/dewars/{tlc.externalId}/history")
+    external_indexes = [i for i, tlc in enumerate(top_level_containers.items) if tlc.externalId is not None]
 
-            if response.status_code == 200:
-                # More than 25 items could be returned, but it is statistically unlikely
-                # (less than 2.2% of dewars have 25 history items or more, and most of these
-                # are commissioning proposals), so we'll disregard that for now
-                new_tlc = TopLevelContainerOut.model_validate(tlc, from_attributes=True)
-                new_tlc.history = [TopLevelContainerHistory.model_validate(item) for item in response.json()["items"]]
+    # Histories are fetched concurrently on the event loop, while this worker thread waits for them
+    new_tlcs = from_thread.run(
+        _get_top_level_container_histories,
+        [top_level_containers.items[i] for i in external_indexes],
+        token,
+    )
 
-                top_level_containers.items[i] = new_tlc
-            else:
-                app_logger.warning(
-                    "Failed to get history from ISPyB for dewar %i (external ID: %i): %s",
-                    tlc.id,
-                    tlc.externalId,
-                    response.text,
-                )
+    for i, new_tlc in zip(external_indexes, new_tlcs):
+        top_level_containers.items[i] = new_tlc
 
     return top_level_containers
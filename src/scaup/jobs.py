@@ -0,0 +1,113 @@
+from datetime import datetime, timedelta, timezone
+from typing import Sequence
+
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from fastapi.concurrency import run_in_threadpool
+from lims_utils.database import get_session
+from lims_utils.logging import app_logger
+from sqlalchemy import select
+
+from .crud.shipments import run_push_jobs
+from .models.inner_db.tables import Shipment
+from .utils.alerts import alert_session_lcs
+from .utils.config import Config
+from .utils.database import inner_db, inner_session
+from .utils.external import ExternalRequest, request_memo, update_shipment_statuses
+from .utils.outbox import drain_external_sync_outbox
+from .utils.session import refresh_session_mirror
+
+# Background jobs, sharing the application's event loop. Synchronous jobs are run in the scheduler's
+# thread pool, and asynchronous jobs must keep blocking work off the loop themselves
+scheduler = AsyncIOScheduler()
+scheduler.add_job(alert_session_lcs, "interval", hours=1)
+
+
+def _get_stale_shipment_ids():
+    now = datetime.now(tz=timezone.utc)
+
+    return inner_db.session.scalars(
+        select(Shipment.id)
+        .filter(
+            Shipment.externalId.is_not(None),
+            Shipment.creationDate > now - timedelta(days=90),
+            Shipment.lastStatusUpdate < now - timedelta(minutes=10),
+        )
+        .order_by(Shipment.id)
+    ).all()
+
+
+def _get_shipments(shipment_ids: Sequence[int]):
+    return list(inner_db.session.scalars(select(Shipment).filter(Shipment.id.in_(shipment_ids))).all())
+
+
+async def refresh_shipment_statuses():
+    """Refresh statuses of all shipments in ISPyB which are younger than 3 months and were last
+    updated more than 10 minutes ago, in batches. Database queries are run in a worker thread, so
+    that they do not block the scheduler's event loop
+
+    Returns:
+        Number of shipments checked"""
+    stale_shipment_ids = await run_in_threadpool(_get_stale_shipment_ids)
+    batch_size = Config.status_poller.batch_size
+
+    for i in range(0, len(stale_shipment_ids), batch_size):
+        shipments = await run_in_threadpool(_get_shipments, stale_shipment_ids[i : i + batch_size])
+
+        await update_shipment_statuses(
+            shipments,
+            Config.ispyb_api.jwt,
+            max_concurrency=Config.status_poller.max_concurrency,
+        )
+
+    return len(stale_shipment_ids)
+
+
+@scheduler.scheduled_job("interval", seconds=Config.status_poller.interval)
+async def poll_shipment_statuses():
+    if not Config.status_poller.enabled:
+        return
+
+    with get_session(inner_session):
+        checked = await refresh_shipment_statuses()
+
+    app_logger.info("Refreshed statuses for %i shipments", checked)
+
+
+@scheduler.scheduled_job("interval", seconds=Config.session_mirror.interval)
+def sync_session_mirror():
+    if not Config.session_mirror.enabled:
+        return
+
+    with get_session(inner_session):
+        mirrored = refresh_session_mirror()
+
+    app_logger.info("Mirrored %i sessions from ISPyB", mirrored)
+
+
+@scheduler.scheduled_job("interval", seconds=Config.external_sync.interval)
+async def sync_external_outbox():
+    if not Config.external_sync.enabled:
+        return
+
+    with get_session(inner_session), request_memo():
+        synced = await drain_external_sync_outbox()
+
+    if synced:
+        app_logger.info("Synced %i items to ISPyB", synced)
+
+
+@scheduler.scheduled_job("interval", seconds=Config.push_jobs.interval)
+async def process_push_jobs():
+    if not Config.push_jobs.enabled:
+        return
+
+    with get_session(inner_session):
+        processed = await run_push_jobs()
+
+    if processed:
+        app_logger.info("Ran %i shipment push jobs", processed)
+
+
+@scheduler.scheduled_job("interval", hours=1)
+def log_upstream_pool_stats():
+    app_logger.info("Upstream connection pool usage: %s", ExternalRequest.pool_stats())
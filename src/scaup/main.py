@@ -7,6 +7,7 @@ from lims_utils.database import get_session
 from lims_utils.logging import app_logger, log_exception_handler, register_loggers
 
 from . import __version__
+from .jobs import scheduler
 from .routes import (
     containers,
     internal,
@@ -16,20 +17,31 @@ from .routes import (
     shipments,
     top_level_containers,
 )
-from .utils.alerts import session_alerts_scheduler
 from .utils.config import Config
 from .utils.database import inner_session
+from .utils.external import AsyncExternalRequest, ExternalRequest, request_memo
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     register_loggers()
-    if Config.alerts.contact_email:
-        session_alerts_scheduler.start()
-        yield
-        session_alerts_scheduler.shutdown()
-    else:
-        yield
+    if (
+        Config.alerts.contact_email
+        or Config.status_poller.enabled
+        or Config.session_mirror.enabled
+        or Config.external_sync.enabled
+        or Config.push_jobs.enabled
+    ):
+        scheduler.start()
+
+    yield
+
+    if scheduler.running:
+        scheduler.shutdown()
+
+    app_logger.info("Upstream connection pool usage: %s", ExternalRequest.pool_stats())
+    ExternalRequest.close()
+    await AsyncExternalRequest.close()
 
 
 app = FastAPI(version=__version__, title="Scaup API", lifespan=lifespan)
@@ -48,7 +60,7 @@ if Config.auth.cors:
 
 @app.middleware("http")
 async def get_session_as_middleware(request, call_next):
-    with get_session(inner_session):
+    with get_session(inner_session), request_memo():
         return await call_next(request)
 
 
@@ -5,10 +5,13 @@ from sqlalchemy import (
     JSON,
     DateTime,
     ForeignKey,
+    Index,
     PrimaryKeyConstraint,
     SmallInteger,
     String,
+    Text,
     func,
+    text,
 )
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 from sqlalchemy.schema import UniqueConstraint
@@ -24,6 +27,7 @@ type TopLevelContainerTypes = Literal["dewar", "toolbox", "parcel"]
 class BaseColumns:
     name: Mapped[str] = mapped_column(String(80))
     externalId: Mapped[int | None] = mapped_column(unique=True, comment="Item ID in ISPyB")
+    externalHash: Mapped[str | None] = mapped_column(String(32), comment="Hash of the payload last pushed to ISPyB")
     comments: Mapped[str | None] = mapped_column(String(255))
     creationDate: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
 
@@ -38,11 +42,15 @@ class Shipment(Base, BaseColumns):
     sessionTypeId: Mapped[int] = mapped_column(ForeignKey("SessionType.sessionTypeId"), server_default="1")
 
     children: Mapped[List["TopLevelContainer"]] = relationship(back_populates="shipment")
-    sessionType: Mapped["SessionType"] = relationship(back_populates="shipments")
+    # Always serialised alongside the shipment, so it is joined in rather than lazy loaded
+    sessionType: Mapped["SessionType"] = relationship(back_populates="shipments", lazy="joined", innerjoin=True)
 
     shipmentRequest: Mapped[int | None] = mapped_column()
     status: Mapped[str | None] = mapped_column(String(25), server_default="Created")
     lastStatusUpdate: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    version: Mapped[int] = mapped_column(
+        server_default="1", comment="Incremented whenever the shipment or any of its items change"
+    )
 
 
 class SessionType(Base):
@@ -57,6 +65,25 @@ class SessionType(Base):
     shipments: Mapped["Shipment"] = relationship("Shipment", back_populates="sessionType")
 
 
+class Session(Base):
+    """Mirror of ISPyB session metadata, periodically refreshed from Expeye"""
+
+    __tablename__ = "Session"
+    __table_args__ = (
+        UniqueConstraint("proposalCode", "proposalNumber", "visitNumber", name="Session_unique_reference"),
+    )
+
+    id: Mapped[int] = mapped_column("sessionId", primary_key=True, autoincrement=False, comment="Session ID in ISPyB")
+    proposalCode: Mapped[str] = mapped_column(String(2))
+    proposalNumber: Mapped[int] = mapped_column()
+    visitNumber: Mapped[int] = mapped_column()
+    startDate: Mapped[datetime | None] = mapped_column(DateTime)
+    endDate: Mapped[datetime | None] = mapped_column(DateTime)
+    beamLineName: Mapped[str | None] = mapped_column(String(45))
+    beamLineOperator: Mapped[list[str] | None] = mapped_column(JSON, comment="Local contacts")
+    lastUpdated: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+
+
 class TopLevelContainer(Base, BaseColumns):
     __tablename__ = "TopLevelContainer"
     __table_args__ = (UniqueConstraint("name", "shipmentId"),)
@@ -68,6 +95,9 @@ class TopLevelContainer(Base, BaseColumns):
     details: Mapped[dict[str, Any] | None] = mapped_column(JSON)
     code: Mapped[str | None] = mapped_column(String(20))
     barCode: Mapped[str | None] = mapped_column(String(40))
+    manufacturerSerialNumber: Mapped[str | None] = mapped_column(
+        String(40), comment="Manufacturer serial number, as registered in the dewar registry"
+    )
     type: Mapped[str] = mapped_column(String(40), server_default="dewar")
     isInternal: Mapped[bool] = mapped_column(
         default=False,
@@ -184,4 +214,63 @@ class PreSession(Base):
     details: Mapped[dict[str, Any] | None] = mapped_column(JSON, comment="Generic additional details")
 
 
+class SampleNameCounter(Base):
+    """Next ordinal suffix for sample names in a shipment, per macromolecule name prefix"""
+
+    __tablename__ = "SampleNameCounter"
+
+    shipmentId: Mapped[int] = mapped_column(ForeignKey("Shipment.shipmentId"), primary_key=True)
+    prefix: Mapped[str] = mapped_column(String(80), primary_key=True)
+    next: Mapped[int] = mapped_column(comment="Next suffix to be assigned to a sample with this prefix")
+
+
+class ExternalSyncOutbox(Base):
+    """Items with local changes that are yet to be synced to ISPyB. Rows are drained by a background worker"""
+
+    __tablename__ = "ExternalSyncOutbox"
+    __table_args__ = (UniqueConstraint("tableName", "itemId", name="ExternalSyncOutbox_unique_item"),)
+
+    id: Mapped[int] = mapped_column("externalSyncOutboxId", primary_key=True)
+    tableName: Mapped[str] = mapped_column(String(40))
+    itemId: Mapped[int] = mapped_column()
+    revision: Mapped[int] = mapped_column(
+        server_default="1", comment="Incremented whenever the item changes again before being synced"
+    )
+    attempts: Mapped[int] = mapped_column(SmallInteger, server_default="0")
+    nextAttempt: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), index=True)
+    lastError: Mapped[str | None] = mapped_column(String(255))
+
+
+class PushJob(Base):
+    """Shipment push to ISPyB, executed by a background worker"""
+
+    __tablename__ = "PushJob"
+    __table_args__ = (
+        Index(
+            "PushJob_unique_active_shipment",
+            "shipmentId",
+            unique=True,
+            postgresql_where=text("status IN ('Queued', 'Running')"),
+        ),
+    )
+
+    id: Mapped[int] = mapped_column("pushJobId", primary_key=True)
+    shipmentId: Mapped[int] = mapped_column(ForeignKey("Shipment.shipmentId"), index=True)
+    status: Mapped[str] = mapped_column(String(20), server_default="Queued", index=True)
+    creationDate: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now())
+    lastUpdated: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now(), comment="Updated whenever the job makes progress"
+    )
+    total: Mapped[int] = mapped_column(server_default="0", comment="Number of items in the shipment tree")
+    pushed: Mapped[int] = mapped_column(server_default="0")
+    skipped: Mapped[int] = mapped_column(server_default="0")
+    failed: Mapped[int] = mapped_column(server_default="0")
+    nodes: Mapped[list[dict[str, Any]]] = mapped_column(
+        JSON, server_default="[]", comment="Result of pushing each item processed so far"
+    )
+    token: Mapped[str | None] = mapped_column(
+        Text, comment="Token of the user who queued the job, cleared once the job ends"
+    )
+
+
 AvailableTable = Sample | Container | TopLevelContainer | Shipment
@@ -29,7 +29,7 @@ class BaseSample(BaseModelWithNameValidator):
 class SampleIn(BaseSample):
     proteinId: int
     type: Optional[str] = None
-    copies: int = 1
+    copies: int = Field(default=1, ge=1)
     parents: Optional[List[int]] = None
 
 
@@ -94,3 +94,25 @@ class StatusUpdate(BaseModel):
     tracking_number: str | None = None
     pickup_confirmation_code: str | None = None
     pickup_confirmation_timestamp: datetime | None
+
+
+class PushJobNode(BaseModel):
+    type: str
+    id: int
+    externalId: int | None = None
+    link: str | None = None
+    skipped: bool = False
+    error: str | None = None
+
+
+class PushJobOut(BaseModel):
+    id: int
+    shipmentId: int
+    status: Literal["Queued", "Running", "Completed", "Failed"]
+    creationDate: datetime
+    lastUpdated: datetime
+    total: int = Field(description="Number of items in the shipment tree")
+    pushed: int
+    skipped: int
+    failed: int
+    nodes: list[PushJobNode] = Field(description="Result of pushing each item processed so far")
@@ -49,6 +49,7 @@ class TopLevelContainerOut(BaseTopLevelContainer):
     externalId: int | None = None
     barCode: str | None = None
     history: List[TopLevelContainerHistory] | None = None
+    historyUnavailable: bool = False
     shipmentId: int | None = None
 
 
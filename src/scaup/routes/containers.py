@@ -8,6 +8,7 @@ from ..crud import samples as samples_crud
 from ..models.containers import ContainerOut, OptionalContainer
 from ..models.inner_db.tables import Container
 from ..models.samples import SampleOut
+from ..utils.conditional import ConditionalGet
 from ..utils.crud import delete_item
 
 router = APIRouter(
@@ -19,8 +20,17 @@ router = APIRouter(
 @router.get("/{containerId}", response_model=ContainerOut)
 def get_container(
     containerId=Depends(Permissions.container),
+    conditional: ConditionalGet = Depends(),
 ):
     """Get container"""
+    shipment_version = crud.get_container_validator(container_id=containerId)
+
+    if shipment_version is None:
+        return conditional.respond(crud.get_container(container_id=containerId).model_dump_json(by_alias=True).encode())
+
+    if not_modified := conditional.not_modified(shipment_version):
+        return not_modified
+
     return crud.get_container(container_id=containerId)
 
 
@@ -11,6 +11,7 @@ from ..models.containers import ContainerIn, ContainerOut
 from ..models.shipments import GenericItem, ShipmentChildren
 from ..models.top_level_containers import PreloadedInventoryDewar, TopLevelContainerIn, TopLevelContainerOut
 from ..utils.auth import check_em_staff
+from ..utils.conditional import ConditionalGet
 
 
 def _internal_check_em_staff(user=Depends(User)):
@@ -84,9 +85,10 @@ def create_orphan_top_level_container(
     "/{topLevelContainerId}",
     response_model=ShipmentChildren,
 )
-def get_internal_container(topLevelContainerId: int):
+def get_internal_container(topLevelContainerId: int, conditional: ConditionalGet = Depends()):
     """Get internal top level container and its children"""
-    return crud.get_internal_container_tree(top_level_container_id=topLevelContainerId)
+    # Internal storage trees are not versioned, so the body itself is used as the validator
+    return conditional.respond(crud.get_internal_container_tree(top_level_container_id=topLevelContainerId))
 
 
 @router.post(
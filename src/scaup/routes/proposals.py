@@ -11,7 +11,7 @@ from ..crud import samples as samples_crud
 from ..models.containers import ContainerOut
 from ..models.samples import SampleOut, SublocationAssignment
 from ..models.shipments import ShipmentIn, ShipmentOut
-from ..utils.external import ExternalRequest
+from ..utils.conditional import ConditionalGet
 
 auth = Permissions.session
 
@@ -36,12 +36,15 @@ def create_shipment(proposalReference: ProposalReference = Depends(auth), parame
     response_model=Paged[ShipmentOut],
 )
 def get_shipments(
-    token: HTTPAuthorizationCredentials = Depends(auth_scheme),
     proposalReference: ProposalReference = Depends(auth),
     page: dict[str, int] = Depends(pagination),
+    conditional: ConditionalGet = Depends(),
 ):
     """Get shipments in session"""
-    return crud.get_shipments(token=token.credentials, proposal_reference=proposalReference, **page)
+    if not_modified := conditional.not_modified(crud.get_shipments_validator(proposalReference)):
+        return not_modified
+
+    return crud.get_shipments(proposal_reference=proposalReference, **page)
 
 
 @router.get(
@@ -99,17 +102,20 @@ def get_shipment_data(
     """Get lab data for the proposal (lab contacts, proteins...)
 
     We can skip auth on this one since it is calling Expeye, and auth is done there"""
-    return ExternalRequest.request(token=token.credentials, url=f"/proposals/{proposalReference}/data").json()
+    return crud.get_proposal_data(proposal_reference=proposalReference, token=token.credentials)
 
 
-@router.get("/{proposalReference}/shipments")
+@router.get("/{proposalReference}/shipments", response_model=Paged[ShipmentOut])
 def get_proposal_shipments(
     proposalReference: ProposalReference = Depends(Permissions.proposal),
-    token: HTTPAuthorizationCredentials = Depends(auth_scheme),
     page: dict[str, int] = Depends(pagination),
+    conditional: ConditionalGet = Depends(),
 ):
     """Get shipments in proposal"""
-    return crud.get_shipments(token=token.credentials, proposal_reference=proposalReference, **page)
+    if not_modified := conditional.not_modified(crud.get_shipments_validator(proposalReference)):
+        return not_modified
+
+    return crud.get_shipments(proposal_reference=proposalReference, **page)
 
 
 @router.post(
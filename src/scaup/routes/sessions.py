@@ -5,7 +5,7 @@ from lims_utils.models import Paged, pagination
 
 from ..auth import auth_scheme
 from ..models.sessions import SessionOut
-from ..utils.external import ExternalRequest
+from ..utils.external import AsyncExternalRequest
 
 router = APIRouter(
     tags=["Sessions"],
@@ -14,7 +14,7 @@ router = APIRouter(
 
 
 @router.get("", response_model=Paged[SessionOut])
-def get_sessions(
+async def get_sessions(
     token: HTTPAuthorizationCredentials = Depends(auth_scheme),
     page: dict[str, int] = Depends(pagination),
     minEndDate: str | None = Query(default=None, description="Minimum session end date"),
@@ -25,7 +25,7 @@ def get_sessions(
     if minEndDate is not None:
         url += f"&minEndDate={minEndDate}"
 
-    expeye_response = ExternalRequest.request(
+    expeye_response = await AsyncExternalRequest.request(
         token=token.credentials,
         url=url,
     )
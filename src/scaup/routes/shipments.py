@@ -1,6 +1,6 @@
 from typing import List
 
-from fastapi import APIRouter, Body, Depends, Query, status
+from fastapi import APIRouter, Body, Depends, Header, Query, Request, Response, status
 from fastapi.responses import RedirectResponse
 from fastapi.security import HTTPAuthorizationCredentials
 from lims_utils.auth import GenericUser
@@ -19,6 +19,7 @@ from ..models.containers import ContainerIn, ContainerOut
 from ..models.pre_sessions import PreSessionIn, PreSessionOut
 from ..models.samples import SampleIn, SampleOut, SublocationAssignment
 from ..models.shipments import (
+    PushJobOut,
     ShipmentChildren,
     ShipmentOut,
     StatusUpdate,
@@ -26,7 +27,8 @@ from ..models.shipments import (
 )
 from ..models.top_level_containers import TopLevelContainerIn, TopLevelContainerOut
 from ..utils.auth import check_jwt
-from ..utils.crud import get_unassigned
+from ..utils.conditional import ConditionalGet
+from ..utils.crud import get_shipment_version, get_unassigned
 
 auth = Permissions.shipment
 
@@ -39,11 +41,12 @@ router = APIRouter(
 @router.get("/{shipmentId}", response_model=ShipmentChildren)
 def get_shipment(
     shipmentId=Depends(auth),
-    token: HTTPAuthorizationCredentials = Depends(auth_scheme),
     getChildren: bool = Query(default=True, description="Whether to get children as part of the request"),
+    if_none_match: str | None = Header(default=None, include_in_schema=False),
 ):
-    """Get shipment data"""
-    return shipment_crud.get_shipment(shipmentId=shipmentId, get_children=getChildren, token=token.credentials)
+    """Get shipment data. If children are requested, the response includes an ETag, and a 304
+    response is returned if the tree has not changed since"""
+    return shipment_crud.get_shipment(shipmentId=shipmentId, get_children=getChildren, if_none_match=if_none_match)
 
 
 @router.get("/{shipmentId}/unassigned", response_model=UnassignedItems)
@@ -52,11 +55,27 @@ def get_unassigned_items(shipmentId=Depends(auth)):
     return get_unassigned(shipmentId=shipmentId)
 
 
-@router.post("/{shipmentId}/push")
-def push_shipment(shipmentId=Depends(auth), token: HTTPAuthorizationCredentials = Depends(auth_scheme)):
-    """Push shipment to ISPyB. Unassigned containers (such as a container with no parent top level
-    container) are ignored. Unassigned samples are pushed to ISPyB."""
-    return shipment_crud.push_shipment(shipmentId=shipmentId, token=token.credentials)
+@router.post("/{shipmentId}/push", status_code=status.HTTP_202_ACCEPTED, response_model=PushJobOut)
+def push_shipment(
+    request: Request,
+    response: Response,
+    shipmentId=Depends(auth),
+    token: HTTPAuthorizationCredentials = Depends(auth_scheme),
+):
+    """Queue shipment to be pushed to ISPyB. Unassigned containers (such as a container with no parent top level
+    container) are ignored. Unassigned samples are pushed to ISPyB. Items that have not changed since
+    they were last pushed are skipped, so retrying a failed push resumes from the items that were not pushed.
+    If a push is already queued or running for the shipment, that job is returned instead."""
+    job = shipment_crud.push_shipment(shipmentId=shipmentId, token=token.credentials)
+    response.headers["Location"] = str(request.url_for("get_push_job", shipmentId=shipmentId, jobId=job.id))
+
+    return job
+
+
+@router.get("/{shipmentId}/push-jobs/{jobId}", response_model=PushJobOut)
+def get_push_job(jobId: int, shipmentId=Depends(auth)):
+    """Get progress of shipment push job, including the result of pushing each item processed so far"""
+    return shipment_crud.get_push_job(shipmentId=shipmentId, jobId=jobId)
 
 
 @router.post(
@@ -130,6 +149,32 @@ def create_sample(
     )
 
 
+@router.post(
+    "/{shipmentId}/samples/bulk",
+    status_code=status.HTTP_201_CREATED,
+    response_model=Paged[SampleOut],
+    tags=["Samples"],
+)
+def create_samples(
+    shipmentId=Depends(auth),
+    parameters: List[SampleIn] = Body(),
+    token: HTTPAuthorizationCredentials = Depends(auth_scheme),
+    pushToExternalDb: bool = Query(
+        False, description="Push samples to external DB. May create orphan samples (samples without a container)"
+    ),
+    includeSuffix: bool = Query(True, description="Include ordinal suffix in samples' names"),
+):
+    """Create multiple samples in shipment at once, possibly with different macromolecules, positions
+    and number of copies"""
+    return sample_crud.create_samples(
+        shipmentId=shipmentId,
+        specs=parameters,
+        token=token.credentials,
+        push_to_external_db=pushToExternalDb,
+        include_suffix=includeSuffix,
+    )
+
+
 @router.get(
     "/{shipmentId}/samples",
     response_model=Paged[SampleOut],
@@ -141,8 +186,13 @@ def get_samples(
     page: dict[str, int] = Depends(pagination),
     ignoreExternal: bool = True,
     unassignedOnly: bool = Query(default=False, description="Only return samples that are not assigned to a container"),
+    conditional: ConditionalGet = Depends(),
 ):
     """Get samples in shipment"""
+    # External data is not reflected in the shipment version
+    if ignoreExternal and (not_modified := conditional.not_modified(get_shipment_version(shipmentId))):
+        return not_modified
+
     return sample_crud.get_samples(
         **page,
         shipment_id=shipmentId,
@@ -5,7 +5,6 @@ from email.mime.text import MIMEText
 from smtplib import SMTP
 from typing import List, Set
 
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from lims_utils.database import get_session
 from lims_utils.logging import app_logger
 from lims_utils.models import ProposalReference, parse_proposal
@@ -25,8 +24,7 @@ from ..models.alerts import (
 from ..models.inner_db.tables import Shipment
 from .config import Config
 from .database import inner_session
-
-session_alerts_scheduler = AsyncIOScheduler()
+from .session import get_mirrored_sessions
 
 
 class UpcomingSession(BaseModel):
@@ -77,34 +75,42 @@ def create_email(msg_body: str, subject: str):
     return msg_root
 
 
-@session_alerts_scheduler.scheduled_job("interval", hours=1)
 def alert_session_lcs():
+    if not Config.alerts.contact_email:
+        return
+
     now = datetime.now()
     max_cutoff = now + timedelta(hours=24)
     min_cutoff = now + timedelta(hours=23)
 
     app_logger.info("Alerting lab contacts of upcoming sessions...")
 
-    response = ExternalRequest.request(
-        token=Config.ispyb_api.jwt,
-        method="GET",
-        url=f"/sessions?minStartDate={min_cutoff}&maxStartDate={max_cutoff}",
-    )
+    with get_session(inner_session):
+        sessions = get_mirrored_sessions(min_cutoff, max_cutoff)
 
-    if response.status_code != 200:
-        app_logger.warning(
-            "Failed to retrieve upcoming sessions from ISPyB at %s: %s",
-            response.url,
-            response.text,
+    if sessions is None:
+        response = ExternalRequest.request(
+            token=Config.ispyb_api.jwt,
+            method="GET",
+            url=f"/sessions?minStartDate={min_cutoff}&maxStartDate={max_cutoff}",
         )
-        return
+
+        if response.status_code != 200:
+            app_logger.warning(
+                "Failed to retrieve upcoming sessions from ISPyB at %s: %s",
+                response.url,
+                response.text,
+            )
+            return
+
+        sessions = response.json()["items"]
 
     upcoming_sessions = [
         UpcomingSession(
             reference=parse_proposal(s["parentProposal"], s["visitNumber"]),
             local_contacts=s["beamLineOperator"],
         )
-        for s in response.json()["items"]
+        for s in sessions
         if s["beamLineOperator"]
     ]
 
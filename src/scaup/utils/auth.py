@@ -1,12 +1,56 @@
+import hashlib
+import time
+from functools import cache
 from typing import Any
 
+from cryptography.hazmat.primitives.serialization import load_pem_private_key, load_pem_public_key
 from fastapi import HTTPException, status
-from jwt import DecodeError, decode
+from jwt import DecodeError, PyJWTError, decode
 from lims_utils.auth import GenericUser
 from lims_utils.logging import app_logger
 
+from .cache import TTLCache
 from .config import Config
 
+verified_token_cache: TTLCache[tuple[str, str], dict[str, Any]] = TTLCache(
+    max_size=Config.cache.token_max_size, ttl=Config.cache.token_ttl
+)
+
+
+@cache
+def get_public_key():
+    """Get SCAUP's public key, parsed only once"""
+    return load_pem_public_key(Config.auth.jwt_public.encode())
+
+
+@cache
+def get_private_key():
+    """Get SCAUP's private key, parsed only once"""
+    return load_pem_private_key(Config.auth.jwt_private.encode(), password=None)
+
+
+def hash_token(token: str):
+    """Get digest of token, to be used in cache keys instead of the token itself"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def get_token_ttl(token: str, max_ttl: float):
+    """Get time for which data derived from a token can be cached, capped by the token's expiry date, if
+    the token is a JWT with one
+
+    Args:
+        token: User token
+        max_ttl: Maximum time to live, in seconds
+
+    Returns:
+        Time to live in seconds"""
+    try:
+        expiry = decode(token, options={"verify_signature": False}).get("exp")
+    except PyJWTError:
+        return max_ttl
+
+    return max_ttl if expiry is None else min(max_ttl, expiry - time.time())
+
 
 def is_admin(perms: list[str]):
     return bool(set(Config.auth.read_all_perms) & set(perms))
@@ -21,14 +65,28 @@ def check_em_staff(user: GenericUser):
 
 
 def decode_jwt(token: str, aud: str = Config.shipping_service.callback_url) -> dict[str, Any]:
+    cache_key = (hash_token(token), aud)
+
+    if (cached_body := verified_token_cache.get(cache_key)) is not None:
+        return cached_body
+
     try:
         decoded_body = decode(
             token,
-            Config.auth.jwt_public,
+            get_public_key(),
             algorithms=["ES256"],
             audience=aud,
         )
 
+        ttl = (
+            Config.cache.token_ttl
+            if "exp" not in decoded_body
+            else min(Config.cache.token_ttl, decoded_body["exp"] - time.time())
+        )
+
+        if ttl > 0:
+            verified_token_cache.set(cache_key, decoded_body, ttl=ttl)
+
         return decoded_body
     except DecodeError as e:
         app_logger.warning(f"Error while parsing token: {e}")
@@ -0,0 +1,87 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Generic, Hashable, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Size-bounded LRU cache where every entry expires after a set amount of time. Expired entries
+    are kept until evicted, so that callers can still use them for conditional revalidation."""
+
+    def __init__(self, max_size: int, ttl: float):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[K, tuple[float, V]] = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: K) -> V | None:
+        """Get entry from cache, if present and not expired
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if entry is missing or expired"""
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= time.monotonic():
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def get_stale(self, key: K) -> V | None:
+        """Get entry from cache even if it has expired. Does not count as a hit or miss.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            Cached value, or None if entry is missing"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return None if entry is None else entry[1]
+
+    def set(self, key: K, value: V, ttl: float | None = None):
+        """Add entry to cache, evicting the least recently used entry if the cache is full
+
+        Args:
+            key: Cache key
+            value: Value to cache
+            ttl: Time to live in seconds, defaults to the cache's TTL"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: K):
+        """Remove entry from cache, if present
+
+        Args:
+            key: Cache key"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """Remove all entries and reset counters"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        """Get cache usage statistics
+
+        Returns:
+            Dictionary with entry count, hits and misses"""
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -0,0 +1,84 @@
+import hashlib
+from typing import Any
+
+from fastapi import Header, Request, Response, status
+
+
+def make_etag(*validators: Any):
+    """Build strong ETag from validators that change whenever the representation of a resource does
+
+    Args:
+        validators: Values identifying the current state of the resource
+
+    Returns:
+        Quoted entity tag
+    """
+    return f'"{hashlib.blake2b(repr(validators).encode(), digest_size=16).hexdigest()}"'
+
+
+def etag_matches(etag: str, if_none_match: str):
+    """Check if ETag matches any of the entity tags in an If-None-Match header, using weak comparison
+
+    Args:
+        etag: Current entity tag
+        if_none_match: If-None-Match header value
+
+    Returns:
+        True if the client's representation is still current
+    """
+    if if_none_match.strip() == "*":
+        return True
+
+    return etag in (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+
+
+class ConditionalGet:
+    """Dependency for answering conditional GET requests. Endpoints provide a cheap validator
+    (such as a shipment version or row count) before building the response body, and the request is
+    answered with 304 Not Modified if the client's ETag is still current."""
+
+    def __init__(
+        self,
+        request: Request,
+        response: Response,
+        if_none_match: str | None = Header(default=None, include_in_schema=False),
+    ):
+        self.url = str(request.url)
+        self.response = response
+        self.if_none_match = if_none_match
+
+    def not_modified(self, *validators: Any) -> Response | None:
+        """Check if resource has changed since the client last requested it. If it has, the ETag header
+        is added to the endpoint's response
+
+        Args:
+            validators: Values that change whenever the response body does
+
+        Returns:
+            304 response if the resource has not changed, None otherwise
+        """
+        etag = make_etag(self.url, *validators)
+
+        if self.if_none_match is not None and etag_matches(etag, self.if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        self.response.headers["ETag"] = etag
+        return None
+
+    def respond(self, content: bytes, media_type: str = "application/json"):
+        """Respond with pre-serialised body, using its digest as the ETag. Used for resources that have no
+        cheap validator, this saves bandwidth but not serialisation work
+
+        Args:
+            content: Response body
+            media_type: Response media type
+
+        Returns:
+            Response, or 304 response if the body has not changed
+        """
+        etag = make_etag(content)
+
+        if self.if_none_match is not None and etag_matches(etag, self.if_none_match):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+        return Response(content=content, media_type=media_type, headers={"ETag": etag})
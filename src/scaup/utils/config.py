@@ -32,6 +32,80 @@ class DB:
     max_shipments_per_session: int = 2
 
 
+@dataclass
+class Upstream:
+    """HTTP client settings for upstream services (Expeye, Microauth, shipping service)"""
+
+    pool_size: int = 10
+    keep_alive: bool = True
+    connect_timeout: float = 5
+    read_timeout: float = 30
+    max_concurrency: int = 10
+    history_deadline: float = 5
+
+
+@dataclass
+class SessionMirror:
+    """Local ISPyB session mirror settings. Interval and maximum age are in seconds"""
+
+    enabled: bool = True
+    interval: int = 900
+    lookahead_days: int = 14
+    max_age: int = 3600
+
+
+@dataclass
+class Cache:
+    """In-memory cache settings. TTLs are in seconds"""
+
+    history_ttl: int = 300
+    history_max_size: int = 2048
+    permission_grant_ttl: int = 60
+    permission_deny_ttl: int = 10
+    permission_max_size: int = 4096
+    user_ttl: int = 300
+    user_max_size: int = 4096
+    token_ttl: int = 300
+    token_max_size: int = 4096
+    shipment_tree_ttl: int = 600
+    shipment_tree_max_size: int = 256
+    protein_ttl: int = 3600
+    protein_deny_ttl: int = 60
+    protein_max_size: int = 8192
+
+
+@dataclass
+class StatusPoller:
+    """Background shipment status refresh settings"""
+
+    enabled: bool = True
+    interval: int = 300
+    batch_size: int = 50
+    max_concurrency: int = 10
+
+
+@dataclass
+class ExternalSync:
+    """Background ISPyB write-through settings. Interval and backoff are in seconds"""
+
+    enabled: bool = True
+    interval: int = 5
+    batch_size: int = 50
+    max_concurrency: int = 10
+    max_attempts: int = 8
+    backoff: int = 30
+
+
+@dataclass
+class PushJobs:
+    """Background shipment push settings. Interval and lease are in seconds"""
+
+    enabled: bool = True
+    interval: int = 2
+    batch_size: int = 5
+    lease: int = 300
+
+
 @dataclass
 class ShippingService:
     frontend_url: str = "https://localtest.diamond.ac.uk/"
@@ -63,6 +137,12 @@ class Config:
     shipping_service: ShippingService
     ispyb_api: IspybApi
     alerts: Alerts
+    upstream: Upstream
+    status_poller: StatusPoller
+    cache: Cache
+    session_mirror: SessionMirror
+    external_sync: ExternalSync
+    push_jobs: PushJobs
 
     @staticmethod
     def set():
@@ -78,6 +158,12 @@ class Config:
             Config.frontend_url = conf["frontend_url"]
             Config.shipping_service = ShippingService(**conf["shipping_service"])
             Config.alerts = Alerts(**conf["alerts"])
+            Config.upstream = Upstream(**conf.get("upstream", {}))
+            Config.status_poller = StatusPoller(**conf.get("status_poller", {}))
+            Config.cache = Cache(**conf.get("cache", {}))
+            Config.session_mirror = SessionMirror(**conf.get("session_mirror", {}))
+            Config.external_sync = ExternalSync(**conf.get("external_sync", {}))
+            Config.push_jobs = PushJobs(**conf.get("push_jobs", {}))
 
         except TypeError as exc:
             raise ConfigurationError(str(exc).replace(".__init__()", "")) from exc
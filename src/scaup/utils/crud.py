@@ -1,36 +1,119 @@
-from typing import Type
+from typing import Any, Iterable, Type
 
 from fastapi import HTTPException, status
 from lims_utils.logging import app_logger
-from sqlalchemy import delete, select, update
-from sqlalchemy.orm import joinedload
+from sqlalchemy import Select, and_, delete, exists, or_, select, update
+from sqlalchemy.orm import aliased, joinedload
 
 from ..models.containers import OptionalContainer
-from ..models.inner_db.tables import Container, Sample, Shipment, TopLevelContainer
+from ..models.inner_db.tables import Container, Sample, SampleParentChild, Shipment, TopLevelContainer
 from ..models.samples import OptionalSample, SublocationAssignment
 from ..models.shipments import UnassignedItems
 from ..models.top_level_containers import OptionalTopLevelContainer
 from ..utils.database import inner_db
 from ..utils.session import retry_if_exists
 from .config import Config
-from .external import ExternalObject, ExternalRequest
+from .external import ExternalRequest
+from .outbox import enqueue_external_sync
 from .query import table_query_to_generic
 
 
+def get_related_shipments(table: Type[Container | TopLevelContainer | Sample], item_id: int) -> set[int]:
+    """Get IDs of shipments whose data include an item, either directly, through its parent, through
+    the samples it holds (for containers) or through the samples it was derived from/into (for samples)
+
+    Args:
+        table: Item table
+        item_id: Item ID
+
+    Returns:
+        Set of shipment IDs
+    """
+    shipment_ids: set[int] = set()
+    query: Select[Any]
+
+    if table is Sample:
+        query = (
+            select(Sample.shipmentId, Container.shipmentId)
+            .outerjoin(Container, Sample.containerId == Container.id)
+            .filter(Sample.id == item_id)
+        )
+
+        shipment_ids.update(
+            inner_db.session.scalars(
+                select(Sample.shipmentId).join(
+                    SampleParentChild,
+                    or_(
+                        and_(SampleParentChild.parentId == Sample.id, SampleParentChild.childId == item_id),
+                        and_(SampleParentChild.childId == Sample.id, SampleParentChild.parentId == item_id),
+                    ),
+                )
+            )
+        )
+    elif table is Container:
+        parent = aliased(Container)
+        query = (
+            select(Container.shipmentId, parent.shipmentId, TopLevelContainer.shipmentId)
+            .outerjoin(parent, Container.parentId == parent.id)
+            .outerjoin(TopLevelContainer, Container.topLevelContainerId == TopLevelContainer.id)
+            .filter(Container.id == item_id)
+        )
+
+        # Sample listings include the name and type of the container each sample is in
+        shipment_ids.update(inner_db.session.scalars(select(Sample.shipmentId).filter(Sample.containerId == item_id)))
+    else:
+        query = select(TopLevelContainer.shipmentId).filter(TopLevelContainer.id == item_id)
+
+    row = inner_db.session.execute(query).one_or_none()
+
+    if row is not None:
+        shipment_ids.update(shipment_id for shipment_id in row if shipment_id is not None)
+
+    return shipment_ids
+
+
+def bump_shipment_versions(shipment_ids: Iterable[int | None]):
+    """Increment shipment versions, invalidating cached shipment trees. Must be called in the same
+    transaction as the change to the shipment
+
+    Args:
+        shipment_ids: Shipment IDs, None values are ignored
+    """
+    shipment_ids = {shipment_id for shipment_id in shipment_ids if shipment_id is not None}
+
+    if shipment_ids:
+        inner_db.session.execute(
+            update(Shipment).filter(Shipment.id.in_(shipment_ids)).values(version=Shipment.version + 1)
+        )
+
+
+def get_shipment_version(shipment_id: int) -> int | None:
+    """Get current shipment version, for use as a cheap validator for data in the shipment
+
+    Args:
+        shipment_id: Shipment ID
+
+    Returns:
+        Shipment version, or None if the shipment does not exist
+    """
+    return inner_db.session.scalar(select(Shipment.version).filter(Shipment.id == shipment_id))
+
+
 @retry_if_exists
 def edit_item(
     table: Type[Container | TopLevelContainer | Sample],
     params: OptionalSample | OptionalTopLevelContainer | OptionalContainer,
     item_id: int,
-    token: str,
+    extra_values: dict[str, Any] | None = None,
 ):
-    """Edit item, and update representation in ISPyB if already present there
+    """Edit item, and queue an update to its representation in ISPyB if already present there. The
+    update is pushed by a background worker once the edit is committed.
 
     Args:
         table: Table to update
         params: New values for item. Unset values do not affect end result
         item_id: ID of the item to be updated
-        token: User access token
+        extra_values: Values for columns not set by users directly, updated in the same transaction
 
     Returns:
         Current state of the updated item in the database
@@ -41,11 +124,14 @@ def edit_item(
         # Name is set to None, but is not considered as unset, so we need to check again
         exclude_fields = set()
 
+    # Items can be moved between shipments, so both the old and new shipments are affected
+    shipment_ids = get_related_shipments(table, item_id)
+
     updated_item = inner_db.session.scalar(
         update(table)
         .returning(table)
         .filter_by(id=item_id)
-        .values(params.model_dump(exclude_unset=True, exclude=exclude_fields))
+        .values({**params.model_dump(exclude_unset=True, exclude=exclude_fields), **(extra_values or {})})
     )
 
     if not updated_item:
@@ -53,17 +139,12 @@ def edit_item(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Invalid ID provided",
         )
-    inner_db.session.commit()
 
-    if updated_item and updated_item.externalId is not None:
-        ext_obj = ExternalObject(token, updated_item, item_id)
+    if updated_item.externalId is not None:
+        enqueue_external_sync(table, item_id)
 
-        ExternalRequest.request(
-            token,
-            method="PATCH",
-            url=f"{ext_obj.external_link_prefix}{updated_item.externalId}",
-            json=ext_obj.item_body.model_dump(mode="json", exclude=ext_obj.to_exclude),
-        )
+    bump_shipment_versions(shipment_ids | get_related_shipments(table, item_id))
+    inner_db.session.commit()
 
     return updated_item
 
@@ -96,6 +177,36 @@ def get_unassigned(shipmentId: int):
     return UnassignedItems(samples=samples, gridBoxes=grid_boxes, containers=containers)
 
 
+def has_unassigned(shipmentId: int) -> bool:
+    """Check if shipment has any unassigned items, using the same criteria as get_unassigned, in a single query
+
+    Args:
+        shipmentId: Shipment ID
+
+    Returns:
+        True if shipment has unassigned samples, grid boxes or containers
+    """
+    return bool(
+        inner_db.session.scalar(
+            select(
+                or_(
+                    exists().where(Sample.shipmentId == shipmentId, Sample.containerId.is_(None)),
+                    exists().where(
+                        Container.shipmentId == shipmentId,
+                        Container.type == "gridBox",
+                        Container.parentId.is_(None),
+                    ),
+                    exists().where(
+                        Container.shipmentId == shipmentId,
+                        Container.type != "gridBox",
+                        Container.topLevelContainerId.is_(None),
+                    ),
+                )
+            )
+        )
+    )
+
+
 def assert_not_booked(func):
     def wrapper(*args, **kwargs):
         shipment_status = inner_db.session.scalar(select(Shipment.status).filter(Shipment.id == kwargs["shipmentId"]))
@@ -113,7 +224,7 @@ def assert_not_booked(func):
 
 def assert_no_unassigned(func):
     def wrapper(*args, **kwargs):
-        if bool(get_unassigned(kwargs["shipmentId"])):
+        if has_unassigned(kwargs["shipmentId"]):
             raise HTTPException(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Cannot proceed with unassigned items in shipment",
@@ -140,6 +251,7 @@ def delete_item(table: Type[Container | TopLevelContainer | Sample], item_id: in
             detail="Cannot delete item in booked shipment",
         )
 
+    shipment_ids = get_related_shipments(table, item_id)
     update_status = inner_db.session.execute(delete(table).filter_by(id=item_id))
 
     if update_status.rowcount < 1:
@@ -148,6 +260,7 @@ def delete_item(table: Type[Container | TopLevelContainer | Sample], item_id: in
             detail=f"Invalid {table.__tablename__} ID provided",
         )
 
+    bump_shipment_versions(shipment_ids)
     inner_db.session.commit()
 
     return True
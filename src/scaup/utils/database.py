@@ -1,5 +1,6 @@
 import os
 
+import orjson
 from lims_utils.database import Database
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
@@ -17,6 +18,7 @@ inner_engine = create_engine(
     pool_recycle=3600,
     pool_size=Config.db.pool,
     max_overflow=Config.db.overflow,
+    json_deserializer=orjson.loads,
 )
 
 
@@ -1,10 +1,21 @@
+import asyncio
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
 from datetime import datetime
+from json import JSONDecodeError
+from threading import Lock
 from typing import List
 
+import httpx
+import orjson
 import requests
 from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
 from lims_utils.logging import app_logger
-from sqlalchemy import func, select, update
+from requests.adapters import HTTPAdapter
+from sqlalchemy import Integer, String, column, update, values
+from urllib3 import HTTPConnectionPool
 
 from ..models.containers import ContainerExternal
 from ..models.inner_db.tables import (
@@ -31,10 +42,96 @@ TYPE_TO_SHIPPING_SERVICE_TYPE = {
 }
 
 
-# TODO: possibly replace this with middleware, or httpx client instances
-class ExternalRequest:
+class RequestMemo:
+    """Responses to idempotent upstream requests made while handling a single request"""
+
+    def __init__(self):
+        self.responses: dict[tuple, requests.Response | asyncio.Task] = {}
+        self.saved = 0
+
     @staticmethod
+    def key(client: str, token: str, url: str, kwargs: dict):
+        """Get memo key for request, if it can be memoised
+
+        Args:
+            client: Client type (sync or async)
+            token: User token
+            url: Full request URL
+            kwargs: Other request arguments
+
+        Returns:
+            Memo key, or None if request is not an unconditional GET request"""
+        if (
+            kwargs.get("method", "GET").upper() != "GET"
+            or kwargs.get("headers")
+            or any(kwargs.get(arg) is not None for arg in ("params", "data", "json", "content"))
+        ):
+            return None
+
+        return (client, token, url)
+
+
+_request_memo: ContextVar[RequestMemo | None] = ContextVar("_request_memo", default=None)
+
+
+@contextmanager
+def request_memo():
+    """Memoise idempotent upstream GET requests for the duration of the context, so that each
+    resource is only requested once"""
+    memo = RequestMemo()
+    token = _request_memo.set(memo)
+
+    try:
+        yield memo
+    finally:
+        _request_memo.reset(token)
+
+        if memo.saved:
+            app_logger.debug("Saved %i upstream requests", memo.saved)
+
+
+def _count_idle_connections(pool: HTTPConnectionPool):
+    """Count open connections waiting in a pool to be reused. urllib3 fills the pool's queue with None
+    placeholders for slots that have no connection, so those are not counted
+
+    Args:
+        pool: urllib3 connection pool
+
+    Returns:
+        Number of idle connections"""
+    if pool.pool is None:
+        return 0
+
+    with pool.pool.mutex:
+        return sum(1 for connection in pool.pool.queue if connection is not None)
+
+
+class ExternalRequest:
+    """Upstream request helper. Keeps one long-lived, connection-pooled session per base URL, so that
+    consecutive requests to the same service reuse TCP/TLS connections instead of opening new ones."""
+
+    _sessions: dict[str, requests.Session] = {}
+    _lock = Lock()
+
+    @classmethod
+    def _get_session(cls, base_url: str):
+        with cls._lock:
+            if base_url not in cls._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=Config.upstream.pool_size)
+                session.mount("http://", adapter)
+                session.mount("https://", adapter)
+
+                if not Config.upstream.keep_alive:
+                    session.headers["Connection"] = "close"
+
+                cls._sessions[base_url] = session
+
+            return cls._sessions[base_url]
+
+    @classmethod
     def request(
+        cls,
         token,
         base_url=Config.ispyb_api.url,
         *args,
@@ -45,15 +142,133 @@ class ExternalRequest:
         we must do all the preparation work before the actual request."""
 
         kwargs["url"] = f"{base_url}{kwargs['url']}"
+
+        memo = _request_memo.get()
+        memo_key = memo.key("sync", token, kwargs["url"], kwargs) if memo is not None else None
+
+        if memo_key is not None and memo_key in memo.responses:
+            memo.saved += 1
+            return memo.responses[memo_key]
+
         kwargs["method"] = kwargs.get("method", "GET")
-        kwargs["headers"] = {"Authorization": f"Bearer {token}"}
+        kwargs["headers"] = {**kwargs.get("headers", {}), "Authorization": f"Bearer {token}"}
+        kwargs.setdefault("timeout", (Config.upstream.connect_timeout, Config.upstream.read_timeout))
 
-        return requests.request(**kwargs)
+        response = cls._get_session(base_url).request(**kwargs)
 
+        if memo_key is not None and response.status_code == 200:
+            memo.responses[memo_key] = response
 
-def _get_resource_from_ispyb(token: str, url: str):
-    response = ExternalRequest.request(token, url=url)
+        return response
+
+    @classmethod
+    def pool_stats(cls):
+        """Get connection pool usage for each upstream base URL
+
+        Returns:
+            Dictionary with base URLs as keys, and connection/request counts as values"""
+        stats: dict[str, dict[str, int]] = {}
+
+        for base_url, session in list(cls._sessions.items()):
+            # urllib3's pool container does not support iterating over values, only over a snapshot of its keys
+            pools = [
+                pool
+                for adapter in session.adapters.values()
+                for key in adapter.poolmanager.pools.keys()
+                if (pool := adapter.poolmanager.pools.get(key)) is not None
+            ]
+
+            stats[base_url] = {
+                "maxSize": Config.upstream.pool_size,
+                # urllib3 never decrements this, so it counts connections opened over the pool's lifetime
+                "connectionsCreated": sum(pool.num_connections for pool in pools),
+                "idleConnections": sum(_count_idle_connections(pool) for pool in pools),
+                "requests": sum(pool.num_requests for pool in pools),
+            }
+
+        return stats
+
+    @classmethod
+    def close(cls):
+        """Close all pooled sessions"""
+        with cls._lock:
+            for session in cls._sessions.values():
+                session.close()
+
+            cls._sessions.clear()
+
+
+class AsyncExternalRequest:
+    """Asyncio-native counterpart to ExternalRequest, for fanning out concurrent upstream requests. Keeps one
+    pooled client per base URL, so concurrent requests share connections."""
+
+    _clients: dict[str, httpx.AsyncClient] = {}
+    transport: httpx.AsyncBaseTransport | None = None
+
+    @classmethod
+    def _get_client(cls, base_url: str):
+        if base_url not in cls._clients:
+            cls._clients[base_url] = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=Config.upstream.pool_size,
+                    max_keepalive_connections=Config.upstream.pool_size if Config.upstream.keep_alive else 0,
+                ),
+                timeout=httpx.Timeout(Config.upstream.read_timeout, connect=Config.upstream.connect_timeout),
+                transport=cls.transport,
+            )
 
+        return cls._clients[base_url]
+
+    @classmethod
+    async def request(
+        cls,
+        token,
+        base_url=Config.ispyb_api.url,
+        method="GET",
+        **kwargs,
+    ):
+        """Wrapper for async request object. Arguments mirror the ones in ExternalRequest."""
+        url = f"{base_url}{kwargs.pop('url')}"
+
+        memo = _request_memo.get()
+        memo_key = memo.key("async", token, url, {"method": method, **kwargs}) if memo is not None else None
+
+        headers = {**kwargs.pop("headers", {}), "Authorization": f"Bearer {token}"}
+
+        if memo_key is None:
+            return await cls._get_client(base_url).request(method, url, headers=headers, **kwargs)
+
+        # Concurrent requests for the same resource share a single in-flight request
+        if memo_key in memo.responses:
+            memo.saved += 1
+        else:
+            memo.responses[memo_key] = asyncio.ensure_future(
+                cls._get_client(base_url).request(method, url, headers=headers, **kwargs)
+            )
+
+        task = memo.responses[memo_key]
+
+        try:
+            response = await asyncio.shield(task)
+        except Exception:
+            memo.responses.pop(memo_key, None)
+            raise
+
+        if response.status_code != 200:
+            memo.responses.pop(memo_key, None)
+
+        return response
+
+    @classmethod
+    async def close(cls):
+        """Close all pooled clients"""
+        for client in cls._clients.values():
+            await client.aclose()
+
+        cls._clients.clear()
+
+
+def _parse_resource_response(response: requests.Response | httpx.Response, url: str):
     if response.status_code != 200:
         app_logger.error(
             (
@@ -70,6 +285,14 @@ def _get_resource_from_ispyb(token: str, url: str):
     return response.json()
 
 
+def _get_resource_from_ispyb(token: str, url: str):
+    return _parse_resource_response(ExternalRequest.request(token, url=url), url)
+
+
+async def _async_get_resource_from_ispyb(token: str, url: str):
+    return _parse_resource_response(await AsyncExternalRequest.request(token, url=url), url)
+
+
 class ExternalObject:
     """Object representing a link to the ISPyB instance of the object"""
 
@@ -85,7 +308,14 @@ class ExternalObject:
         item: AvailableTable,
         item_id: int | str | None,
         root_id: int | None = None,
+        resolve: bool = True,
     ):
+        # Fields in the item body that can only be populated with data from upstream, in the format
+        # field name -> (resource URL, key in upstream resource)
+        self.upstream_fields: dict[str, tuple[str, str]] = {}
+        # Fields that are only sent when the item is created, and do not need to be kept up to date
+        self.creation_only_fields: set[str] = set()
+
         match item:
             case Shipment():
                 self.url = f"/proposals/{item_id}/shipments"
@@ -108,36 +338,33 @@ class ExternalObject:
                 self.external_link_prefix = "/dewars/"
                 self.item_body = TopLevelContainerExternal.model_validate(item)
 
-                shipment = inner_db.session.execute(
-                    select(
-                        func.concat(Shipment.proposalCode, Shipment.proposalNumber).label("proposal"),
-                        Shipment.visitNumber,
-                    ).filter(Shipment.id == item.shipmentId)
-                ).one()
+                # Shipments being pushed are already in the session, in which case this does not query the database
+                shipment = inner_db.session.get_one(Shipment, item.shipmentId)
+                proposal = f"{shipment.proposalCode}{shipment.proposalNumber}"
 
                 # When creating the dewar in ISPyB, since ISPyB has no concept of shipments belonging to sessions,
                 # dewars have to be assigned to sessions instead, and this is done through the firstExperimentId
                 # column, which despite the cryptic name, points to the BLSession table.
                 if item.externalId is None:
-                    session = _get_resource_from_ispyb(
-                        token,
-                        f"/proposals/{shipment.proposal}/sessions/{shipment.visitNumber}",
+                    self.upstream_fields["firstExperimentId"] = (
+                        f"/proposals/{proposal}/sessions/{shipment.visitNumber}",
+                        "sessionId",
                     )
-                    self.item_body.firstExperimentId = session["sessionId"]
                 else:
                     self.to_exclude = {"firstExperimentId"}
 
+                self.creation_only_fields = {"firstExperimentId"}
+
                 if item.code:
                     # We store the dewar's facility code, but not the numeric dewar registry ID that ISPyB also expects.
                     # Even though the alphanumeric code is a primary key in the DewarRegistry table, the dewar table
                     # still expects a numeric dewarRegistryId which is used in some systems.
                     # Since the facility code can be changed by the user, we need to update this even if it was already
                     # pushed to ISPyB
-                    dewar_reg = _get_resource_from_ispyb(
-                        token, f"/proposals/{shipment.proposal}/dewar-registry/{item.code}"
+                    self.upstream_fields["dewarRegistryId"] = (
+                        f"/proposals/{proposal}/dewar-registry/{item.code}",
+                        "dewarRegistryId",
                     )
-
-                    self.item_body.dewarRegistryId = dewar_reg["dewarRegistryId"]
                 self.external_key = "dewarId"
             case Sample():
                 if item_id is None:
@@ -151,49 +378,76 @@ class ExternalObject:
             case _:
                 raise NotImplementedError()
 
+        # Upstream fields are derived from local data, so the payload can be identified without resolving them
+        self.payload_hash = hashlib.blake2b(
+            orjson.dumps(
+                [
+                    self.url,
+                    self.item_body.model_dump(mode="json", exclude=self.to_exclude | self.creation_only_fields),
+                    sorted(
+                        url
+                        for field, (url, _) in self.upstream_fields.items()
+                        if field not in self.creation_only_fields
+                    ),
+                ],
+                option=orjson.OPT_SORT_KEYS,
+            ),
+            digest_size=16,
+        ).hexdigest()
+
+        if resolve:
+            self.resolve(token)
+
+    def resolve(self, token: str):
+        """Populate fields that depend on upstream resources"""
+        for field, (url, key) in self.upstream_fields.items():
+            setattr(self.item_body, field, _get_resource_from_ispyb(token, url)[key])
+
+    async def async_resolve(self, token: str):
+        """Populate fields that depend on upstream resources, fetching all resources concurrently"""
+        resources = await asyncio.gather(
+            *[_async_get_resource_from_ispyb(token, url) for url, _ in self.upstream_fields.values()]
+        )
 
-class Expeye:
-    @classmethod
-    def upsert(
-        cls,
-        token: str,
-        item: AvailableTable,
-        parent_id: int | str | None,
-        root_id: int | None = None,
-    ):
-        """Insert existing item in ISPyB or patch it
-
-        Args:
-            item: Item to be pushed
-            parent_id: External ID of the item's parent
-            root_id: ID of the root of the item tree, such as a session ID
+        for (field, (_, key)), resource in zip(self.upstream_fields.items(), resources):
+            setattr(self.item_body, field, resource[key])
 
-        Returns:
-            External link and external ID"""
 
-        ext_obj = ExternalObject(token, item, parent_id, root_id)
+class Expeye:
+    @staticmethod
+    def _prepare_request(item: AvailableTable, ext_obj: ExternalObject):
         method = "POST"
 
         if item.externalId:
             ext_obj.url = f"{ext_obj.external_link_prefix}{item.externalId}"
             method = "PATCH"
 
-        # There is no way of verifying orphan sample ownership in ISPyB, so we need to use SCAUP's
-        # token instead to create them on behalf of SCAUP, which has permission to manipulate all samples.
-        # TODO: revisit this when SCAUP creates containers, dewars and shipments for orphan samples
-        response = ExternalRequest.request(
-            Config.ispyb_api.jwt,
-            method=method,
-            url=ext_obj.url,
-            json=ext_obj.item_body.model_dump(mode="json", exclude=ext_obj.to_exclude),
-        )
+        return {
+            "method": method,
+            "url": ext_obj.url,
+            "json": ext_obj.item_body.model_dump(mode="json", exclude=ext_obj.to_exclude),
+        }
 
+    @staticmethod
+    def _is_unchanged(item: AvailableTable, ext_obj: ExternalObject):
+        return item.externalId is not None and item.externalHash == ext_obj.payload_hash
+
+    @staticmethod
+    def _skipped_response(item: AvailableTable, ext_obj: ExternalObject):
+        return {
+            "externalId": item.externalId,
+            "link": "".join([Config.ispyb_api.url, ext_obj.external_link_prefix, str(item.externalId)]),
+            "skipped": True,
+        }
+
+    @staticmethod
+    def _parse_response(response: requests.Response | httpx.Response, item: AvailableTable, ext_obj: ExternalObject):
         if response.status_code not in [201, 200]:
             detail = "No valid JSON body returned from upstream service"
 
             try:
                 detail = response.json().get("detail", "No detail provided")
-            except requests.JSONDecodeError:
+            except JSONDecodeError:
                 pass
 
             app_logger.error(
@@ -207,84 +461,205 @@ class Expeye:
 
         external_id = response.json()[ext_obj.external_key]
 
+        # Persisted along with the rest of the item's changes, once the session is committed
+        item.externalHash = ext_obj.payload_hash
+
         return {
             "externalId": external_id,
             "link": "".join([Config.ispyb_api.url, ext_obj.external_link_prefix, str(external_id)]),
+            "skipped": False,
         }
 
+    @classmethod
+    def upsert(
+        cls,
+        token: str,
+        item: AvailableTable,
+        parent_id: int | str | None,
+        root_id: int | None = None,
+    ):
+        """Insert existing item in ISPyB or patch it
 
-def update_shipment_status(shipment: ShipmentOut, token: str, commit: bool = True):
-    """Update shipment status by fetching updates from ISPyB, and return updated
-    shipment
+        Args:
+            item: Item to be pushed
+            parent_id: External ID of the item's parent
+            root_id: ID of the root of the item tree, such as a session ID
+
+        Returns:
+            External link and external ID"""
+
+        ext_obj = ExternalObject(token, item, parent_id, root_id, resolve=False)
+
+        if cls._is_unchanged(item, ext_obj):
+            return cls._skipped_response(item, ext_obj)
+
+        ext_obj.resolve(token)
+
+        # There is no way of verifying orphan sample ownership in ISPyB, so we need to use SCAUP's
+        # token instead to create them on behalf of SCAUP, which has permission to manipulate all samples.
+        # TODO: revisit this when SCAUP creates containers, dewars and shipments for orphan samples
+        response = ExternalRequest.request(Config.ispyb_api.jwt, **cls._prepare_request(item, ext_obj))
+
+        return cls._parse_response(response, item, ext_obj)
+
+    @classmethod
+    async def async_upsert(
+        cls,
+        token: str,
+        item: AvailableTable,
+        parent_id: int | str | None,
+        root_id: int | None = None,
+    ):
+        """Insert existing item in ISPyB or patch it, without blocking the event loop
+
+        Args:
+            item: Item to be pushed
+            parent_id: External ID of the item's parent
+            root_id: ID of the root of the item tree, such as a session ID
+
+        Returns:
+            External link and external ID"""
+
+        ext_obj = ExternalObject(token, item, parent_id, root_id, resolve=False)
+
+        if cls._is_unchanged(item, ext_obj):
+            return cls._skipped_response(item, ext_obj)
+
+        await ext_obj.async_resolve(token)
+        response = await AsyncExternalRequest.request(Config.ispyb_api.jwt, **cls._prepare_request(item, ext_obj))
+
+        return cls._parse_response(response, item, ext_obj)
+
+
+def _is_status_stale(shipment: ShipmentOut):
+    """Check whether a shipment's status should be refreshed from ISPyB
 
     Args:
-        shipments: Shipment to update status for
-        token: User token
+        shipment: Shipment to check
 
     Returns:
-        Updated shipment"""
+        True if shipment is in ISPyB, was last updated more than 10 minutes ago and
+        is not older than 3 months"""
     update_delta = datetime.now(tz=shipment.lastStatusUpdate.tzinfo) - shipment.lastStatusUpdate
 
     age_delta = (
         datetime.now(tz=shipment.lastStatusUpdate.tzinfo) - shipment.creationDate if shipment.creationDate else None
     )
 
-    validated_shipment = ShipmentOut.model_validate(shipment, from_attributes=True)
-
-    if (
+    return not (
         not shipment.externalId
         # Check if last updated was more than 10 minutes ago
         or update_delta.total_seconds() < 600
         # Check if older than 3 months
         or not age_delta
         or age_delta.total_seconds() > 7776000
-    ):
-        return validated_shipment
+    )
 
-    response = ExternalRequest.request(token=token, url=f"/shipments/{shipment.externalId}")
+
+async def _get_shipment_status(shipment: ShipmentOut, token: str, semaphore: asyncio.Semaphore):
+    """Fetch shipment status from ISPyB
+
+    Args:
+        shipment: Shipment to fetch status for
+        token: User token
+        semaphore: Semaphore bounding concurrent upstream requests
+
+    Returns:
+        Shipping status, or None if the upstream request failed"""
+    async with semaphore:
+        response = await AsyncExternalRequest.request(token=token, url=f"/shipments/{shipment.externalId}")
 
     if response.status_code != 200:
         app_logger.warning(
             "Failed to get status from ISPyB for shipment %i (external ID: %i): %s",
-            validated_shipment.id,
-            validated_shipment.externalId,
+            shipment.id,
+            shipment.externalId,
             response.text,
         )
 
-        return validated_shipment
-
-    external_shipment = response.json()
-    new_shipment = inner_db.session.execute(
-        update(Shipment)
-        .returning(Shipment)
-        .filter(Shipment.id == validated_shipment.id)
-        .values(
-            {
-                "status": external_shipment["shippingStatus"],
-                "lastStatusUpdate": datetime.now(tz=shipment.lastStatusUpdate.tzinfo),
-            }
-        )
-    ).scalar_one()
+        return None
 
-    if not commit:
-        inner_db.session.commit()
+    return response.json()["shippingStatus"]
 
-    return ShipmentOut.model_validate(new_shipment, from_attributes=True)
 
+def _write_shipment_statuses(new_statuses: list[tuple[int, str]], now: datetime):
+    """Write new shipment statuses in a single statement, and commit them
 
-def update_shipment_statuses(shipments: List[ShipmentOut], token: str):
+    Args:
+        new_statuses: Shipment IDs and their new statuses
+        now: Time of the status update
+
+    Returns:
+        Updated shipments, indexed by ID"""
+    status_values = values(
+        column("id", Integer),
+        column("status", String),
+        name="new_statuses",
+    ).data(new_statuses)
+
+    updated_shipments = {
+        shipment.id: ShipmentOut.model_validate(shipment, from_attributes=True)
+        for shipment in inner_db.session.scalars(
+            update(Shipment)
+            .returning(Shipment)
+            .filter(Shipment.id == status_values.c.id)
+            .values(status=status_values.c.status, lastStatusUpdate=now, version=Shipment.version + 1)
+        ).all()
+    }
+
+    inner_db.session.commit()
+
+    return updated_shipments
+
+
+async def update_shipment_status(shipment: ShipmentOut, token: str):
+    """Update shipment status by fetching updates from ISPyB, and return updated
+    shipment
+
+    Args:
+        shipments: Shipment to update status for
+        token: User token
+
+    Returns:
+        Updated shipment"""
+    return (await update_shipment_statuses([shipment], token))[0]
+
+
+async def update_shipment_statuses(shipments: List[ShipmentOut], token: str, max_concurrency: int | None = None):
     """Update shipment statuses in place by fetching updates from ISPyB, and return updated
-    shipment list
+    shipment list. Stale shipments are fetched concurrently, and all new statuses are written
+    in a single statement, in a worker thread.
 
     Args:
         shipments: Shipments to update statuses for
         token: User token
+        max_concurrency: Maximum number of concurrent upstream requests, defaults to upstream configuration
 
     Returns:
         Updated shipments"""
+    stale_shipments = [shipment for shipment in shipments if _is_status_stale(shipment)]
+
     for i, shipment in enumerate(shipments):
-        shipments[i] = update_shipment_status(shipment, token, commit=False)
+        shipments[i] = ShipmentOut.model_validate(shipment, from_attributes=True)
 
-    inner_db.session.commit()
+    if not stale_shipments:
+        return shipments
+
+    semaphore = asyncio.Semaphore(max_concurrency or Config.upstream.max_concurrency)
+    statuses = await asyncio.gather(*[_get_shipment_status(shipment, token, semaphore) for shipment in stale_shipments])
+
+    new_statuses = [
+        (shipment.id, new_status) for shipment, new_status in zip(stale_shipments, statuses) if new_status is not None
+    ]
+
+    if not new_statuses:
+        return shipments
+
+    updated_shipments = await run_in_threadpool(
+        _write_shipment_statuses, new_statuses, datetime.now(tz=stale_shipments[0].lastStatusUpdate.tzinfo)
+    )
+
+    for i, shipment in enumerate(shipments):
+        shipments[i] = updated_shipments.get(shipment.id, shipment)
 
     return shipments
@@ -0,0 +1,261 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Sequence, Type
+
+import httpx
+from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
+from lims_utils.logging import app_logger
+from sqlalchemy import Row, and_, delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+
+from ..models.inner_db.tables import Container, ExternalSyncOutbox, Sample, Session, Shipment, TopLevelContainer
+from .config import Config
+from .database import inner_db
+from .external import AsyncExternalRequest, ExternalObject
+
+SYNCED_TABLES: dict[str, Type[Container | TopLevelContainer | Sample]] = {
+    table.__tablename__: table for table in (Container, TopLevelContainer, Sample)
+}
+
+
+def enqueue_external_sync(table: Type[Container | TopLevelContainer | Sample], item_id: int):
+    """Queue item to be synced to ISPyB in the background. The entry is only visible to the worker once
+    the current transaction is committed, and pending changes to the same item are coalesced into a single
+    update.
+
+    Args:
+        table: Item table
+        item_id: Item ID
+    """
+    inner_db.session.execute(
+        insert(ExternalSyncOutbox)
+        .values(tableName=table.__tablename__, itemId=item_id)
+        .on_conflict_do_update(
+            constraint="ExternalSyncOutbox_unique_item",
+            set_={
+                "revision": ExternalSyncOutbox.revision + 1,
+                "attempts": 0,
+                "nextAttempt": func.now(),
+                "lastError": None,
+            },
+        )
+    )
+
+
+async def _sync_item(ext_obj: ExternalObject | None, semaphore: asyncio.Semaphore) -> tuple[str | None, str | None]:
+    """Push current state of item to ISPyB
+
+    Args:
+        ext_obj: External object for the item, or None if the item no longer needs syncing
+        semaphore: Semaphore bounding concurrent upstream requests
+
+    Returns:
+        Hash of the payload pushed to ISPyB, if any, and error message, or None if the item was synced (or no
+        longer needs syncing)"""
+    if ext_obj is None:
+        return None, None
+
+    async with semaphore:
+        try:
+            await ext_obj.async_resolve(Config.ispyb_api.jwt)
+
+            response = await AsyncExternalRequest.request(
+                Config.ispyb_api.jwt,
+                method="PATCH",
+                url=ext_obj.url,
+                json=ext_obj.item_body.model_dump(mode="json", exclude=ext_obj.to_exclude),
+            )
+        except (HTTPException, httpx.TransportError) as e:
+            return None, repr(e)[:255]
+
+    if response.status_code not in (200, 201):
+        return None, f"{response.status_code}: {response.text}"[:255]
+
+    return ext_obj.payload_hash, None
+
+
+def _get_parent_external_id(item: Container | TopLevelContainer | Sample):
+    """Get external ID of the item's parent, as used when the item is pushed as part of its shipment
+
+    Args:
+        item: Item
+
+    Returns:
+        Parent's external ID, or None if the item has no parent in ISPyB"""
+    parent: Container | TopLevelContainer | Shipment | None
+
+    match item:
+        case Sample():
+            parent = item.container
+        case Container():
+            parent = item.parent or item.topLevelContainer
+        case TopLevelContainer():
+            parent = item.shipment
+
+    return parent.externalId if parent is not None else None
+
+
+def _get_session_id(item: Container | TopLevelContainer | Sample):
+    """Get ID of the session the item's shipment belongs to, from the session mirror
+
+    Args:
+        item: Item
+
+    Returns:
+        Session ID, or None if the item is not in a shipment or the session has not been mirrored"""
+    if not isinstance(item, Container) or item.shipmentId is None:
+        return None
+
+    return inner_db.session.scalar(
+        select(Session.id)
+        .join(
+            Shipment,
+            and_(
+                Shipment.proposalCode == Session.proposalCode,
+                Shipment.proposalNumber == Session.proposalNumber,
+                Shipment.visitNumber == Session.visitNumber,
+            ),
+        )
+        .filter(Shipment.id == item.shipmentId)
+    )
+
+
+def _claim_entries(now: datetime):
+    """Claim due outbox entries, and build the external objects for the items they refer to
+
+    Args:
+        now: Current time
+
+    Returns:
+        Claimed entries, and the external object for each entry's item"""
+    entries = inner_db.session.execute(
+        select(
+            ExternalSyncOutbox.id,
+            ExternalSyncOutbox.tableName,
+            ExternalSyncOutbox.itemId,
+            ExternalSyncOutbox.revision,
+            ExternalSyncOutbox.attempts,
+        )
+        .filter(ExternalSyncOutbox.nextAttempt <= now)
+        .order_by(ExternalSyncOutbox.nextAttempt)
+        .limit(Config.external_sync.batch_size)
+        .with_for_update(skip_locked=True)
+    ).all()
+
+    if not entries:
+        return [], []
+
+    # Lease entries for the duration of the sync, so that edits made in the meantime don't block on row locks
+    inner_db.session.execute(
+        update(ExternalSyncOutbox)
+        .filter(ExternalSyncOutbox.id.in_([entry.id for entry in entries]))
+        .values(nextAttempt=now + timedelta(seconds=Config.external_sync.backoff))
+    )
+    inner_db.session.commit()
+
+    ext_objs: list[ExternalObject | None] = []
+
+    for entry in entries:
+        item = inner_db.session.get(SYNCED_TABLES[entry.tableName], entry.itemId)
+
+        if item is None or item.externalId is None:
+            ext_objs.append(None)
+            continue
+
+        # Building the external object may query the database, so it is done here rather than on the event loop.
+        # It is built the same way as when the shipment is pushed, so that the payload hashes match
+        ext_obj = ExternalObject(
+            Config.ispyb_api.jwt, item, _get_parent_external_id(item), _get_session_id(item), resolve=False
+        )
+        ext_obj.url = f"{ext_obj.external_link_prefix}{item.externalId}"
+        ext_objs.append(ext_obj)
+
+    return entries, ext_objs
+
+
+def _record_results(
+    entries: Sequence[Row[tuple[int, str, int, int, int]]],
+    results: Sequence[tuple[str | None, str | None]],
+    now: datetime,
+):
+    """Remove synced entries from the outbox, and schedule failed entries to be retried with exponential backoff.
+    Entries that fail for the last allowed time are logged and removed
+
+    Args:
+        entries: Claimed entries
+        results: Hash of the payload pushed to ISPyB and error message for each entry
+        now: Time the entries were claimed at"""
+    backoff = Config.external_sync.backoff
+    errors = [error for _, error in results]
+    synced = [entry for entry, error in zip(entries, errors) if error is None]
+
+    # Entries edited while being synced have a new revision, and are kept so that the latest changes are pushed
+    if synced:
+        inner_db.session.execute(
+            delete(ExternalSyncOutbox).filter(
+                tuple_(ExternalSyncOutbox.id, ExternalSyncOutbox.revision).in_(
+                    [(entry.id, entry.revision) for entry in synced]
+                )
+            )
+        )
+
+    # ISPyB now holds the pushed payload, so pushing the shipment again skips items that have not changed since
+    for entry, (payload_hash, _) in zip(entries, results):
+        if payload_hash is not None:
+            inner_db.session.execute(
+                update(SYNCED_TABLES[entry.tableName]).filter_by(id=entry.itemId).values(externalHash=payload_hash)
+            )
+
+    for entry, error in zip(entries, errors):
+        if error is None:
+            continue
+
+        attempts = entry.attempts + 1
+
+        # The item is synced again once it is next edited or its shipment is pushed
+        if attempts >= Config.external_sync.max_attempts:
+            app_logger.error(
+                "Giving up syncing %s %i to ISPyB after %i attempts: %s", entry.tableName, entry.itemId, attempts, error
+            )
+            inner_db.session.execute(
+                delete(ExternalSyncOutbox).filter(
+                    ExternalSyncOutbox.id == entry.id, ExternalSyncOutbox.revision == entry.revision
+                )
+            )
+            continue
+
+        app_logger.warning("Failed to sync %s %i to ISPyB: %s", entry.tableName, entry.itemId, error)
+
+        inner_db.session.execute(
+            update(ExternalSyncOutbox)
+            .filter(ExternalSyncOutbox.id == entry.id, ExternalSyncOutbox.revision == entry.revision)
+            .values(
+                attempts=attempts,
+                nextAttempt=now + timedelta(seconds=backoff * 2**entry.attempts),
+                lastError=error,
+            )
+        )
+
+    inner_db.session.commit()
+
+
+async def drain_external_sync_outbox():
+    """Sync due outbox entries to ISPyB concurrently. Entries are claimed with SKIP LOCKED, so that multiple
+    workers can drain the outbox at once, and failed entries are retried with exponential backoff. Database
+    work is run in a worker thread, so that it does not block the scheduler's event loop.
+
+    Returns:
+        Number of items synced"""
+    now = datetime.now(tz=timezone.utc)
+    entries, ext_objs = await run_in_threadpool(_claim_entries, now)
+
+    if not entries:
+        return 0
+
+    semaphore = asyncio.Semaphore(Config.external_sync.max_concurrency)
+    results = await asyncio.gather(*[_sync_item(ext_obj, semaphore) for ext_obj in ext_objs])
+
+    await run_in_threadpool(_record_results, entries, results, now)
+
+    return sum(1 for _, error in results if error is None)
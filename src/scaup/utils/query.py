@@ -1,8 +1,12 @@
-from typing import Sequence, Tuple
+from collections import defaultdict
+from typing import Any, Sequence, Tuple
 
-from sqlalchemy import Select
+import orjson
+from sqlalchemy import CTE, Select, select
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.orm.attributes import set_committed_value
 
-from ..models.inner_db.tables import Container, Sample, TopLevelContainer
+from ..models.inner_db.tables import Container, Sample, Shipment, TopLevelContainer
 from ..models.shipments import GenericItem, GenericItemData
 from .database import inner_db
 
@@ -16,7 +20,7 @@ def filter_fields(item: TopLevelContainer | Container | Sample):
     Returns:
         Item with filtered fields
     """
-    _unwanted_fields = ["samples", "children"]
+    _unwanted_fields = ["samples", "children", "externalHash"]
     return {key: value for [key, value] in item.__dict__.items() if key not in _unwanted_fields}
 
 
@@ -61,3 +65,204 @@ def table_query_to_generic(query: Select[Tuple[Sample]] | Select[Tuple[Container
     results: Sequence[Sample | Container] = inner_db.session.scalars(query).unique().all()
 
     return query_result_to_object(results)
+
+
+def _container_tree_cte(top_level_container_ids: set[int]) -> CTE:
+    """Build recursive CTE selecting the IDs of all containers inside top level containers, at any depth
+
+    Args:
+        top_level_container_ids: Top level container IDs
+
+    Returns:
+        CTE with a single ID column
+    """
+    container_tree = (
+        select(Container.id.label("id"))
+        .filter(Container.topLevelContainerId.in_(top_level_container_ids))
+        .cte("container_tree", recursive=True)
+    )
+
+    return container_tree.union(
+        select(Container.id.label("id")).join(container_tree, Container.parentId == container_tree.c.id)
+    )
+
+
+def load_container_tree(top_level_containers: Sequence[TopLevelContainer]):
+    """Load all containers (at any depth) and samples inside top level containers, and populate their
+    children/samples relationships, in two queries, so that traversing the tree does not trigger lazy loads
+
+    Args:
+        top_level_containers: Top level containers to load descendants for
+    """
+    if not top_level_containers:
+        return
+
+    tlc_ids = {tlc.id for tlc in top_level_containers}
+    container_tree = _container_tree_cte(tlc_ids)
+
+    containers = inner_db.session.scalars(
+        select(Container).filter(Container.id.in_(select(container_tree.c.id))).order_by(Container.id)
+    ).all()
+
+    samples = inner_db.session.scalars(
+        select(Sample).filter(Sample.containerId.in_(select(container_tree.c.id))).order_by(Sample.id)
+    ).all()
+
+    tlc_children: defaultdict[int, list[Container]] = defaultdict(list)
+    container_children: defaultdict[int, list[Container]] = defaultdict(list)
+    container_samples: defaultdict[int, list[Sample]] = defaultdict(list)
+
+    for container in containers:
+        if container.topLevelContainerId in tlc_ids:
+            tlc_children[container.topLevelContainerId].append(container)
+        if container.parentId is not None:
+            container_children[container.parentId].append(container)
+
+    for sample in samples:
+        container_samples[sample.containerId].append(sample)
+
+    for tlc in top_level_containers:
+        set_committed_value(tlc, "children", tlc_children[tlc.id])
+
+    for container in containers:
+        set_committed_value(container, "children", container_children[container.id])
+        set_committed_value(container, "samples", container_samples[container.id])
+
+
+def load_shipment_tree(shipment_id: int):
+    """Load shipment and all of its top level containers, containers and samples in a fixed number of queries
+
+    Args:
+        shipment_id: Shipment ID
+
+    Returns:
+        Shipment, with children relationships populated at all levels
+    """
+    shipment = inner_db.session.execute(select(Shipment).filter(Shipment.id == shipment_id)).scalar_one()
+
+    top_level_containers = inner_db.session.scalars(
+        select(TopLevelContainer).filter(TopLevelContainer.shipmentId == shipment_id).order_by(TopLevelContainer.id)
+    ).all()
+
+    set_committed_value(shipment, "children", list(top_level_containers))
+    load_container_tree(top_level_containers)
+
+    return shipment
+
+
+def _column_attributes(table: type[TopLevelContainer | Container | Sample]) -> list[InstrumentedAttribute]:
+    return [column.class_attribute for column in table.__mapper__.column_attrs]
+
+
+def _select_generic_items(query: Select) -> list[tuple[dict[str, Any], dict[str, Any]]]:
+    """Perform query selecting all columns of a table, and convert rows into the same structure as
+    serialised GenericItems, skipping model validation. Children are left empty, and must be populated
+    by the caller.
+
+    Args:
+        query: Query selecting all column attributes of a table
+
+    Returns:
+        List of original column values and generic items as dictionaries
+    """
+    result = inner_db.session.execute(query)
+    keys = list(result.keys())
+
+    items = []
+    for row in result.tuples():
+        columns = dict(zip(keys, row))
+        data = {key: value for key, value in columns.items() if key not in ("id", "name", "externalHash")}
+
+        if columns["details"] is not None:
+            data.update(columns["details"])
+
+        items.append((columns, {"id": columns["id"], "name": columns["name"], "data": data, "children": None}))
+
+    return items
+
+
+def get_generic_children(top_level_container_ids: Sequence[int]) -> dict[int, list[dict[str, Any]]]:
+    """Get children (containers and samples, at any depth) of top level containers as generic item
+    dictionaries, in two queries. Mirrors the structure generated by query_result_to_object.
+
+    Args:
+        top_level_container_ids: Top level container IDs
+
+    Returns:
+        Generic item trees, indexed by their top level container ID
+    """
+    if not top_level_container_ids:
+        return {}
+
+    tlc_ids = set(top_level_container_ids)
+    container_tree = _container_tree_cte(tlc_ids)
+
+    containers = _select_generic_items(
+        select(*_column_attributes(Container))
+        .filter(Container.id.in_(select(container_tree.c.id)))
+        .order_by(Container.id)
+    )
+
+    samples = _select_generic_items(
+        select(*_column_attributes(Sample))
+        .filter(Sample.containerId.in_(select(container_tree.c.id)))
+        .order_by(Sample.id)
+    )
+
+    tlc_children: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+    container_children: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+    container_samples: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+
+    for columns, item in containers:
+        if columns["topLevelContainerId"] in tlc_ids:
+            tlc_children[columns["topLevelContainerId"]].append(item)
+        if columns["parentId"] is not None:
+            container_children[columns["parentId"]].append(item)
+
+    for columns, item in samples:
+        container_samples[columns["containerId"]].append(item)
+
+    for _, item in containers:
+        # Samples take precedence over child containers, as in query_result_to_object
+        item["children"] = container_samples.get(item["id"]) or container_children.get(item["id"])
+
+    return tlc_children
+
+
+def get_generic_shipment_children(shipment_id: int) -> list[dict[str, Any]]:
+    """Get top level containers in shipment, and all of their children, as generic item dictionaries
+
+    Args:
+        shipment_id: Shipment ID
+
+    Returns:
+        List of generic item trees
+    """
+    top_level_containers = _select_generic_items(
+        select(*_column_attributes(TopLevelContainer))
+        .filter(TopLevelContainer.shipmentId == shipment_id)
+        .order_by(TopLevelContainer.id)
+    )
+
+    children = get_generic_children([item["id"] for _, item in top_level_containers])
+
+    for _, item in top_level_containers:
+        item["children"] = children.get(item["id"])
+
+    return [item for _, item in top_level_containers]
+
+
+def serialise_generic_tree(id: int, name: str, children: list[dict[str, Any]], data: dict[str, Any]):
+    """Serialise generic item tree directly into JSON, bypassing model validation. The output matches
+    that of a ShipmentChildren model.
+
+    Args:
+        id: Root item ID
+        name: Root item name
+        children: Generic item dictionaries
+        data: Root item data
+
+    Returns:
+        JSON document
+    """
+    return orjson.dumps({"id": id, "name": name, "children": children, "data": data}, option=orjson.OPT_UTC_Z)
@@ -1,21 +1,26 @@
 import re
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Any
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPAuthorizationCredentials
 from lims_utils.auth import GenericUser
 from lims_utils.logging import app_logger
+from lims_utils.models import parse_proposal
 from psycopg.errors import ForeignKeyViolation, UniqueViolation
 from sqlalchemy import func, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import IntegrityError
 
 from ..auth import Permissions, User, auth_scheme
 from ..models.inner_db import tables as db_tables
 from ..models.inner_db.tables import Shipment
+from .config import Config
 from .database import inner_db
 from .external import ExternalRequest
 
 UNIQUE_VIOLATION_REGEX = r"\((.*)\)=\((.*)\)"
+SESSION_MIRROR_PAGE_SIZE = 500
 
 CONSTRAINT_VIOLATION_TO_COLUMN = {
     "Sample_unique_sublocation": {"subLocation": None},
@@ -85,6 +90,141 @@ def retry_if_exists(func):
     return wrap
 
 
+def _mirrored_session_to_dict(session: db_tables.Session):
+    """Convert mirrored session to the format returned by Expeye"""
+    return {
+        "sessionId": session.id,
+        "parentProposal": f"{session.proposalCode}{session.proposalNumber}",
+        "visitNumber": session.visitNumber,
+        "startDate": None if session.startDate is None else session.startDate.isoformat(timespec="seconds"),
+        "endDate": None if session.endDate is None else session.endDate.isoformat(timespec="seconds"),
+        "beamLineName": session.beamLineName,
+        "beamLineOperator": session.beamLineOperator,
+    }
+
+
+def _parse_date(date: str | None):
+    return None if date is None else datetime.fromisoformat(date)
+
+
+def _mirror_cutoff():
+    return datetime.now(tz=timezone.utc) - timedelta(seconds=Config.session_mirror.max_age)
+
+
+def get_mirrored_session(proposal_code: str, proposal_number: int, visit_number: int) -> dict[str, Any] | None:
+    """Get session from local mirror of ISPyB sessions
+
+    Args:
+        proposal_code: Proposal code
+        proposal_number: Proposal number
+        visit_number: Session number
+
+    Returns:
+        Session in the same format as returned by Expeye, or None if the session is not mirrored or outdated"""
+    session = inner_db.session.scalar(
+        select(db_tables.Session).filter(
+            db_tables.Session.proposalCode == proposal_code,
+            db_tables.Session.proposalNumber == proposal_number,
+            db_tables.Session.visitNumber == visit_number,
+            db_tables.Session.lastUpdated > _mirror_cutoff(),
+        )
+    )
+
+    return None if session is None else _mirrored_session_to_dict(session)
+
+
+def get_mirrored_sessions(min_start_date: datetime, max_start_date: datetime) -> list[dict[str, Any]] | None:
+    """Get sessions starting within a time range from local mirror of ISPyB sessions
+
+    Args:
+        min_start_date: Minimum start date
+        max_start_date: Maximum start date
+
+    Returns:
+        List of sessions in the same format as returned by Expeye, or None if mirror is not up to date"""
+    last_updated = inner_db.session.scalar(select(func.max(db_tables.Session.lastUpdated)))
+
+    if last_updated is None or last_updated < _mirror_cutoff():
+        return None
+
+    sessions = inner_db.session.scalars(
+        select(db_tables.Session).filter(
+            db_tables.Session.startDate >= min_start_date,
+            db_tables.Session.startDate <= max_start_date,
+        )
+    ).all()
+
+    return [_mirrored_session_to_dict(session) for session in sessions]
+
+
+def refresh_session_mirror():
+    """Fetch upcoming and ongoing sessions from Expeye and upsert them into the local mirror in bulk
+
+    Returns:
+        Number of sessions mirrored"""
+    now = datetime.now()
+    params = {
+        "minEndDate": now,
+        "maxStartDate": now + timedelta(days=Config.session_mirror.lookahead_days),
+        "limit": SESSION_MIRROR_PAGE_SIZE,
+        "page": 0,
+    }
+
+    sessions: list[dict[str, Any]] = []
+
+    while True:
+        response = ExternalRequest.request(token=Config.ispyb_api.jwt, url="/sessions", params=params)
+
+        if response.status_code != 200:
+            app_logger.warning("Failed to retrieve sessions from ISPyB at %s: %s", response.url, response.text)
+            return 0
+
+        body = response.json()
+        sessions += body["items"]
+
+        if not body["items"] or (params["page"] + 1) * SESSION_MIRROR_PAGE_SIZE >= body["total"]:
+            break
+
+        params["page"] += 1
+
+    rows = []
+    for session in sessions:
+        reference = parse_proposal(session["parentProposal"], session["visitNumber"])
+        rows.append(
+            {
+                "id": session["sessionId"],
+                "proposalCode": reference.code,
+                "proposalNumber": reference.number,
+                "visitNumber": reference.visit_number,
+                "startDate": _parse_date(session.get("startDate")),
+                "endDate": _parse_date(session.get("endDate")),
+                "beamLineName": session.get("beamLineName"),
+                "beamLineOperator": session.get("beamLineOperator"),
+            }
+        )
+
+    if rows:
+        query = insert(db_tables.Session)
+        inner_db.session.execute(
+            query.on_conflict_do_update(
+                index_elements=[db_tables.Session.id],
+                set_={
+                    **{
+                        column.name: query.excluded[column.name]
+                        for column in db_tables.Session.__table__.columns
+                        if column.name not in ("sessionId", "lastUpdated")
+                    },
+                    "lastUpdated": func.now(),
+                },
+            ),
+            rows,
+        )
+
+        inner_db.session.commit()
+
+    return len(rows)
+
+
 def check_session_locked(shipment_id: int, user: GenericUser, token: HTTPAuthorizationCredentials):
     # Staff are exempt from this limitation
     if bool({"em_admin", "super_admin"} & set(user.permissions)):
@@ -93,25 +233,32 @@ def check_session_locked(shipment_id: int, user: GenericUser, token: HTTPAuthori
     session = inner_db.session.execute(
         select(
             func.concat(Shipment.proposalCode, Shipment.proposalNumber).label("proposal"),
+            Shipment.proposalCode,
+            Shipment.proposalNumber,
             Shipment.visitNumber,
         ).filter(Shipment.id == shipment_id)
     ).one()
 
-    response = ExternalRequest.request(
-        token=token.credentials,
-        method="GET",
-        url=f"/proposals/{session.proposal}/sessions/{session.visitNumber}",
-    )
+    ispyb_session = get_mirrored_session(session.proposalCode, session.proposalNumber, session.visitNumber)
 
-    if response.status_code != 200:
-        app_logger.warning("Failed to retrieve session from ISPyB at %s: %s", response.url, response.text)
-
-        raise HTTPException(
-            status_code=status.HTTP_424_FAILED_DEPENDENCY,
-            detail="Resource can't be verified upstream",
+    if ispyb_session is None:
+        response = ExternalRequest.request(
+            token=token.credentials,
+            method="GET",
+            url=f"/proposals/{session.proposal}/sessions/{session.visitNumber}",
         )
 
-    session_start = datetime.strptime(response.json()["startDate"], "%Y-%m-%dT%H:%M:%S")
+        if response.status_code != 200:
+            app_logger.warning("Failed to retrieve session from ISPyB at %s: %s", response.url, response.text)
+
+            raise HTTPException(
+                status_code=status.HTTP_424_FAILED_DEPENDENCY,
+                detail="Resource can't be verified upstream",
+            )
+
+        ispyb_session = response.json()
+
+    session_start = datetime.strptime(ispyb_session["startDate"], "%Y-%m-%dT%H:%M:%S")
 
     if session_start - datetime.now() < timedelta(hours=24):
         return True
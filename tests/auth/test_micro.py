@@ -1,8 +1,15 @@
+import jwt
 import pytest
+import responses
 from fastapi import HTTPException
 
-from scaup.auth.micro import _generic_table_check
+# Imported before the permission check is patched by the test fixtures
+from scaup.auth.micro import _check_perms, _generic_table_check, _get_user, permission_cache
 from scaup.models.inner_db.tables import Container, Sample, TopLevelContainer
+from scaup.utils.config import Config
+
+# Tokens not signed by SCAUP are checked against Microauth
+MICROAUTH_TOKEN = jwt.encode({"sub": "user"}, "secret", algorithm="HS256")
 
 
 @pytest.mark.parametrize("table", [Sample, Container, TopLevelContainer])
@@ -16,3 +23,80 @@ def test_check_inexistent(client, table):
     """Should raise exception if item does not exist"""
     with pytest.raises(HTTPException):
         _generic_table_check(table, 999, "")
+
+
+@responses.activate
+def test_check_perms_cached():
+    """Should not request permission from Microauth again if a grant is cached"""
+    perm_request = responses.get(f"{Config.auth.endpoint}/permission/session/cm1-1", status=200)
+
+    assert _check_perms("cm1-1", "session", MICROAUTH_TOKEN) == "cm1-1"
+    assert _check_perms("cm1-1", "session", MICROAUTH_TOKEN) == "cm1-1"
+
+    assert perm_request.call_count == 1
+    assert permission_cache.stats()["hits"] == 1
+
+
+@responses.activate
+def test_check_perms_expired_token():
+    """Should not cache grant if token has expired"""
+    token = jwt.encode({"sub": "user", "exp": 1}, "secret", algorithm="HS256")
+    perm_request = responses.get(f"{Config.auth.endpoint}/permission/session/cm1-1", status=200)
+
+    _check_perms("cm1-1", "session", token)
+    _check_perms("cm1-1", "session", token)
+
+    assert perm_request.call_count == 2
+
+
+@responses.activate
+def test_check_perms_denial_cached():
+    """Should cache permission denials"""
+    perm_request = responses.get(
+        f"{Config.auth.endpoint}/permission/session/cm1-1", status=403, json={"detail": "Forbidden"}
+    )
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc:
+            _check_perms("cm1-1", "session", MICROAUTH_TOKEN)
+
+        assert exc.value.status_code == 403
+
+    assert perm_request.call_count == 1
+
+
+@responses.activate
+def test_check_perms_failure_not_cached():
+    """Should not cache upstream failures"""
+    perm_request = responses.get(
+        f"{Config.auth.endpoint}/permission/session/cm1-1", status=500, json={"detail": "Error"}
+    )
+
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            _check_perms("cm1-1", "session", MICROAUTH_TOKEN)
+
+    assert perm_request.call_count == 2
+
+
+@responses.activate
+def test_get_user_cached():
+    """Should not request user from Microauth again if user is cached"""
+    user_request = responses.get(f"{Config.auth.endpoint}/user", status=200, json={"fedid": "user"})
+
+    assert _get_user(MICROAUTH_TOKEN) == {"fedid": "user"}
+    assert _get_user(MICROAUTH_TOKEN) == {"fedid": "user"}
+
+    assert user_request.call_count == 1
+
+
+@responses.activate
+def test_get_user_expired_token():
+    """Should not cache user if token has expired"""
+    token = jwt.encode({"sub": "user", "exp": 1}, "secret", algorithm="HS256")
+    user_request = responses.get(f"{Config.auth.endpoint}/user", status=200, json={"fedid": "user"})
+
+    _get_user(token)
+    _get_user(token)
+
+    assert user_request.call_count == 2
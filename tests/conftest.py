@@ -8,7 +8,9 @@ with open(os.path.join(os.path.dirname(__file__), "test_utils/jwtES256.key.test"
 with open(os.path.join(os.path.dirname(__file__), "test_utils/jwtES256.pem.test"), "r") as f:
     os.environ["SCAUP_PUBLIC_KEY"] = f.read()
 
+import httpx
 import pytest
+import requests
 import responses
 from fastapi.security import HTTPAuthorizationCredentials
 from fastapi.testclient import TestClient
@@ -17,9 +19,14 @@ from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
 from scaup.auth import User, auth_scheme
+from scaup.auth.micro import permission_cache, user_cache
+from scaup.crud.samples import protein_cache
+from scaup.crud.shipments import shipment_tree_cache
+from scaup.crud.top_level_containers import dewar_history_cache
 from scaup.main import api, app
-from scaup.utils.auth import check_jwt
+from scaup.utils.auth import check_jwt, verified_token_cache
 from scaup.utils.database import inner_db
+from scaup.utils.external import AsyncExternalRequest
 from tests.shipments.responses import generic_creation_callback
 from tests.shipments.samples.responses import protein_callback, sample_callback
 from tests.shipments.top_level_containers.responses import (
@@ -47,6 +54,18 @@ engine = create_engine(
 )
 
 Session = sessionmaker()
+
+
+def forward_to_responses(request: httpx.Request):
+    """Forward requests made by the async upstream client to the synchronous one, so that requests from both
+    clients can be mocked with the responses library"""
+    # httpx lowercases header names, so use the raw headers to preserve their original casing for matchers
+    headers = {key.decode(): value.decode() for key, value in request.headers.raw}
+    response = requests.request(request.method, str(request.url), headers=headers, data=request.content)
+    return httpx.Response(response.status_code, headers=response.headers, content=response.content)
+
+
+AsyncExternalRequest.transport = httpx.MockTransport(forward_to_responses)
 app.user_middleware.clear()
 app.middleware_stack = app.build_middleware_stack()
 
@@ -87,6 +106,17 @@ def mock_permissions(request):
         yield _fixture
 
 
+@pytest.fixture(scope="function", autouse=True)
+def clear_caches():
+    yield
+    dewar_history_cache.clear()
+    permission_cache.clear()
+    user_cache.clear()
+    verified_token_cache.clear()
+    shipment_tree_cache.clear()
+    protein_cache.clear()
+
+
 def empty_method():
     return True
 
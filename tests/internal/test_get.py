@@ -20,3 +20,13 @@ def test_get(mock_user, client):
 
     # Puck level
     assert canes[0]["children"][0]["name"] == "Internal_puck"
+
+
+@pytest.mark.parametrize("mock_user", [admin], indirect=True)
+def test_get_not_modified(mock_user, client):
+    """Should return 304 if internal container tree has not changed"""
+    etag = client.get("/internal-containers/221").headers["ETag"]
+
+    resp = client.get("/internal-containers/221", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
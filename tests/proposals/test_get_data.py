@@ -13,3 +13,19 @@ def test_get(client):
     client.get("/proposals/cm00001/data")
 
     assert resp.call_count == 1
+
+
+@responses.activate
+def test_get_caches_proteins(client):
+    """Should cache proteins returned with proposal data, so that samples can be created without
+    looking them up again"""
+    responses.get(
+        f"{Config.ispyb_api.url}/proposals/cm00001/data",
+        json={"proteins": [{"proteinId": 4407, "name": "Protein_01"}], "labContacts": []},
+    )
+
+    client.get("/proposals/cm00001/data")
+    resp = client.post("/shipments/1/samples", json={"proteinId": 4407})
+
+    assert resp.status_code == 201
+    assert not [call for call in responses.calls if "/proteins/" in call.request.url]
@@ -1,17 +1,9 @@
 import responses
 
-from scaup.utils.config import Config
-
 
 @responses.activate
 def test_get(client):
     """Should get shipments in session"""
-    responses.get(
-        f"{Config.ispyb_api.url}/shipments/63975",
-        status=200,
-        json={"shippingStatus": "opened"},
-    )
-
     resp = client.get("/proposals/cm00001/sessions/1/shipments")
 
     assert resp.status_code == 200
@@ -31,3 +23,26 @@ def test_get_inexistent(client):
     data = resp.json()
 
     assert len(data["items"]) == 0
+
+
+@responses.activate
+def test_get_not_modified(client):
+    """Should return 304 if shipments in session have not changed"""
+    etag = client.get("/proposals/cm00001/sessions/1/shipments").headers["ETag"]
+
+    resp = client.get("/proposals/cm00001/sessions/1/shipments", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+
+
+@responses.activate
+def test_get_modified(client):
+    """Should return new list if a shipment was created in the session"""
+    etag = client.get("/proposals/cm00001/sessions/1/shipments").headers["ETag"]
+
+    client.post("/proposals/cm00001/sessions/1/shipments", json={"name": "New Shipment"})
+
+    resp = client.get("/proposals/cm00001/sessions/1/shipments", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] != etag
@@ -1,22 +1,9 @@
 import responses
 
-from scaup.utils.config import Config
-
 
 @responses.activate
 def test_get(client):
     """Should get shipments in proposal"""
-    responses.get(
-        f"{Config.ispyb_api.url}/shipments/63975",
-        status=200,
-        json={"shippingStatus": "opened"},
-    )
-    responses.get(
-        f"{Config.ispyb_api.url}/shipments/79331",
-        status=200,
-        json={"shippingStatus": "opened"},
-    )
-
     resp = client.get("/proposals/bi23047/shipments")
 
     assert resp.status_code == 200
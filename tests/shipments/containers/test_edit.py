@@ -1,9 +1,12 @@
+import asyncio
+
 import responses
 from sqlalchemy import select
 
 from scaup.models.inner_db.tables import Container, Sample
 from scaup.utils.config import Config
 from scaup.utils.database import inner_db
+from scaup.utils.outbox import drain_external_sync_outbox
 
 
 def test_edit(client):
@@ -63,7 +66,7 @@ def test_update_shipment_across_proposal(client):
 
 @responses.activate
 def test_push_to_ispyb(client):
-    """Should push to ISPyB if container has externalId present"""
+    """Should push to ISPyB in the background if container has externalId present"""
     patch_resp = responses.patch(f"{Config.ispyb_api.url}/containers/10", "{}")
 
     client.patch(
@@ -71,6 +74,10 @@ def test_push_to_ispyb(client):
         json={"name": "New_Container_Name"},
     )
 
+    assert patch_resp.call_count == 0
+
+    asyncio.run(drain_external_sync_outbox())
+
     assert patch_resp.call_count == 1
 
 
@@ -36,3 +36,21 @@ def test_get_unassigned_in_shipment(client):
 
     data = resp.json()
     assert len(data["items"]) == 1
+
+
+def test_get_not_modified(client):
+    """Should return 304 if container has not changed"""
+    etag = client.get("/containers/1").headers["ETag"]
+
+    resp = client.get("/containers/1", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+
+
+def test_get_internal_not_modified(client):
+    """Should return 304 if internal container has not changed"""
+    etag = client.get("/containers/788").headers["ETag"]
+
+    resp = client.get("/containers/788", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
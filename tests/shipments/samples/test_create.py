@@ -2,12 +2,14 @@ import json
 
 import pytest
 import responses
-from sqlalchemy import select
+from sqlalchemy import insert, select
 
-from scaup.models.inner_db.tables import Sample, SampleParentChild
+from scaup.models.inner_db.tables import Sample, SampleNameCounter, SampleParentChild
 from scaup.utils.config import Config
 from scaup.utils.database import inner_db
 
+from .responses import sample_callback
+
 
 @responses.activate
 def test_create_valid_container(client):
@@ -285,3 +287,218 @@ def test_long_name(client):
     )
 
     assert resp.status_code == 400
+
+
+@responses.activate
+def test_create_bulk(client):
+    """Should create samples from multiple specs at once"""
+
+    resp = client.post(
+        "/shipments/1/samples/bulk",
+        json=[
+            {"proteinId": 4407, "containerId": 4, "location": 5},
+            {"proteinId": 5000, "name": "test", "type": "grid", "copies": 2},
+        ],
+    )
+
+    assert resp.status_code == 201
+    assert resp.json()["total"] == 3
+
+    assert [(sample["name"], sample["type"], sample["location"]) for sample in resp.json()["items"]] == [
+        ("Protein_01_1", "sample", 5),
+        ("nvid_name_test_1", "grid", None),
+        ("nvid_name_test_2", "grid", None),
+    ]
+
+
+@responses.activate
+def test_create_bulk_deduplicate_proteins(client):
+    """Should only look up each protein once, and share ordinal suffixes between specs with the same protein"""
+    resp = client.post(
+        "/shipments/1/samples/bulk",
+        json=[{"proteinId": 4407, "copies": 2}, {"proteinId": 4407}],
+    )
+
+    assert resp.status_code == 201
+    assert [sample["name"] for sample in resp.json()["items"]] == ["Protein_01_1", "Protein_01_2", "Protein_01_3"]
+
+    assert len([call for call in responses.calls if call.request.url.endswith("/proteins/4407")]) == 1
+
+
+@pytest.mark.noregister
+@responses.activate
+def test_create_bulk_push_to_external_db(client):
+    """Should push all samples to external DB"""
+    resp_post = responses.add_callback(responses.POST, f"{Config.ispyb_api.url}/samples", callback=sample_callback)
+    responses.get(f"{Config.ispyb_api.url}/proteins/4407", status=200, json={"name": "Protein_01"})
+
+    resp = client.post(
+        "/shipments/1/samples/bulk?pushToExternalDb=true",
+        json=[{"proteinId": 4407}, {"proteinId": 4407, "name": "T", "copies": 2}],
+    )
+
+    assert resp.status_code == 201
+    assert resp_post.call_count == 3
+
+    new_samples = inner_db.session.scalars(select(Sample).filter(Sample.name.like("Protein_01_%"))).all()
+
+    assert len(new_samples) == 3
+    assert all(sample.externalHash is not None for sample in new_samples)
+
+
+@responses.activate
+def test_create_bulk_parents(client):
+    """Should link samples to the parents declared in their spec"""
+
+    resp = client.post(
+        "/shipments/1/samples/bulk",
+        json=[{"proteinId": 4407}, {"proteinId": 4407, "copies": 2, "parents": [561]}],
+    )
+
+    assert resp.status_code == 201
+
+    child_ids = inner_db.session.scalars(
+        select(SampleParentChild.childId).filter(SampleParentChild.parentId == 561)
+    ).all()
+
+    assert sorted(child_ids) == [sample["id"] for sample in resp.json()["items"][1:]]
+
+
+@responses.activate
+def test_create_bulk_invalid_protein(client):
+    """Should not create any samples if one of the proteins is invalid"""
+
+    resp = client.post(
+        "/shipments/1/samples/bulk",
+        json=[{"proteinId": 4407}, {"proteinId": 3}],
+    )
+
+    assert resp.status_code == 404
+    assert inner_db.session.scalar(select(Sample).filter(Sample.name.like("Protein_01_%"))) is None
+
+
+@responses.activate
+def test_create_bulk_too_many(client):
+    """Should raise exception if too many samples are requested"""
+
+    resp = client.post(
+        "/shipments/1/samples/bulk",
+        json=[{"proteinId": 4407, "copies": 50}, {"proteinId": 5000, "copies": 47}],
+    )
+
+    assert resp.status_code == 400
+
+
+@responses.activate
+def test_create_bulk_full_batch(client):
+    """Should create a full 96-grid batch in a single request"""
+
+    resp = client.post(
+        "/shipments/1/samples/bulk",
+        json=[{"proteinId": 4407, "copies": 48}, {"proteinId": 5000, "copies": 48}],
+    )
+
+    assert resp.status_code == 201
+    assert len(resp.json()["items"]) == 96
+
+
+def _protein_calls(protein_id: int):
+    count = 0
+
+    for call in responses.calls:
+        assert call.request.url is not None
+        if call.request.url.endswith(f"/proteins/{protein_id}"):
+            count += 1
+
+    return count
+
+
+@responses.activate
+def test_create_protein_cached(client):
+    """Should not look up protein again if it is cached"""
+    for _ in range(3):
+        resp = client.post("/shipments/1/samples", json={"proteinId": 4407})
+        assert resp.status_code == 201
+
+    resp = client.post("/shipments/1/samples/bulk", json=[{"proteinId": 4407, "copies": 2}])
+    assert resp.status_code == 201
+
+    assert _protein_calls(4407) == 1
+
+
+@responses.activate
+def test_create_invalid_protein_cached(client):
+    """Should cache protein lookups that returned 404"""
+    for _ in range(2):
+        resp = client.post("/shipments/1/samples", json={"proteinId": 3})
+        assert resp.status_code == 404
+
+    assert _protein_calls(3) == 1
+
+
+@pytest.mark.noregister
+@responses.activate
+def test_create_protein_failure_not_cached(client):
+    """Should not cache upstream failures while looking up protein"""
+    responses.get(f"{Config.ispyb_api.url}/proteins/4407", status=500)
+
+    for _ in range(2):
+        resp = client.post("/shipments/1/samples", json={"proteinId": 4407})
+        assert resp.status_code == 404
+
+    assert _protein_calls(4407) == 2
+
+
+def _get_counter(prefix: str):
+    return inner_db.session.scalar(
+        select(SampleNameCounter.next).filter(SampleNameCounter.shipmentId == 1, SampleNameCounter.prefix == prefix)
+    )
+
+
+@responses.activate
+def test_create_name_counter(client):
+    """Should reserve suffixes for all copies from the shipment's name counter"""
+    client.post("/shipments/1/samples", json={"proteinId": 4407})
+
+    assert _get_counter("Protein_01") == 2
+
+    resp = client.post("/shipments/1/samples/bulk", json=[{"proteinId": 4407, "copies": 3}, {"proteinId": 5000}])
+
+    assert [sample["name"] for sample in resp.json()["items"]] == [
+        "Protein_01_2",
+        "Protein_01_3",
+        "Protein_01_4",
+        "nvid_name_1",
+    ]
+    assert _get_counter("Protein_01") == 5
+    assert _get_counter("nvid_name") == 2
+
+
+@responses.activate
+def test_create_name_counter_seed(client):
+    """Should seed name counter from existing sample names in the shipment"""
+    inner_db.session.execute(insert(Sample).values(shipmentId=1, proteinId=4407, name="Protein_01_7"))
+
+    resp = client.post("/shipments/1/samples", json={"proteinId": 4407})
+
+    assert resp.json()["items"][0]["name"] == "Protein_01_8"
+    assert _get_counter("Protein_01") == 9
+
+
+@responses.activate
+def test_create_name_counter_existing(client):
+    """Should use existing name counter instead of existing sample names"""
+    inner_db.session.execute(insert(SampleNameCounter).values(shipmentId=1, prefix="Protein_01", next=20))
+    inner_db.session.execute(insert(Sample).values(shipmentId=1, proteinId=4407, name="Protein_01_7"))
+
+    resp = client.post("/shipments/1/samples", json={"proteinId": 4407})
+
+    assert resp.json()["items"][0]["name"] == "Protein_01_20"
+
+
+@responses.activate
+def test_create_no_suffix_counter(client):
+    """Should not reserve suffixes if suffixes are not included in sample names"""
+    client.post("/shipments/1/samples?includeSuffix=false", json={"proteinId": 4407})
+
+    assert _get_counter("Protein_01") is None
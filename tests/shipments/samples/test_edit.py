@@ -1,9 +1,12 @@
+import asyncio
+
 import responses
 from sqlalchemy import select
 
 from scaup.models.inner_db.tables import Sample
 from scaup.utils.config import Config
 from scaup.utils.database import inner_db
+from scaup.utils.outbox import drain_external_sync_outbox
 
 
 def test_edit(client):
@@ -48,7 +51,7 @@ def test_edit_inexistent_sample(client):
 
 @responses.activate
 def test_push_to_ispyb(client):
-    """Should push to ISPyB if sample has externalId present"""
+    """Should push to ISPyB in the background if sample has externalId present"""
     patch_resp = responses.patch(f"{Config.ispyb_api.url}/samples/10", "{}")
 
     client.patch(
@@ -56,6 +59,10 @@ def test_push_to_ispyb(client):
         json={"name": "New_Sample_Name"},
     )
 
+    assert patch_resp.call_count == 0
+
+    asyncio.run(drain_external_sync_outbox())
+
     assert patch_resp.call_count == 1
 
 
@@ -1,6 +1,9 @@
 import responses
+from sqlalchemy import update
 
+from scaup.models.inner_db.tables import Sample
 from scaup.utils.config import Config
+from scaup.utils.database import inner_db
 
 
 def test_get(client):
@@ -140,3 +143,38 @@ def test_get_with_child_samples(client):
 
     data = resp.json()
     assert data["items"][1]["derivedSamples"][0]["id"] == 1877
+
+
+def test_get_not_modified(client):
+    """Should return 304 if samples in shipment have not changed"""
+    etag = client.get("/shipments/1/samples").headers["ETag"]
+
+    resp = client.get("/shipments/1/samples", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 304
+
+
+def test_get_modified(client):
+    """Should return new list if a sample in the shipment was edited"""
+    etag = client.get("/shipments/1/samples").headers["ETag"]
+
+    client.patch("/samples/1", json={"name": "New_Sample_Name"})
+
+    resp = client.get("/shipments/1/samples", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert "New_Sample_Name" in [sample["name"] for sample in resp.json()["items"]]
+
+
+def test_get_container_modified(client):
+    """Should return new list if the container holding a sample in the shipment was edited, even if the
+    container belongs to another shipment"""
+    inner_db.session.execute(update(Sample).filter(Sample.id == 2).values(containerId=341))
+    etag = client.get("/shipments/1/samples").headers["ETag"]
+
+    client.patch("/containers/341", json={"name": "New_Container_Name"})
+
+    resp = client.get("/shipments/1/samples", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert "New_Container_Name" in [sample["containerName"] for sample in resp.json()["items"]]
@@ -3,10 +3,11 @@ import json
 import jwt
 import pytest
 import responses
-from sqlalchemy import select, update
+from sqlalchemy import insert, select, update
 
 from scaup.models.inner_db.tables import (
     Container,
+    Sample,
     Shipment,
     TopLevelContainer,
 )
@@ -61,6 +62,100 @@ def test_shipment_request_body(client):
     ]
 
 
+@responses.activate
+def test_shipment_request_body_nested(client):
+    """Should count nested containers and samples in top level container"""
+    resp_post = responses.post(
+        f"{Config.shipping_service.backend_url}/api/shipment_requests/",
+        status=201,
+        json={"shipmentRequestId": 50},
+    )
+
+    grid_box_id = inner_db.session.scalar(
+        insert(Container)
+        .returning(Container.id)
+        .values(name="Grid_Box", shipmentId=106, parentId=712, type="gridBox", externalId=30)
+    )
+
+    inner_db.session.execute(
+        insert(Sample),
+        [
+            {
+                "name": f"Sample_{i}",
+                "shipmentId": 106,
+                "proteinId": 4407,
+                "containerId": grid_box_id,
+                "location": i,
+                "externalId": 30 + i,
+            }
+            for i in range(1, 3)
+        ],
+    )
+
+    client.post(
+        "/shipments/106/request",
+    )
+
+    body = resp_post.calls[0].request.body
+
+    assert isinstance(body, bytes)
+    body_dict = json.loads(body.decode())
+
+    assert body_dict["packages"][0]["line_items"] == [
+        {"shippable_item_type": "UNI_PUCK", "quantity": 1},
+        {"shippable_item_type": "CRYO_EM_GRID_BOX", "quantity": 1},
+        {"shippable_item_type": "CRYO_EM_GRID", "quantity": 2},
+        {"quantity": 1, "shippable_item_type": "CRYOGENIC_DRY_SHIPPER", "serial_number": "serial123"},
+    ]
+
+
+@responses.activate
+def test_shipment_request_serial_number_stored(client):
+    """Should store manufacturer serial numbers fetched from dewar registry"""
+    responses.post(
+        f"{Config.shipping_service.backend_url}/api/shipment_requests/",
+        status=201,
+        json={"shipmentRequestId": 50},
+    )
+
+    client.post(
+        "/shipments/106/request",
+    )
+
+    assert (
+        inner_db.session.scalar(select(TopLevelContainer.manufacturerSerialNumber).filter(TopLevelContainer.id == 171))
+        == "serial123"
+    )
+
+
+@responses.activate
+@pytest.mark.noregister
+def test_shipment_request_stored_serial_number(client):
+    """Should use stored manufacturer serial number instead of querying dewar registry"""
+    resp_post = responses.post(
+        f"{Config.shipping_service.backend_url}/api/shipment_requests/",
+        status=201,
+        json={"shipmentRequestId": 50},
+    )
+
+    inner_db.session.execute(
+        update(TopLevelContainer).filter(TopLevelContainer.id == 171).values({"manufacturerSerialNumber": "stored123"})
+    )
+
+    resp = client.post(
+        "/shipments/106/request",
+    )
+
+    assert resp.status_code == 201
+
+    body = resp_post.calls[0].request.body
+
+    assert isinstance(body, bytes)
+    body_dict = json.loads(body.decode())
+
+    assert body_dict["packages"][0]["line_items"][-1]["serial_number"] == "stored123"
+
+
 @responses.activate
 def test_shipment_request_callback(client):
     """Should send callback URL to shipping service"""
@@ -1,3 +1,12 @@
+import json
+
+from sqlalchemy import event
+
+from scaup.crud.shipments import get_shipment, shipment_tree_cache
+
+from ..conftest import engine
+
+
 def test_get(client):
     """Should get shipment details as tree of generic items"""
     resp = client.get("/shipments/1")
@@ -45,3 +54,71 @@ def test_get_inexistent(client):
     resp = client.get("/shipments/9999")
 
     assert resp.status_code == 404
+
+
+def test_get_etag(client):
+    """Should return 304 if shipment tree has not changed"""
+    resp = client.get("/shipments/1")
+
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == '"1-1"'
+
+    resp = client.get("/shipments/1", headers={"If-None-Match": resp.headers["ETag"]})
+
+    assert resp.status_code == 304
+    assert resp.content == b""
+
+
+def test_get_cached(client):
+    """Should not rebuild shipment tree if version has not changed"""
+    client.get("/shipments/1")
+    client.get("/shipments/1")
+
+    assert shipment_tree_cache.stats()["hits"] == 1
+
+
+def test_get_item_changed(client):
+    """Should return new tree and ETag if an item in the shipment has changed"""
+    etag = client.get("/shipments/1").headers["ETag"]
+
+    client.post(
+        "/shipments/1/containers",
+        json={"type": "puck", "topLevelContainerId": 1, "name": "New_Puck"},
+    )
+
+    resp = client.get("/shipments/1", headers={"If-None-Match": etag})
+
+    assert resp.status_code == 200
+    assert resp.headers["ETag"] == '"1-2"'
+    assert "New_Puck" in [container["name"] for container in resp.json()["children"][0]["children"]]
+
+
+def test_get_item_moved(client):
+    """Should update version of both the old and new shipments if an item is moved between them"""
+    resp = client.patch("/containers/3", json={"topLevelContainerId": 2})
+
+    assert resp.status_code == 200
+
+    assert client.get("/shipments/1").headers["ETag"] == '"1-2"'
+    assert client.get("/shipments/2").headers["ETag"] == '"2-2"'
+
+
+def test_get_query_count(client):
+    """Should load shipment tree in a fixed number of queries, regardless of depth"""
+    statements: list[str] = []
+
+    def log_statement(_conn, _cursor, statement, *_):
+        if statement.lstrip().upper().startswith("SELECT") or statement.lstrip().upper().startswith("WITH"):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", log_statement)
+
+    try:
+        shipment = json.loads(get_shipment(1, get_children=True).body)
+    finally:
+        event.remove(engine, "before_cursor_execute", log_statement)
+
+    assert shipment["children"][0]["children"][0]["children"][0]["children"][0]["name"] == "Sample_01"
+
+    # Shipment (joined with its session type), top level containers, containers and samples
+    assert len(statements) == 4
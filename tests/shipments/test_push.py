@@ -1,18 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import jwt
 import pytest
 import responses
-from sqlalchemy import select
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import IntegrityError
 
-from scaup.models.inner_db.tables import Container, Sample
+from scaup.crud.shipments import run_push_jobs
+from scaup.models.inner_db.tables import Container, PushJob, Sample, Shipment
 from scaup.utils.config import Config
 from scaup.utils.database import inner_db
+from scaup.utils.external import Expeye
+from scaup.utils.outbox import drain_external_sync_outbox
+
+from ..test_utils.regex import creation_regex, session_regex
+from .responses import generic_creation_callback
+
+
+def _push(client, shipment_id=97):
+    resp = client.post(f"/shipments/{shipment_id}/push")
+    assert resp.status_code == 202
+
+    asyncio.run(run_push_jobs())
+
+    return client.get(f"/shipments/{shipment_id}/push-jobs/{resp.json()['id']}").json()
+
+
+def _failing_samples_callback(request):
+    if request.url.endswith("/samples"):
+        return (500, {}, '{"detail": "Error"}')
+
+    return generic_creation_callback(request)
 
 
 @responses.activate
 def test_push(client):
-    """Should push shipment to ISPyB"""
+    """Should queue shipment push job"""
+    resp = client.post("/shipments/97/push")
+
+    assert resp.status_code == 202
+    assert resp.json()["status"] == "Queued"
+    assert resp.headers["Location"].endswith(f"/shipments/97/push-jobs/{resp.json()['id']}")
+
+    # Nothing is pushed until the job is run
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_push_already_queued(client):
+    """Should return existing job if shipment push is already queued"""
+    first_resp = client.post("/shipments/97/push")
+    resp = client.post("/shipments/97/push")
+
+    assert resp.json()["id"] == first_resp.json()["id"]
+    assert len(inner_db.session.scalars(select(PushJob)).all()) == 1
+
+
+@responses.activate
+def test_push_user_token(client, monkeypatch):
+    """Should read from ISPyB with the token of the user who queued the push, and write with SCAUP's token"""
+    monkeypatch.setattr(Config.ispyb_api, "jwt", "service-token")
+    job = _push(client)
+
+    assert job["status"] == "Completed"
+
+    for call in responses.calls:
+        expected_token = "token" if call.request.method == "GET" else "service-token"
+        assert call.request.headers["Authorization"] == f"Bearer {expected_token}"
+
+    # Tokens are not kept once the job is over
+    assert inner_db.session.scalar(select(PushJob.token).filter(PushJob.id == job["id"])) is None
+
+
+@responses.activate
+def test_push_expired_token(client):
+    """Should fail job without pushing anything if user token has expired"""
     resp = client.post("/shipments/97/push")
+    inner_db.session.execute(
+        update(PushJob).values(token=jwt.encode({"sub": "user", "exp": 1}, "secret", algorithm="HS256"))
+    )
+
+    asyncio.run(run_push_jobs())
+
+    job = client.get(f"/shipments/97/push-jobs/{resp.json()['id']}").json()
 
-    assert resp.status_code == 200
+    assert job["status"] == "Failed"
+    assert job["nodes"][0]["error"] == "User token expired, push shipment again"
+    assert len(responses.calls) == 0
+
+
+@responses.activate
+def test_push_unique_active_job(client):
+    """Should not allow more than one queued or running job per shipment"""
+    client.post("/shipments/97/push")
+
+    with pytest.raises(IntegrityError):
+        inner_db.session.execute(insert(PushJob).values(shipmentId=97, status="Running"))
 
 
 @pytest.mark.no_sample_response
@@ -20,30 +104,196 @@ def test_push(client):
 def test_push_unassigned(client):
     """Should push unassigned samples"""
     expeye_resp = responses.post(f"{Config.ispyb_api.url}/samples", json={"blSampleId": 1})
-    resp = client.post("/shipments/1/push")
+    job = _push(client, 1)
 
-    assert resp.status_code == 200
+    assert job["status"] == "Completed"
 
     assert (
         expeye_resp.calls[0].request.body
-        == b'{"comments": null, "source": "eBIC-Scaup", "subLocation": null, "location": null, "name": "Sample_02"}'
+        == b'{"comments":null,"source":"eBIC-Scaup","subLocation":null,"location":null,"name":"Sample_02"}'
     )
 
 
+@responses.activate
+def test_push_all_levels(client):
+    """Should push shipment, top level containers, containers and samples in shipment"""
+    job = _push(client)
+
+    assert job["status"] == "Completed"
+
+    # Shipment, dewar, puck, grid box and sample
+    assert job["total"] == 5
+    assert job["pushed"] == 5
+    assert [node["type"] for node in job["nodes"]] == [
+        "Shipment",
+        "TopLevelContainer",
+        "Container",
+        "Container",
+        "Sample",
+    ]
+
+    assert inner_db.session.scalar(select(Shipment.status).filter_by(id=97)) == "Submitted"
+
+
+@responses.activate
+def test_push_memo(client):
+    """Should only request the shipment's session once per push job"""
+    _push(client)
+
+    assert len([call for call in responses.calls if session_regex.match(str(call.request.url))]) == 1
+
+
+@responses.activate
+def test_push_unchanged(client):
+    """Should skip items that have not changed since they were last pushed"""
+    _push(client)
+    call_count = len(responses.calls)
+
+    job = _push(client)
+
+    assert job["pushed"] == 0
+    assert job["skipped"] == 5
+
+    # Only the session is requested from ISPyB
+    assert len(responses.calls) == call_count + 1
+
+
+@responses.activate
+def test_push_changed(client):
+    """Should push items that have changed since they were last pushed"""
+    _push(client)
+
+    inner_db.session.execute(update(Sample).filter(Sample.id == 434).values({"name": "New_Sample_Name"}))
+    patch_resp = responses.patch(f"{Config.ispyb_api.url}/samples/14", json={"blSampleId": 14})
+
+    job = _push(client)
+
+    assert job["pushed"] == 1
+    assert job["skipped"] == 4
+
+    assert patch_resp.call_count == 1
+
+
 @responses.activate
 def test_push_external_id(client):
     """Should push shipment to ISPyB and update external ID."""
-    resp = client.post("/shipments/97/push")
-
-    assert resp.status_code == 200
+    _push(client)
 
     assert inner_db.session.scalar(select(Container.externalId).filter_by(id=648)) == 13
     assert inner_db.session.scalar(select(Sample.externalId).filter_by(id=434)) == 14
 
 
+@responses.activate
+def test_push_failure(client):
+    """Should report items that could not be pushed, and keep external IDs of items that were pushed"""
+    responses.replace(responses.CallbackResponse(responses.POST, creation_regex, callback=_failing_samples_callback))
+
+    job = _push(client)
+
+    assert job["status"] == "Failed"
+    assert job["pushed"] == 4
+    assert job["failed"] == 1
+    assert job["nodes"][-1] == {
+        "type": "Sample",
+        "id": 434,
+        "externalId": None,
+        "link": None,
+        "skipped": False,
+        "error": "Received invalid response from upstream service",
+    }
+
+    assert inner_db.session.scalar(select(Container.externalId).filter_by(id=648)) == 13
+    assert inner_db.session.scalar(select(Sample.externalId).filter_by(id=434)) is None
+    assert inner_db.session.scalar(select(Shipment.status).filter_by(id=97)) != "Submitted"
+
+
+@responses.activate
+def test_push_resume(client):
+    """Should resume failed push from items that were not pushed"""
+    responses.replace(responses.CallbackResponse(responses.POST, creation_regex, callback=_failing_samples_callback))
+    _push(client)
+
+    responses.replace(responses.CallbackResponse(responses.POST, creation_regex, callback=generic_creation_callback))
+    job = _push(client)
+
+    assert job["status"] == "Completed"
+    assert job["pushed"] == 1
+    assert job["skipped"] == 4
+
+
+@responses.activate
+def test_push_stale_job(client):
+    """Should pick up running job again if it has not made progress before its lease expired"""
+    job_id = client.post("/shipments/97/push").json()["id"]
+
+    inner_db.session.execute(
+        update(PushJob)
+        .filter(PushJob.id == job_id)
+        .values(status="Running", lastUpdated=datetime.now(tz=timezone.utc) - timedelta(days=1))
+    )
+
+    assert asyncio.run(run_push_jobs()) == 1
+    assert inner_db.session.scalar(select(PushJob.status).filter_by(id=job_id)) == "Completed"
+
+
+@responses.activate
+def test_push_running_job(client):
+    """Should not pick up running job that is still making progress"""
+    job_id = client.post("/shipments/97/push").json()["id"]
+
+    inner_db.session.execute(update(PushJob).filter(PushJob.id == job_id).values(status="Running"))
+
+    assert asyncio.run(run_push_jobs()) == 0
+
+
+@responses.activate
+def test_push_renew_lease(client, monkeypatch):
+    """Should keep renewing lease while job runs, even if a single level takes longer than the lease"""
+    touched_jobs: list[int] = []
+    upsert = Expeye.async_upsert
+
+    async def slow_upsert(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        return await upsert(*args, **kwargs)
+
+    monkeypatch.setattr(Config.push_jobs, "lease", 0.03)
+    monkeypatch.setattr(Expeye, "async_upsert", slow_upsert)
+    monkeypatch.setattr("scaup.crud.shipments._touch_push_job", touched_jobs.append)
+
+    job = _push(client)
+
+    assert job["status"] == "Completed"
+    assert len(touched_jobs) >= 5
+    assert set(touched_jobs) == {job["id"]}
+
+
 @responses.activate
 def test_push_no_shipment(client):
     """Should return 404 for inexistent shipment"""
     resp = client.post("/shipments/9999/push")
 
     assert resp.status_code == 404
+
+
+def test_get_push_job_other_shipment(client):
+    """Should return 404 if push job belongs to a different shipment"""
+    job_id = client.post("/shipments/97/push").json()["id"]
+
+    resp = client.get(f"/shipments/1/push-jobs/{job_id}")
+
+    assert resp.status_code == 404
+
+
+@responses.activate
+def test_push_after_sync(client):
+    """Should skip items that were synced to ISPyB after being edited"""
+    _push(client)
+
+    client.patch("/samples/434", json={"name": "New_Sample_Name"})
+    patch_resp = responses.patch(f"{Config.ispyb_api.url}/samples/14", json={"blSampleId": 14})
+    asyncio.run(drain_external_sync_outbox())
+
+    job = _push(client)
+
+    assert job["skipped"] == 5
+    assert patch_resp.call_count == 1
@@ -39,6 +39,25 @@ def test_create_no_name(client):
     )
 
 
+@responses.activate
+def test_create_serial_number(client):
+    """Should store manufacturer serial number validated against dewar registry"""
+
+    resp = client.post(
+        "/shipments/1/topLevelContainers",
+        json={"type": "dewar", "code": "DLS-EM-0001", "manufacturerSerialNumber": "serial123"},
+    )
+
+    assert resp.status_code == 201
+
+    assert (
+        inner_db.session.scalar(
+            select(TopLevelContainer.manufacturerSerialNumber).filter(TopLevelContainer.id == resp.json()["id"])
+        )
+        == "serial123"
+    )
+
+
 @responses.activate
 def test_create_auto_barcode_no_instrument(client):
     """Should automatically generate barcode if not provided in request, and instrument isn't returned from ISPyB"""
@@ -1,9 +1,12 @@
+import asyncio
+
 import responses
 from sqlalchemy import select
 
 from scaup.models.inner_db.tables import TopLevelContainer
 from scaup.utils.config import Config
 from scaup.utils.database import inner_db
+from scaup.utils.outbox import drain_external_sync_outbox
 
 
 @responses.activate
@@ -36,6 +39,22 @@ def test_edit_code(client):
     assert resp.status_code == 200
 
 
+@responses.activate
+def test_edit_code_serial_number(client):
+    """Should store manufacturer serial number for new facility code"""
+    resp = client.patch(
+        "/topLevelContainers/1",
+        json={"code": "DLS-EM-0000"},
+    )
+
+    assert resp.status_code == 200
+
+    assert (
+        inner_db.session.scalar(select(TopLevelContainer.manufacturerSerialNumber).filter(TopLevelContainer.id == 1))
+        == "serial123"
+    )
+
+
 @responses.activate
 def test_edit_code_name(client):
     """Should update name if code changes"""
@@ -67,7 +86,7 @@ def test_edit_invalid_code(client):
 
 @responses.activate
 def test_push_to_ispyb(client):
-    """Should push to ISPyB if top level container has externalId present"""
+    """Should push to ISPyB in the background if top level container has externalId present"""
     patch_resp = responses.patch(f"{Config.ispyb_api.url}/dewars/10", "{}")
 
     client.patch(
@@ -75,4 +94,8 @@ def test_push_to_ispyb(client):
         json={"name": "New_Container_Name", "code": "DLS-EM-0000"},
     )
 
+    assert patch_resp.call_count == 0
+
+    asyncio.run(drain_external_sync_outbox())
+
     assert patch_resp.call_count == 1
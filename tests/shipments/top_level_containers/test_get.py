@@ -1,8 +1,13 @@
+import asyncio
 import logging
+from unittest.mock import patch
 
 import responses
+from responses import matchers
 
+from scaup.crud.top_level_containers import dewar_history_cache
 from scaup.utils.config import Config
+from scaup.utils.external import AsyncExternalRequest
 
 
 def test_get(client):
@@ -54,7 +59,95 @@ def test_get_history_upstream_failure(client, caplog):
     assert resp.status_code == 200
     dewars = resp.json()["items"]
     assert dewars[0]["history"] is None
+    assert dewars[0]["historyUnavailable"]
 
     assert caplog.records[0].message == (
         'Failed to get history from ISPyB for dewar 199 (external ID: 80365): {"detail": "error"}'
     )
+
+
+def test_get_history_deadline(client):
+    """Should return top level containers with history marked as unavailable if upstream takes too long
+    to respond"""
+
+    async def slow_request(*args, **kwargs):
+        await asyncio.sleep(1)
+
+    with (
+        patch.object(AsyncExternalRequest, "request", side_effect=slow_request),
+        patch.object(Config.upstream, "history_deadline", 0.01),
+    ):
+        resp = client.get("/shipments/117/topLevelContainers")
+
+    assert resp.status_code == 200
+    dewars = resp.json()["items"]
+    assert dewars[0]["history"] is None
+    assert dewars[0]["historyUnavailable"]
+
+
+@responses.activate
+def test_get_history_cached(client):
+    """Should not request history from upstream again if cached history has not expired"""
+    history_request = responses.get(
+        f"{Config.ispyb_api.url}/dewars/80365/history",
+        status=200,
+        json={"items": []},
+    )
+
+    client.get("/shipments/117/topLevelContainers")
+    resp = client.get("/shipments/117/topLevelContainers")
+
+    assert resp.status_code == 200
+    assert resp.json()["items"][0]["history"] == []
+    assert history_request.call_count == 1
+
+
+@responses.activate
+def test_get_history_revalidate(client):
+    """Should revalidate expired history with ETag, and use cached history if it has not changed"""
+    history = [{"dewarStatus": "opened", "storageLocation": "location", "dewarId": 80365, "arrivalDate": None}]
+
+    responses.get(
+        f"{Config.ispyb_api.url}/dewars/80365/history",
+        status=200,
+        json={"items": history},
+        headers={"ETag": '"v1"'},
+    )
+
+    client.get("/shipments/117/topLevelContainers")
+
+    dewar_history_cache.set(80365, dewar_history_cache.get_stale(80365), ttl=0)
+
+    responses.replace(
+        responses.GET,
+        f"{Config.ispyb_api.url}/dewars/80365/history",
+        status=304,
+        match=[matchers.header_matcher({"If-None-Match": '"v1"'})],
+    )
+
+    resp = client.get("/shipments/117/topLevelContainers")
+
+    assert resp.status_code == 200
+    assert resp.json()["items"][0]["history"] == history
+
+
+@responses.activate
+def test_get_history_invalidate_on_status_update(client):
+    """Should request history from upstream again if shipment status changes"""
+    history_request = responses.get(
+        f"{Config.ispyb_api.url}/dewars/80365/history",
+        status=200,
+        json={"items": []},
+    )
+
+    client.get("/shipments/117/topLevelContainers")
+
+    client.post(
+        "/shipments/117/update-status",
+        params={"token": ""},
+        json={"status": "New Status", "origin_url": "https://fake.com", "pickup_confirmation_timestamp": 1},
+    )
+
+    client.get("/shipments/117/topLevelContainers")
+
+    assert history_request.call_count == 2
@@ -1,3 +1,4 @@
+import asyncio
 import copy
 from datetime import datetime
 
@@ -29,6 +30,16 @@ def test_new_top_level_container(client):
     assert dewar.item_body.dewarRegistryId == 456
 
 
+@responses.activate
+def test_new_top_level_container_async(client):
+    """Should get upstream information without blocking if resolved asynchronously"""
+    dewar = ExternalObject("token", base_dewar, 1, 5, resolve=False)
+    asyncio.run(dewar.async_resolve("token"))
+
+    assert dewar.item_body.firstExperimentId == 1
+    assert dewar.item_body.dewarRegistryId == 456
+
+
 @responses.activate
 def test_update_top_level_container(client):
     """Should not get session ID if item has already been pushed to ISPyB"""
@@ -0,0 +1,103 @@
+import asyncio
+
+import responses
+
+from scaup.utils.config import Config
+from scaup.utils.external import AsyncExternalRequest, ExternalRequest, request_memo
+
+
+@responses.activate
+def test_reuse_session():
+    """Should reuse the same pooled session for requests to the same base URL"""
+    responses.get(f"{Config.ispyb_api.url}/proposals/cm1", status=200)
+
+    ExternalRequest.request("token", url="/proposals/cm1")
+    session = ExternalRequest._get_session(Config.ispyb_api.url)
+    ExternalRequest.request("token", url="/proposals/cm1")
+
+    assert ExternalRequest._get_session(Config.ispyb_api.url) is session
+    assert ExternalRequest._get_session(Config.auth.endpoint) is not session
+
+
+@responses.activate
+def test_default_timeout():
+    """Should use configured timeouts if none are provided"""
+    resp = responses.get(f"{Config.ispyb_api.url}/proposals/cm1", status=200)
+
+    ExternalRequest.request("token", url="/proposals/cm1")
+
+    assert resp.calls[0].request.req_kwargs["timeout"] == (
+        Config.upstream.connect_timeout,
+        Config.upstream.read_timeout,
+    )
+
+
+@responses.activate
+def test_pool_stats():
+    """Should include pool statistics for every base URL with an open session"""
+    responses.get(f"{Config.ispyb_api.url}/proposals/cm1", status=200)
+
+    ExternalRequest.request("token", url="/proposals/cm1")
+
+    assert ExternalRequest.pool_stats()[Config.ispyb_api.url]["maxSize"] == Config.upstream.pool_size
+
+
+def test_pool_stats_idle():
+    """Should not count empty pool slots as idle connections"""
+    base_url = Config.ispyb_api.url
+    ExternalRequest._get_session(base_url).get_adapter(base_url).poolmanager.connection_from_url(base_url)
+
+    assert ExternalRequest.pool_stats()[base_url]["idleConnections"] == 0
+
+
+@responses.activate
+def test_memo():
+    """Should only request each resource once while memoising requests"""
+    resp = responses.get(f"{Config.ispyb_api.url}/proposals/cm1", status=200)
+
+    with request_memo() as memo:
+        ExternalRequest.request("token", url="/proposals/cm1")
+        ExternalRequest.request("token", url="/proposals/cm1")
+
+    assert resp.call_count == 1
+    assert memo.saved == 1
+
+
+@responses.activate
+def test_memo_async():
+    """Should share in-flight requests for the same resource while memoising requests"""
+    resp = responses.get(f"{Config.ispyb_api.url}/proposals/cm1", status=200)
+
+    async def get_proposal_concurrently():
+        return await asyncio.gather(*[AsyncExternalRequest.request("token", url="/proposals/cm1") for _ in range(3)])
+
+    with request_memo() as memo:
+        asyncio.run(get_proposal_concurrently())
+
+    assert resp.call_count == 1
+    assert memo.saved == 2
+
+
+@responses.activate
+def test_memo_non_get():
+    """Should not memoise non-GET requests"""
+    resp = responses.post(f"{Config.ispyb_api.url}/proposals/cm1", status=200)
+
+    with request_memo() as memo:
+        ExternalRequest.request("token", method="POST", url="/proposals/cm1", json={})
+        ExternalRequest.request("token", method="POST", url="/proposals/cm1", json={})
+
+    assert resp.call_count == 2
+    assert memo.saved == 0
+
+
+@responses.activate
+def test_memo_failure():
+    """Should not memoise failed requests"""
+    resp = responses.get(f"{Config.ispyb_api.url}/proposals/cm1", status=500)
+
+    with request_memo():
+        ExternalRequest.request("token", url="/proposals/cm1")
+        ExternalRequest.request("token", url="/proposals/cm1")
+
+    assert resp.call_count == 2
@@ -1,3 +1,4 @@
+import asyncio
 import logging
 
 import responses
@@ -22,7 +23,7 @@ def test_get(client):
 
     shipment = inner_db.session.execute(select(Shipment).filter(Shipment.externalId == 63975)).scalar_one()
 
-    update_shipment_status(shipment, "token-here")
+    asyncio.run(update_shipment_status(shipment, "token-here"))
 
     new_status = inner_db.session.scalar(select(Shipment.status).filter(Shipment.externalId == 63975))
     assert new_status == "opened"
@@ -40,7 +41,7 @@ def test_cached(client):
 
     shipment = inner_db.session.execute(select(Shipment).filter(Shipment.externalId == 63975)).scalar_one()
 
-    update_shipment_status(shipment, "token-here")
+    asyncio.run(update_shipment_status(shipment, "token-here"))
 
     assert external_request.call_count == 0
 
@@ -57,7 +58,7 @@ def test_old_shipment(client):
 
     shipment = inner_db.session.execute(select(Shipment).filter(Shipment.externalId == 63975)).scalar_one()
 
-    update_shipment_status(shipment, "token-here")
+    asyncio.run(update_shipment_status(shipment, "token-here"))
 
     assert external_request.call_count == 0
 
@@ -75,7 +76,7 @@ def test_upstream_failure(client, caplog):
     shipment = inner_db.session.execute(select(Shipment).filter(Shipment.externalId == 63975)).scalar_one()
 
     with caplog.at_level(logging.WARNING):
-        update_shipment_status(shipment, "token-here")
+        asyncio.run(update_shipment_status(shipment, "token-here"))
 
     assert external_request.call_count == 1
 
@@ -99,7 +100,37 @@ def test_multiple_shipments(client):
 
     shipment = inner_db.session.execute(select(Shipment).filter(Shipment.externalId == 63975)).scalar_one()
 
-    update_shipment_statuses([shipment], "token-here")
+    asyncio.run(update_shipment_statuses([shipment], "token-here"))
 
     new_status = inner_db.session.scalar(select(Shipment.status).filter(Shipment.externalId == 63975))
     assert new_status == "opened"
+
+
+@freeze_time("2025-06-05 15:28:42.285 +0100")
+@responses.activate
+def test_multiple_shipments_partial_failure(client):
+    """Should update statuses for all shipments with successful upstream responses, and keep
+    status for shipments where the upstream request failed"""
+    responses.get(
+        f"{Config.ispyb_api.url}/shipments/63975",
+        status=200,
+        json={"shippingStatus": "opened"},
+    )
+
+    failed_request = responses.get(
+        f"{Config.ispyb_api.url}/shipments/79331",
+        status=500,
+        json={"details": "error"},
+    )
+
+    shipments = inner_db.session.scalars(
+        select(Shipment).filter(Shipment.externalId.in_([63975, 79331])).order_by(Shipment.id)
+    ).all()
+
+    shipments[1].creationDate = shipments[1].lastStatusUpdate = shipments[0].lastStatusUpdate
+    inner_db.session.flush()
+
+    updated_shipments = asyncio.run(update_shipment_statuses(list(shipments), "token-here"))
+
+    assert failed_request.call_count == 1
+    assert [shipment.status for shipment in updated_shipments] == ["opened", "Submitted"]
@@ -1,3 +1,4 @@
+import asyncio
 import json
 
 import pytest
@@ -18,6 +19,16 @@ def test_create():
     assert resp["externalId"] == 11
 
 
+@responses.activate
+def test_create_async():
+    """Should create new ISPyB object and return data asynchronously"""
+    resp = asyncio.run(
+        Expeye.async_upsert("token", Container(id=1, shipmentId=1, type="puck", requestedReturn=False), 10)
+    )
+
+    assert resp["externalId"] == 11
+
+
 @responses.activate
 def test_create_fail():
     """Should raise exception if item creation fails"""
@@ -1,9 +1,11 @@
+from unittest.mock import patch
+
 import jwt
 import pytest
 from fastapi import HTTPException
 from jwt.exceptions import ExpiredSignatureError, InvalidAudienceError
 
-from scaup.utils.auth import check_em_staff, check_jwt
+from scaup.utils.auth import check_em_staff, check_jwt, decode_jwt
 from scaup.utils.config import Config
 
 from ..test_utils.users import admin, em_admin, user
@@ -62,3 +64,28 @@ def test_jwt_invalid():
     """Should raise exception if invalid token is passed"""
     with pytest.raises(HTTPException, match="401: Invalid token provided"):
         check_jwt("abc", 1)
+
+
+def test_decode_cached():
+    """Should not verify the same token more than once"""
+    token = jwt.encode(
+        {"id": 1, "exp": 9e9, "aud": Config.shipping_service.callback_url}, Config.auth.jwt_private, algorithm="ES256"
+    )
+
+    with patch("scaup.utils.auth.decode", wraps=jwt.decode) as mock_decode:
+        decode_jwt(token)
+        assert decode_jwt(token)["id"] == 1
+
+    assert mock_decode.call_count == 1
+
+
+def test_decode_cached_other_audience():
+    """Should verify token again if a different audience is expected"""
+    token = jwt.encode(
+        {"id": 1, "exp": 9e9, "aud": Config.shipping_service.callback_url}, Config.auth.jwt_private, algorithm="ES256"
+    )
+
+    decode_jwt(token)
+
+    with pytest.raises(InvalidAudienceError):
+        decode_jwt(token, "scaup_general")
@@ -0,0 +1,38 @@
+from freezegun import freeze_time
+
+from scaup.utils.cache import TTLCache
+
+
+def test_get():
+    """Should return cached value and count hits and misses"""
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats() == {"size": 1, "hits": 1, "misses": 1}
+
+
+def test_expired():
+    """Should not return expired entries, but keep them available for revalidation"""
+    with freeze_time("2025-01-01 00:00:00") as frozen_time:
+        cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+        cache.set("a", 1)
+
+        frozen_time.tick(11)
+
+        assert cache.get("a") is None
+        assert cache.get_stale("a") == 1
+
+
+def test_evict_least_recently_used():
+    """Should evict least recently used entry when cache is full"""
+    cache: TTLCache[str, int] = TTLCache(max_size=2, ttl=10)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get_stale("a") == 1
+    assert cache.get_stale("b") is None
+    assert cache.get_stale("c") == 3
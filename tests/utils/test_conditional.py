@@ -0,0 +1,26 @@
+import pytest
+
+from scaup.utils.conditional import etag_matches, make_etag
+
+
+def test_make_etag():
+    """Should generate the same strong ETag for the same validators"""
+    etag = make_etag(1, "a")
+
+    assert etag == make_etag(1, "a")
+    assert etag != make_etag(2, "a")
+    assert etag.startswith('"') and etag.endswith('"')
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ['"abc"', 'W/"abc"', '"xyz", "abc"', "*"],
+)
+def test_etag_matches(if_none_match):
+    """Should match ETag against If-None-Match header"""
+    assert etag_matches('"abc"', if_none_match)
+
+
+def test_etag_does_not_match():
+    """Should not match different ETag"""
+    assert not etag_matches('"abc"', '"xyz", W/"abcd"')
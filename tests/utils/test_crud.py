@@ -1,7 +1,7 @@
 import pytest
 from fastapi import HTTPException
 
-from scaup.utils.crud import assert_no_unassigned, assert_not_booked
+from scaup.utils.crud import assert_no_unassigned, assert_not_booked, get_unassigned, has_unassigned
 
 
 def test_disallow_unassigned(client):
@@ -15,6 +15,12 @@ def test_no_unassigned(client):
     assert assert_no_unassigned(lambda shipmentId: "OK")(shipmentId=97) == "OK"
 
 
+@pytest.mark.parametrize("shipment_id", [1, 2, 89, 97])
+def test_has_unassigned(client, shipment_id):
+    """Should match whether get_unassigned returns any items"""
+    assert has_unassigned(shipment_id) == bool(get_unassigned(shipment_id))
+
+
 def test_disallow_booked(client):
     """Should raise error if shipment is booked"""
     with pytest.raises(HTTPException):
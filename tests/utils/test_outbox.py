@@ -0,0 +1,99 @@
+import asyncio
+from datetime import datetime, timezone
+
+import responses
+from sqlalchemy import select, update
+
+from scaup.models.inner_db.tables import ExternalSyncOutbox, Sample
+from scaup.utils.config import Config
+from scaup.utils.database import inner_db
+from scaup.utils.outbox import drain_external_sync_outbox, enqueue_external_sync
+
+
+def _get_entry():
+    return inner_db.session.scalar(
+        select(ExternalSyncOutbox).filter(ExternalSyncOutbox.tableName == "Sample", ExternalSyncOutbox.itemId == 336)
+    )
+
+
+def test_enqueue_coalesce(client):
+    """Should coalesce multiple pending changes to the same item into a single entry"""
+    enqueue_external_sync(Sample, 336)
+    enqueue_external_sync(Sample, 336)
+
+    assert inner_db.session.scalar(select(ExternalSyncOutbox.revision).filter_by(itemId=336)) == 2
+    assert len(inner_db.session.scalars(select(ExternalSyncOutbox)).all()) == 1
+
+
+@responses.activate
+def test_drain(client):
+    """Should push item to ISPyB and remove entry from outbox"""
+    patch_resp = responses.patch(f"{Config.ispyb_api.url}/samples/10", "{}")
+
+    enqueue_external_sync(Sample, 336)
+    enqueue_external_sync(Sample, 336)
+
+    assert asyncio.run(drain_external_sync_outbox()) == 1
+
+    assert patch_resp.call_count == 1
+    assert _get_entry() is None
+
+
+@responses.activate
+def test_drain_not_in_ispyb(client):
+    """Should remove entry from outbox without pushing if item is not in ISPyB"""
+    enqueue_external_sync(Sample, 1)
+
+    asyncio.run(drain_external_sync_outbox())
+
+    assert inner_db.session.scalar(select(ExternalSyncOutbox)) is None
+
+
+@responses.activate
+def test_drain_failure(client):
+    """Should keep entry in outbox and retry later if upstream returns an error"""
+    responses.patch(f"{Config.ispyb_api.url}/samples/10", status=500, body="Error")
+
+    enqueue_external_sync(Sample, 336)
+
+    assert asyncio.run(drain_external_sync_outbox()) == 0
+
+    entry = _get_entry()
+
+    assert entry.attempts == 1
+    assert entry.lastError == "500: Error"
+    assert entry.nextAttempt > datetime.now(tz=timezone.utc)
+
+
+@responses.activate
+def test_drain_give_up(client):
+    """Should remove entry from outbox once it has failed the maximum number of times"""
+    patch_resp = responses.patch(f"{Config.ispyb_api.url}/samples/10", status=500, body="Error")
+
+    enqueue_external_sync(Sample, 336)
+    inner_db.session.execute(update(ExternalSyncOutbox).values(attempts=Config.external_sync.max_attempts - 1))
+
+    asyncio.run(drain_external_sync_outbox())
+
+    assert patch_resp.call_count == 1
+    assert _get_entry() is None
+
+
+@responses.activate
+def test_drain_edited_while_syncing(client):
+    """Should keep entry in outbox if item is edited again while being synced"""
+
+    def edit_during_sync(_):
+        enqueue_external_sync(Sample, 336)
+        return (200, {}, "{}")
+
+    responses.add_callback(responses.PATCH, f"{Config.ispyb_api.url}/samples/10", callback=edit_during_sync)
+
+    enqueue_external_sync(Sample, 336)
+
+    asyncio.run(drain_external_sync_outbox())
+
+    entry = _get_entry()
+
+    assert entry.revision == 2
+    assert entry.attempts == 0
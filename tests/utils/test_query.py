@@ -0,0 +1,122 @@
+import json
+import time
+
+import pytest
+from sqlalchemy import insert, select
+
+from scaup.models.inner_db.tables import Container, Sample, Shipment, TopLevelContainer
+from scaup.models.shipments import ShipmentChildren, ShipmentOut
+from scaup.utils.database import inner_db
+from scaup.utils.query import (
+    get_generic_children,
+    get_generic_shipment_children,
+    load_container_tree,
+    load_shipment_tree,
+    query_result_to_object,
+    serialise_generic_tree,
+)
+
+
+def _validated_shipment_tree(shipment_id: int):
+    """Build shipment tree through generic item model validation"""
+    shipment = load_shipment_tree(shipment_id)
+
+    return ShipmentChildren(
+        id=shipment_id,
+        name=shipment.name,
+        children=query_result_to_object(shipment.children),
+        data=ShipmentOut.model_validate(shipment, from_attributes=True).model_dump(mode="json"),
+    ).model_dump_json()
+
+
+def _serialised_shipment_tree(shipment_id: int):
+    """Build shipment tree as plain dictionaries, serialised directly"""
+    shipment = inner_db.session.scalar(select(Shipment).filter(Shipment.id == shipment_id))
+
+    return serialise_generic_tree(
+        id=shipment_id,
+        name=shipment.name,
+        children=get_generic_shipment_children(shipment_id),
+        data=ShipmentOut.model_validate(shipment, from_attributes=True).model_dump(mode="json"),
+    )
+
+
+def _create_large_tree():
+    """Create top level container with 5000 items in total, inside shipment 1"""
+    tlc_id = inner_db.session.scalar(
+        insert(TopLevelContainer).returning(TopLevelContainer.id),
+        {"shipmentId": 1, "name": "Large_Dewar", "code": "DLS-BI-0999", "type": "dewar"},
+    )
+
+    grid_box_ids = inner_db.session.scalars(
+        insert(Container).returning(Container.id),
+        [
+            {"topLevelContainerId": tlc_id, "name": f"Grid_Box_{i}", "type": "gridBox", "details": {"lid": i}}
+            for i in range(999)
+        ],
+    ).all()
+
+    inner_db.session.execute(
+        insert(Sample),
+        [
+            {
+                "shipmentId": 1,
+                "proteinId": 4407,
+                "name": f"Sample_{i}",
+                "containerId": grid_box_ids[i % len(grid_box_ids)],
+                "details": {"foil": "Quantifoil copper"},
+            }
+            for i in range(4000)
+        ],
+    )
+
+    inner_db.session.expunge_all()
+
+
+@pytest.mark.parametrize("shipment_id", [1, 2, 97])
+def test_serialised_tree_matches_model(client, shipment_id):
+    """Should generate the same shipment tree as the generic item models"""
+    expected = json.loads(_validated_shipment_tree(shipment_id))
+    inner_db.session.expunge_all()
+
+    assert json.loads(_serialised_shipment_tree(shipment_id)) == expected
+
+
+def test_container_tree_matches_model(client):
+    """Should generate the same container tree as the generic item models"""
+    tlc = inner_db.session.scalar(select(TopLevelContainer).filter(TopLevelContainer.id == 221))
+    load_container_tree([tlc])
+    expected = [item.model_dump(mode="json") for item in query_result_to_object(tlc.children)]
+
+    serialised = serialise_generic_tree(id=221, name=tlc.name, children=get_generic_children([221])[221], data={})
+
+    assert json.loads(serialised)["children"] == expected
+
+
+def test_serialised_large_tree(client):
+    """Should serialise a 5000 item tree the same way as the generic item models"""
+    _create_large_tree()
+
+    validated = _validated_shipment_tree(1)
+    inner_db.session.expunge_all()
+    serialised = _serialised_shipment_tree(1)
+
+    assert json.loads(serialised) == json.loads(validated)
+
+
+@pytest.mark.benchmark
+def test_serialised_tree_benchmark(client):
+    """Should serialise a 5000 item tree faster than validating it through generic item models"""
+    _create_large_tree()
+
+    start = time.perf_counter()
+    _validated_shipment_tree(1)
+    validated_time = time.perf_counter() - start
+
+    inner_db.session.expunge_all()
+
+    start = time.perf_counter()
+    _serialised_shipment_tree(1)
+    serialised_time = time.perf_counter() - start
+
+    assert serialised_time < validated_time, f"Validated: {validated_time:.3f}s, serialised: {serialised_time:.3f}s"
@@ -0,0 +1,85 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+import responses
+from freezegun import freeze_time
+from sqlalchemy import insert, select
+
+from scaup.models.inner_db.tables import Session, Shipment
+from scaup.utils.config import Config
+from scaup.utils.database import inner_db
+from scaup.utils.session import get_mirrored_session, get_mirrored_sessions, refresh_session_mirror
+
+from ..test_utils.users import user
+
+SESSION = {
+    "sessionId": 27464088,
+    "parentProposal": "cm1",
+    "visitNumber": 1,
+    "startDate": "2025-07-21T01:00:00",
+    "endDate": "2025-07-24T01:00:00",
+    "beamLineName": "m03",
+    "beamLineOperator": ["John Doe"],
+}
+
+
+@responses.activate
+def test_refresh(client):
+    """Should mirror sessions from ISPyB"""
+    responses.get(f"{Config.ispyb_api.url}/sessions", json={"items": [SESSION], "total": 1, "limit": 500, "page": 0})
+
+    assert refresh_session_mirror() == 1
+    assert get_mirrored_session("cm", 1, 1) == SESSION
+
+
+@responses.activate
+def test_refresh_existing(client):
+    """Should update sessions which are already mirrored"""
+    inner_db.session.execute(
+        insert(Session).values(id=27464088, proposalCode="cm", proposalNumber=1, visitNumber=1, beamLineName="m01")
+    )
+
+    responses.get(f"{Config.ispyb_api.url}/sessions", json={"items": [SESSION], "total": 1, "limit": 500, "page": 0})
+
+    refresh_session_mirror()
+
+    assert inner_db.session.scalar(select(Session.beamLineName).filter(Session.id == 27464088)) == "m03"
+
+
+def test_outdated(client):
+    """Should not return mirrored session if it has not been updated recently"""
+    inner_db.session.execute(
+        insert(Session).values(
+            id=27464088,
+            proposalCode="cm",
+            proposalNumber=1,
+            visitNumber=1,
+            lastUpdated=datetime.now(tz=timezone.utc) - timedelta(seconds=Config.session_mirror.max_age + 1),
+        )
+    )
+
+    assert get_mirrored_session("cm", 1, 1) is None
+    assert get_mirrored_sessions(datetime(2025, 7, 20), datetime(2025, 7, 22)) is None
+
+
+@pytest.mark.noregister
+@freeze_time("2025-07-20T15:00:00")
+@pytest.mark.parametrize("mock_user", [user], indirect=True)
+@responses.activate
+def test_locked_from_mirror(client, mock_user):
+    """Should check whether session is locked using mirrored session, without contacting ISPyB"""
+    shipment = inner_db.session.scalar(select(Shipment).filter(Shipment.id == 2))
+    inner_db.session.execute(
+        insert(Session).values(
+            id=27464088,
+            proposalCode=shipment.proposalCode,
+            proposalNumber=shipment.proposalNumber,
+            visitNumber=shipment.visitNumber,
+            startDate=datetime(2025, 7, 21, 1),
+        )
+    )
+
+    resp = client.put("/shipments/2/preSession", json={"details": {"name": "newName"}})
+
+    assert resp.status_code == 400
+    assert len(responses.calls) == 0
@@ -0,0 +1,41 @@
+import asyncio
+
+import responses
+from freezegun import freeze_time
+from sqlalchemy import select
+
+from scaup.jobs import refresh_shipment_statuses
+from scaup.models.inner_db.tables import Shipment
+from scaup.utils.config import Config
+from scaup.utils.database import inner_db
+
+
+@freeze_time("2025-06-05 15:28:42.285 +0100")
+@responses.activate
+def test_refresh(client):
+    """Should refresh statuses for shipments with outdated statuses"""
+    external_request = responses.get(
+        f"{Config.ispyb_api.url}/shipments/63975",
+        status=200,
+        json={"shippingStatus": "opened"},
+    )
+
+    assert asyncio.run(refresh_shipment_statuses()) == 1
+    assert external_request.call_count == 1
+
+    new_status = inner_db.session.scalar(select(Shipment.status).filter(Shipment.externalId == 63975))
+    assert new_status == "opened"
+
+
+@freeze_time("2025-06-05 13:08:42.285 +0100")
+@responses.activate
+def test_refresh_up_to_date(client):
+    """Should not refresh statuses for shipments updated in the last 10 minutes"""
+    external_request = responses.get(
+        f"{Config.ispyb_api.url}/shipments/63975",
+        status=200,
+        json={"shippingStatus": "opened"},
+    )
+
+    assert asyncio.run(refresh_shipment_statuses()) == 0
+    assert external_request.call_count == 0